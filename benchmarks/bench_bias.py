@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Spins per second ingested by the biased wheel monitor.
+
+A log of ``SPINS`` fair spins is written as CSV and as one byte per spin, then read
+back through :class:`.BiasMonitor`. Each format is timed ``REPEAT`` times and the
+best run is reported.
+
+Example:
+    python -m benchmarks.bench_bias
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import timeit
+
+from casino.roulette import bias as bi
+from casino.roulette import bin_builder as bb
+
+SPINS = 2000000
+REPEAT = 3
+
+
+def main():
+    rng = random.Random(1)
+    spins = bytes(rng.randrange(bi.BINS) for _ in range(SPINS))
+    labels = {number: label for label, number in bi.LABELS.items()}
+    directory = tempfile.mkdtemp()
+    try:
+        paths = {'binary': os.path.join(directory, 'spins.bin'),
+                 'CSV': os.path.join(directory, 'spins.csv')}
+        with open(paths['binary'], 'wb') as handle:
+            handle.write(spins)
+        with open(paths['CSV'], 'w') as handle:
+            handle.write('spin\n')
+            handle.writelines(labels[number] + '\n' for number in spins)
+        for name, path in paths.items():
+            def ingest():
+                bi.BiasMonitor(bb.sharedWheel()).ingest(bi.readSpins(path))
+            seconds = min(timeit.repeat(ingest, number=1, repeat=REPEAT))
+            print('{0:<8s} {1:>14,.0f} spins/s'.format(name, SPINS / seconds))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
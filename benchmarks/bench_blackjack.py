@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Rounds per second of the blackjack players.
+
+Counting must stay within a small factor of basic strategy, since every dealt card
+goes through :meth:`.CountingPlayer.observe`. Each player is timed ``REPEAT`` times
+and the best run is reported, which filters out most of the scheduling noise.
+
+Example:
+    python -m benchmarks.bench_blackjack
+"""
+
+import timeit
+
+from casino.blackjack import board as bd
+from casino.blackjack import counting as ct
+from casino.blackjack import players as ply
+
+ROUNDS = 20000
+REPEAT = 5
+
+
+def rate(factory):
+    rules = bd.Rules()
+    game = ply.Game(rules)
+    player = factory(rules)
+
+    def setup():
+        game.seed(1)
+        player.reset()
+        player.shuffled()
+        player.setStake(10 ** 9)
+        player.setRounds(ROUNDS)
+
+    def run():
+        while player.playing():
+            game.cycle(player)
+
+    setup()  # builds the strategy tables outside the timed runs
+    run()
+    times = []
+    for _ in range(REPEAT):
+        setup()
+        times.append(timeit.timeit(run, number=1))
+    return ROUNDS / min(times)
+
+
+def main():
+    players = [('BasicStrategy', ply.BasicStrategy)]
+    for name, system in ct.SYSTEMS.items():
+        players.append(('CountingPlayer %s' % name,
+                        lambda rules, system=system: ct.CountingPlayer(rules, system)))
+    base = None
+    for name, factory in players:
+        per_second = rate(factory)
+        base = base or per_second
+        print('{0:<26s} {1:>10,.0f} rounds/s  {2:5.2f}x'.format(
+            name, per_second, base / per_second))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Rolls and bets settled per second at a craps table.
+
+``SEATS`` players of each kind share every roll through :meth:`.Game.round`, which
+settles all of their bets from the precomputed resolution of the roll.
+
+Example:
+    python -m benchmarks.bench_craps
+"""
+
+import time
+
+from casino.craps import board as bd
+from casino.craps import players as ply
+
+SEATS = 14
+ROLLS = 20000
+
+
+def main():
+    for player_class in (ply.PassLine, ply.ComePlayer, ply.IronCross):
+        table = bd.Table(10 ** 6, 5)
+        game = ply.Game(table)
+        game.seed(1)
+        players = [player_class(table) for _ in range(SEATS)]
+        for player in players:
+            player.setStake(10 ** 9)
+            player.setRounds(ROLLS)
+        working = 0
+        seconds = 0.0
+        for _ in range(ROLLS // 100):
+            begun = time.perf_counter()
+            for _ in range(100):
+                game.round(players)
+            seconds += time.perf_counter() - begun
+            working += sum(bin(player.bets).count('1') for player in players)
+        print('{0:<12s} {1:>8,.0f} rolls/s {2:>10,.0f} seat rolls/s  {3:.1f} bets working'.format(
+            player_class.__name__, ROLLS / seconds, ROLLS * SEATS / seconds,
+            working * 100 / ROLLS / SEATS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Scaling of a distributed run with the number of workers on this machine.
+
+For each worker count the same seeded run is timed once the workers are warm. Speedup
+is relative to one worker and efficiency is the speedup per worker; the gain of each
+added worker is the last column. Workers on other machines scale the same way as long as
+a range of sessions takes much longer to play than to send.
+
+Example:
+    python -m benchmarks.bench_distributed 4
+"""
+
+import os
+import sys
+import time
+
+from casino import distributed as dt
+from casino import sweep as sw
+
+SAMPLES = 5000
+
+
+def elapsed(workers):
+    executor = dt.DistributedExecutor(batchSize=500)
+    processes = dt.startWorkers(executor.address, workers)
+    simulator = sw.buildSimulator({'stake': 1000}, SAMPLES, 1)
+    simulator.executor = executor
+    try:
+        simulator.run(0, 500 * workers)  # every worker connected and warm
+        begun = time.perf_counter()
+        simulator.run()
+        return time.perf_counter() - begun
+    finally:
+        executor.close()
+        for process in processes:
+            process.join()
+
+
+def main():
+    most = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    print('{0:>7s} {1:>9s} {2:>8s} {3:>10s} {4:>10s}'.format(
+        'workers', 'seconds', 'speedup', 'efficiency', 'marginal'))
+    first = previous = None
+    for workers in range(1, most + 1):
+        seconds = elapsed(workers)
+        first = first or seconds
+        speedup = first / seconds
+        marginal = speedup - (previous or 0)
+        previous = speedup
+        print('{0:>7d} {1:>9.3f} {2:>7.2f}x {3:>9.0%} {4:>9.2f}x'.format(
+            workers, seconds, speedup, speedup / workers, marginal))
+
+
+if __name__ == '__main__':
+    main()
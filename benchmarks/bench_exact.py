@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Exact session statistics against simulation to a given accuracy.
+
+For Passenger57 sessions the exact distributions are computed once. Then
+:meth:`.Simulator.runUntil` plays sessions until the 95% confidence interval of the mean
+highest stake is within ``PRECISION`` of its centre, and whether the exact mean falls in
+it is shown. The exact figures have no sampling error at all.
+
+Example:
+    python -m benchmarks.bench_exact
+"""
+
+import time
+
+from casino.roulette import bin_builder as bb
+from casino.roulette import board as bd
+from casino.roulette import exact as ex
+from casino.roulette import players as ply
+
+CASES = ((100, 250), (1000, 250))
+PRECISIONS = (4.0, 2.0, 1.0)
+
+
+def simulator(stake, duration):
+    wheel = bb.sharedWheel()
+    table = bd.Table(1000, 5)
+    return ply.Simulator(ply.Game(table, wheel), ply.Passenger57(table, wheel),
+                         initStake=stake, initDuration=duration, seed=1)
+
+
+def main():
+    print('{0:>6s} {1:>8s} {2:>10s} {3:>9s} {4:>10s} {5:>8s} {6:>7s}'.format(
+        'stake', 'rounds', 'method', 'seconds', 'maximum', '± (95%)', 'covers'))
+    for stake, duration in CASES:
+        begun = time.perf_counter()
+        exact = ex.ExactSessions.fromSimulator(simulator(stake, duration))
+        seconds = time.perf_counter() - begun
+        print('{0:>6d} {1:>8d} {2:>10s} {3:>9.3f} {4:>10.2f} {5:>8s} {6:>7s}'.format(
+            stake, duration, 'exact', seconds, exact.maxima.mean, '0', ''))
+        for precision in PRECISIONS:
+            sampled = simulator(stake, duration)
+            begun = time.perf_counter()
+            result = sampled.runUntil(precision, relative=False)
+            seconds = time.perf_counter() - begun
+            low, high = result.interval('maximum')
+            print('{0:>6d} {1:>8d} {2:>10s} {3:>9.3f} {4:>10.2f} {5:>8.2f} {6:>7s}'.format(
+                stake, duration, '%d runs' % result.samples, seconds, result.maxima.mean,
+                result.halfWidth('maximum'), str(low <= exact.maxima.mean <= high)))
+
+
+if __name__ == '__main__':
+    main()
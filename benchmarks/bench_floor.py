@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Events per minute of the casino floor simulation.
+
+Floors of ``TABLES`` roulette tables of :obj:`.Passenger57` and :obj:`.Martingale` seats
+are simulated for ``HOURS`` hours, with arrivals enough to keep most seats taken. An
+event is an arrival or a table round, which settles every seat on one spin.
+
+Example:
+    python -m benchmarks.bench_floor
+"""
+
+import time
+
+from casino import floor as fl
+from casino.roulette import players as ply
+
+TABLES = (100, 500)
+HOURS = 8
+
+
+def main():
+    for player_class in (ply.Passenger57, ply.Martingale):
+        for count in TABLES:
+            tables = [fl.rouletteTable('roulette %d' % number, player_class)
+                      for number in range(count)]
+            floor = fl.Floor(tables, 6 * count, seed=1)
+            begun = time.perf_counter()
+            result = floor.run(HOURS)
+            seconds = time.perf_counter() - begun
+            seats = sum(stats.seatRounds for stats in result.tables.values())
+            print('{0:<12s} {1:>4d} tables {2:>12,.0f} events/min {3:>12,.0f} seat rounds/min'
+                  .format(player_class.__name__, count, result.events / seconds * 60,
+                          seats / seconds * 60))
+
+
+if __name__ == '__main__':
+    main()
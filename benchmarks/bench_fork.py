@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Continuations per second branched from one mid-session snapshot.
+
+A Martingale session is played until the player has lost six times in a row, then
+``SAMPLES`` continuations of the rest of its ``ROUNDS`` rounds are played from there,
+with the reference and the compiled engine. Restoring the snapshot alone is timed too: it is
+what a branch costs on top of its own rounds.
+
+Example:
+    python -m benchmarks.bench_fork
+"""
+
+import time
+
+from casino import fork as fk
+from casino.roulette import bin_builder as bb
+from casino.roulette import board as bd
+from casino.roulette import engine as en
+from casino.roulette import players as ply
+
+SAMPLES = 10000
+ROUNDS = 250
+
+
+def main():
+    wheel = bb.sharedWheel()
+    table = bd.Table(10 ** 6, 5)
+    game = ply.Game(table, wheel)
+    simulator = ply.Simulator(game, ply.Martingale(table, wheel), initDuration=ROUNDS,
+                              initStake=10 ** 5, seed=1)
+    snapshot = fk.playTo(simulator, 0, until=lambda player: player.lossCount == 6)
+    print(snapshot)
+    begun = time.perf_counter()
+    for _ in range(SAMPLES):
+        snapshot.restore(game, simulator.player, random=False)
+    seconds = time.perf_counter() - begun
+    print('{0:<10s} {1:>10,.0f} restores/s'.format('snapshot', SAMPLES / seconds))
+    for name, executor in (('reference', None), ('compiled', en.CompiledExecutor(1024))):
+        fork = fk.Fork(game, simulator.player, snapshot, samples=SAMPLES, executor=executor)
+        begun = time.perf_counter()
+        result = fork.run()
+        seconds = time.perf_counter() - begun
+        print('{0:<10s} {1:>10,.0f} continuations/s  mean final {2:,.1f}'.format(
+            name, SAMPLES / seconds, result.finals.mean))
+
+
+if __name__ == '__main__':
+    main()
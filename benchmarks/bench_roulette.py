@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Rounds per second of roulette sessions on each executor.
+
+The compiled engine must give the same records as :meth:`.Game.cycle`; this only
+measures how much faster it gives them, for every betting strategy. Strategies the
+engine cannot compile, such as :obj:`.Labouchere`, fall back to the reference engine.
+Each executor is timed ``REPEAT`` times and the best run is reported.
+
+Example:
+    python -m benchmarks.bench_roulette
+"""
+
+import timeit
+
+from casino import simulation as sim
+from casino.roulette import bin_builder as bb
+from casino.roulette import board as bd
+from casino.roulette import engine as en
+from casino.roulette import players as ply
+
+SAMPLES = 2000
+REPEAT = 5
+PLAYERS = (ply.Passenger57, ply.Martingale, ply.Paroli, ply.Player1326, ply.Fibonacci,
+           ply.DAlembert, ply.Labouchere, ply.SevenReds)
+
+
+def rate(player_class, executor):
+    wheel = bb.sharedWheel()
+    table = bd.Table(1000, 5)
+    player = player_class(table, wheel)
+    rounds = sim.ListSink()
+    simulator = ply.Simulator(ply.Game(table, wheel), player, initStake=1000,
+                              samples=SAMPLES, seed=1, executor=executor, sinks=[rounds])
+    simulator.run()
+    played = sum(record[1] for record in rounds.records)
+    simulator.sinks = []
+    return played / min(timeit.repeat(simulator.run, number=1, repeat=REPEAT))
+
+
+def main():
+    print('compiled backend: %s' % en.BACKEND)
+    for player_class in PLAYERS:
+        base = None
+        for name, executor in (('ScalarExecutor', sim.ScalarExecutor()),
+                               ('CompiledExecutor', en.CompiledExecutor())):
+            per_second = rate(player_class, executor)
+            base = base or per_second
+            print('{0:<12s} {1:<18s} {2:>12,.0f} rounds/s  {3:5.2f}x'.format(
+                player_class.__name__, name, per_second, per_second / base))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Genomes scored per minute by the strategy search.
+
+A search of ``GENERATIONS`` generations is run in this process and on a process pool.
+Scores found in the genome cache are counted separately: they cost nothing.
+
+Example:
+    python -m benchmarks.bench_search
+"""
+
+import time
+
+from casino.roulette import search as se
+
+SAMPLES = 200
+POPULATION = 64
+GENERATIONS = 10
+
+
+def main():
+    for workers in (0, None):
+        evaluator = se.Evaluator('endurance', samples=SAMPLES, seed=1)
+        search = se.Search(evaluator, POPULATION, GENERATIONS, seed=1, workers=workers)
+        begun = time.perf_counter()
+        ranking = search.run()
+        seconds = time.perf_counter() - begun
+        print('{0:<12s} {1:>6d} scored {2:>6d} cached {3:>10,.0f} genomes/min  best {4:g}'.format(
+            'in process' if workers == 0 else 'pool', search.misses, search.hits,
+            search.misses / seconds * 60, ranking[0][0]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Per-worker cost of getting the wheel tables, by the number of workers.
+
+Every worker of a spawned pool gets the compiled engine's tables in one of three ways:
+
+    pickle
+        the worker unpickles the parent's :obj:`.Wheel`, then builds the tables.
+    build
+        the worker builds its own wheel with :obj:`.BinBuilder`, then the tables.
+    attach
+        the worker attaches to a :obj:`.SharedWheel`, as the workers of
+        :func:`.sharedPool` do, which rebuilds its wheel from the arrays; the tables
+        read rows from the arrays as they are asked for.
+
+The time and the growth of the resident set of each worker's initializer are averaged
+over the workers. Read from ``/proc``, so Linux only.
+
+Example:
+    python -m benchmarks.bench_shared 8
+"""
+
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from casino.roulette import bin_builder as bb
+from casino.roulette import engine as en
+from casino.roulette import shared as sh
+
+PAGE = os.sysconf('SC_PAGE_SIZE')
+_worker = {}
+
+
+def resident():
+    with open('/proc/self/statm') as handle:
+        return int(handle.read().split()[1]) * PAGE
+
+
+def initialize(mode, argument):
+    memory, begun = resident(), time.perf_counter()
+    if mode == 'pickle':
+        tables = en.WheelTables(pickle.loads(argument))
+    elif mode == 'build':
+        tables = en.WheelTables(bb.sharedWheel())
+    else:
+        tables = en.WheelTables.fromArrays(sh.attachWheel(argument))
+    _worker['cost'] = (time.perf_counter() - begun, resident() - memory)
+    _worker['tables'] = tables
+
+
+def cost(_):
+    time.sleep(0.05)  # keep the worker busy so that every worker gets a task
+    return _worker['cost']
+
+
+def measure(mode, workers, argument):
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=initialize,
+                             initargs=(mode, argument)) as pool:
+        costs = list(pool.map(cost, range(workers * 4)))
+    return (sum(seconds for seconds, _ in costs) / len(costs),
+            sum(memory for _, memory in costs) / len(costs))
+
+
+def main():
+    most = int(sys.argv[1]) if len(sys.argv) > 1 else max(os.cpu_count(), 4)
+    wheel = bb.sharedWheel()
+    shared = sh.SharedWheel.create(wheel)
+    print('packed wheel: %d bytes' % shared.memory.size)
+    print('{0:>7s} {1:>7s} {2:>10s} {3:>10s}'.format('workers', 'mode', 'ms/worker',
+                                                    'KiB/worker'))
+    try:
+        for workers in sorted({1, 2, most // 2, most} - {0}):
+            for mode, argument in (('pickle', pickle.dumps(wheel)), ('build', None),
+                                   ('attach', shared.name)):
+                seconds, memory = measure(mode, workers, argument)
+                print('{0:>7d} {1:>7s} {2:>10.3f} {3:>10.1f}'.format(
+                    workers, mode, seconds * 1000, memory / 1024))
+    finally:
+        shared.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""This module contains the table furniture for the game of blackjack.
+
+This module contains three important classes:
+
+    :obj:`Rules` which describes the house rules that change the game's expected value.
+    :obj:`Shoe` which deals cards and tracks the remaining composition.
+    :obj:`Hand` which accumulates cards and keeps its total incrementally.
+
+Cards are plain integers from 1 to 10 where 1 is an ace and 10 is any ten-valued card.
+Suits never matter to the game so they are not modelled. A shoe's composition is
+a tuple of ten counts where index ``rank - 1`` holds the number of cards of that rank.
+"""
+
+import logging
+import random
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+ACE = 1
+TEN = 10
+RANKS = tuple(range(1, 11))
+PER_DECK = (4, 4, 4, 4, 4, 4, 4, 4, 4, 16)  # ace to nine, then the four ten-valued ranks
+
+
+def deckComposition(decks):
+    """Composition of a fresh shoe with ``decks`` decks.
+
+    Args:
+        decks (int): number of 52 card decks.
+
+    Return:
+        tuple: ten counts indexed by ``rank - 1``.
+    """
+    return tuple(decks * count for count in PER_DECK)
+
+
+def handValue(cards):
+    """Best total of ``cards`` and whether that total is soft.
+
+    Args:
+        cards (iterable of int): card ranks.
+
+    Return:
+        tuple: (total, soft)
+
+    Examples:
+        >>> handValue([1, 6])
+        (17, True)
+        >>> handValue([1, 6, 10])
+        (17, False)
+    """
+    total = sum(cards)
+    if ACE in cards and total <= 11:
+        return total + 10, True
+    return total, False
+
+
+def _checkPenetration(penetration):
+    if not 0 < penetration <= 1:
+        raise ValueError('penetration must be in (0, 1], got %r' % penetration)
+
+
+class Rules:
+    """House rules for a blackjack table.
+
+    The dealer always peeks for blackjack, so every expected value in this package is
+    conditioned on the dealer not holding a natural.
+
+    Attributes:
+        decks (int, default 6): number of decks in the shoe.
+        hitSoft17 (bool, default False): dealer hits soft 17 (H17) instead of standing (S17).
+        doubleAfterSplit (bool, default True): doubling is allowed after splitting (DAS).
+        surrender (bool, default False): late surrender is offered.
+        blackjackPays (float, default 1.5): payout for a natural.
+        penetration (float, default 0.75): fraction of the shoe dealt before reshuffling.
+
+    Raises:
+        ValueError: if ``penetration`` is not in (0, 1].
+    """
+
+    def __init__(self, decks=6, hitSoft17=False, doubleAfterSplit=True, surrender=False,
+                 blackjackPays=1.5, penetration=0.75):
+        _checkPenetration(penetration)
+        self.decks = decks
+        self.hitSoft17 = hitSoft17
+        self.doubleAfterSplit = doubleAfterSplit
+        self.surrender = surrender
+        self.blackjackPays = blackjackPays
+        self.penetration = penetration
+
+    def key(self):
+        """Short name that identifies the rules which change strategy.
+
+        Penetration does not change the expected value of a hand so it is left out.
+
+        Examples:
+            >>> Rules(decks=2, hitSoft17=True).key()
+            '2d-h17-das-nosurr-bj1.5'
+        """
+        return '{0:d}d-{1}-{2}-{3}-bj{4:g}'.format(
+            self.decks,
+            'h17' if self.hitSoft17 else 's17',
+            'das' if self.doubleAfterSplit else 'nodas',
+            'surr' if self.surrender else 'nosurr',
+            self.blackjackPays)
+
+    def __eq__(self, other):
+        return vars(self) == vars(other)
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return '{class_:s}({args:s})'.format(
+            class_=type(self).__name__,
+            args=', '.join('{0}={1!r}'.format(*item) for item in sorted(vars(self).items())))
+
+
+class Shoe:
+    """One or more shuffled decks and the composition of the cards not yet dealt.
+
+    The composition is updated as each card is dealt so it never has to be recounted.
+    The shoe is normally reshuffled between rounds once the cut card is out, but a deep
+    penetration can run it dry in the middle of a round; :meth:`deal` then reshuffles
+    before dealing, like a dealer who runs out of cards.
+
+    Attributes:
+        decks (int): number of decks.
+        penetration (float): fraction of the shoe dealt before :meth:`needsShuffle` is true.
+        counts (list of int): remaining cards of each rank, indexed by ``rank - 1``.
+        remaining (int): number of cards left to deal.
+        rng (:obj:`random.Random`): source of randomness for shuffling.
+    """
+
+    def __init__(self, decks=6, penetration=0.75, rng=None):
+        _checkPenetration(penetration)
+        self.decks = decks
+        self.penetration = penetration
+        self.rng = random.Random() if rng is None else rng
+        self.cards = [rank for rank, count in zip(RANKS, deckComposition(decks))
+                      for _ in range(count)]
+        self.cutCard = int(len(self.cards) * penetration)
+        self.shuffle()
+
+    def shuffle(self):
+        """Gather every card and shuffle the shoe."""
+        self.rng.shuffle(self.cards)
+        self.position = 0
+        self.counts = list(deckComposition(self.decks))
+        self.remaining = len(self.cards)
+
+    def deal(self):
+        """Deal the next card.
+
+        Return:
+            int: the rank of the card.
+        """
+        if self.isEmpty():
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        self.counts[card - 1] -= 1
+        self.remaining -= 1
+        return card
+
+    def isEmpty(self):
+        """Check whether every card has been dealt.
+
+        Return:
+            bool"""
+        return self.position >= len(self.cards)
+
+    def needsShuffle(self):
+        """Check whether the cut card has been reached.
+
+        Return:
+            bool"""
+        return self.position >= self.cutCard
+
+    def composition(self):
+        """Snapshot of the remaining composition.
+
+        Return:
+            tuple: ten counts indexed by ``rank - 1``.
+        """
+        return tuple(self.counts)
+
+    def seed(self, value):
+        """Reseed the shoe's rng and reshuffle."""
+        self.rng.seed(value)
+        self.cards.sort()
+        self.shuffle()
+
+
+class Hand:
+    """Cards held by the player or the dealer.
+
+    The total is maintained as cards arrive, so looking it up is constant time.
+
+    Attributes:
+        cards (list of int): ranks in the hand.
+        bet (int): amount wagered on the hand.
+        hard (int): total counting every ace as one.
+        doubled (bool): the hand was doubled down.
+        fromSplit (bool): the hand was created by splitting a pair.
+    """
+
+    def __init__(self, bet=0, cards=(), fromSplit=False):
+        self.bet = bet
+        self.cards = []
+        self.hard = 0
+        self.aces = 0
+        self.doubled = False
+        self.fromSplit = fromSplit
+        for card in cards:
+            self.add(card)
+
+    def add(self, card):
+        """Add a card and update the total."""
+        self.cards.append(card)
+        self.hard += card
+        if card == ACE:
+            self.aces += 1
+
+    @property
+    def total(self):
+        """Best total of the hand"""
+        if self.aces and self.hard <= 11:
+            return self.hard + 10
+        return self.hard
+
+    @property
+    def soft(self):
+        """True if an ace is being counted as eleven"""
+        return bool(self.aces) and self.hard <= 11
+
+    def isBlackjack(self):
+        """Check for a natural, which cannot be made after a split."""
+        return len(self.cards) == 2 and self.total == 21 and not self.fromSplit
+
+    def isBust(self):
+        """Check if the total is over 21."""
+        return self.hard > 21
+
+    def isPair(self):
+        """Check if the hand is two cards of the same rank."""
+        return len(self.cards) == 2 and self.cards[0] == self.cards[1]
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __repr__(self):
+        return '{class_:s}({bet!r}, {cards!r})'.format(
+            class_=type(self).__name__, bet=self.bet, cards=self.cards)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""Card counting systems and a counting :obj:`.Player`.
+
+A :obj:`CountSystem` assigns a tag to every rank. The :obj:`CountingPlayer` keeps a
+running count and the number of unseen cards, both updated in constant time from
+:meth:`.Player.observe`, so the true count is one division away and nothing is ever
+rescanned. Bets and strategy deviations are looked up by true count in tables which
+are compiled once when the player is created.
+
+Examples:
+    >>> HI_LO.tag(10), HI_LO.tag(5), HI_LO.tag(8)
+    (-1, 1, 0)
+    >>> KO.initialCount(6)
+    -20
+"""
+
+import logging
+
+from . import players as ply
+from . import strategy as st
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+CARDS_PER_DECK = 52
+
+
+class CountSystem:
+    """Tags for each rank and how the running count turns into an index.
+
+    Attributes:
+        name (str): name of the system.
+        tags (tuple of int): tag of each rank, indexed by ``rank - 1``.
+        balanced (bool): the tags of a full deck sum to zero. Balanced systems divide the
+            running count by the decks remaining; unbalanced ones use the running count
+            as the index and start from :meth:`initialCount` instead.
+    """
+
+    def __init__(self, name, tags, balanced=True):
+        self.name = name
+        self.tags = tuple(tags)
+        self.balanced = balanced
+
+    def tag(self, card):
+        return self.tags[card - 1]
+
+    def initialCount(self, decks):
+        """Running count right after a shuffle.
+
+        Unbalanced systems start below zero so that the key count lands on a fixed value
+        whatever the number of decks.
+        """
+        if self.balanced:
+            return 0
+        return 4 - 4 * decks
+
+    def __repr__(self):
+        return '{class_:s}({name!r}, {tags!r}, balanced={balanced!r})'.format(
+            class_=type(self).__name__, **vars(self))
+
+
+#          A   2  3  4  5  6  7  8   9  10
+HI_LO = CountSystem('Hi-Lo', (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1))
+KO = CountSystem('KO', (-1, 1, 1, 1, 1, 1, 1, 0, 0, -1), balanced=False)
+OMEGA_II = CountSystem('Omega II', (0, 1, 1, 2, 2, 2, 1, 0, -1, -2))
+SYSTEMS = {system.name: system for system in (HI_LO, KO, OMEGA_II)}
+
+# Units bet from this index up, until the next threshold, by system: the same index
+# means a different edge in each.
+RAMPS = {
+    'Hi-Lo': ((-100, 1), (2, 2), (3, 4), (4, 6), (5, 8)),
+    # the index is the running count. From the initial count of CountSystem.initialCount,
+    # the true count is about 4 + (running - 4) / decks remaining: above the pivot of 4
+    # it grows slower than the running count, so the ramp tops out later
+    'KO': ((-100, 1), (0, 2), (2, 4), (4, 6), (8, 8)),
+    # a level two count, whose true count runs close to twice Hi-Lo's
+    'Omega II': ((-100, 1), (4, 2), (6, 4), (8, 6), (10, 8)),
+}
+DEFAULT_RAMP = RAMPS['Hi-Lo']
+
+# Hi-Lo index plays: (hand, upcard) -> (index, action). The action is taken when the true
+# count is at or above the index, except for hits which are taken below it. Otherwise the
+# strategy table decides.
+DEFAULT_DEVIATIONS = {
+    ('hard 16', 10): (0, st.STAND),
+    ('hard 15', 10): (4, st.STAND),
+    ('pair 10', 5): (5, st.SPLIT),
+    ('pair 10', 6): (4, st.SPLIT),
+    ('hard 10', 10): (4, st.DOUBLE),
+    ('hard 12', 3): (2, st.STAND),
+    ('hard 12', 2): (3, st.STAND),
+    ('hard 11', 1): (1, st.DOUBLE),
+    ('hard 9', 2): (1, st.DOUBLE),
+    ('hard 10', 1): (4, st.DOUBLE),
+    ('hard 9', 7): (3, st.DOUBLE),
+    ('hard 16', 9): (5, st.STAND),
+    ('hard 13', 2): (-1, st.HIT),
+    ('hard 12', 4): (0, st.HIT),
+    ('hard 12', 5): (-2, st.HIT),
+    ('hard 12', 6): (-1, st.HIT),
+    ('hard 13', 3): (-2, st.HIT),
+}
+
+
+def compileRamp(ramp, low, high):
+    """Expand ``(index, units)`` thresholds into one entry per index from ``low`` to ``high``.
+
+    Examples:
+        >>> compileRamp(((-100, 1), (2, 3)), 0, 4)
+        [1, 1, 3, 3, 3]
+    """
+    table = []
+    for index in range(low, high + 1):
+        units = ramp[0][1]
+        for threshold, value in ramp:
+            if index >= threshold:
+                units = value
+        table.append(units)
+    return table
+
+
+class CountingPlayer(ply.BasicStrategy):
+    """Player who counts cards, sizes bets by count and deviates from basic strategy.
+
+    Args:
+        rules (:obj:`.Rules`): table rules.
+        system (:obj:`CountSystem`, default :data:`HI_LO`): the count to keep.
+        ramp (tuple, default None): ``(index, units)`` thresholds; the system's entry of
+            :data:`RAMPS`, or :data:`DEFAULT_RAMP` for a system without one, when ``None``.
+        deviations (dict, default :data:`DEFAULT_DEVIATIONS`): index plays.
+        directory (str): where strategy tables are stored.
+
+    Attributes:
+        running (int): running count.
+        unseen (int): cards not yet seen since the last shuffle.
+        unit (int): bet for one unit of the ramp.
+    """
+
+    unit = 10
+    low = -10  # indices beyond these bounds use the bound's entry
+    high = 10
+
+    def __init__(self, rules, system=HI_LO, ramp=None, deviations=None, directory=None):
+        super(CountingPlayer, self).__init__(rules, directory)
+        self.system = system
+        self.tags = system.tags
+        if ramp is None:
+            ramp = RAMPS.get(system.name, DEFAULT_RAMP)
+        self.ramp = compileRamp(ramp, self.low, self.high)
+        if deviations is None:
+            deviations = DEFAULT_DEVIATIONS if system is HI_LO else {}
+        self.deviations = deviations
+        self.shuffled()
+
+    def parameters(self):
+        return {'unit': self.unit, 'system': repr(self.system), 'ramp': self.ramp,
+                'deviations': sorted(map(repr, self.deviations.items()))}
+
+    def shuffled(self):
+        """Reset the count for a fresh shoe."""
+        self.running = self.system.initialCount(self.rules.decks)
+        self.unseen = self.rules.decks * CARDS_PER_DECK
+
+    def observe(self, card):
+        """Update the running count and the unseen cards."""
+        self.running += self.tags[card - 1]
+        self.unseen -= 1
+
+    def trueCount(self):
+        """Running count per deck remaining, floored; the running count for unbalanced systems.
+
+        Return:
+            int
+        """
+        if not self.system.balanced:
+            return self.running
+        return self.running * CARDS_PER_DECK // max(self.unseen, 1)
+
+    def placeBets(self):
+        """Bet the ramp's units for the current true count."""
+        index = min(max(self.trueCount(), self.low), self.high)
+        amount = self.unit * self.ramp[index - self.low]
+        return self._placeBets_helper(min(amount, self.stake))
+
+    def decide(self, hand, upcard, allowed):
+        """Index play when the count calls for it, otherwise the strategy table.
+
+        A pair is looked up as a pair while it may still be split, and by its total
+        whether or not it may, so ``8,8`` against a ten follows the ``hard 16`` index.
+        """
+        if self.deviations:
+            names = ['%s %d' % ('soft' if hand.soft else 'hard', hand.total)]
+            if hand.isPair() and st.SPLIT in allowed:
+                names.insert(0, 'pair %d' % hand.cards[0])  # a pair is also a total
+            for name in names:
+                play = self.deviations.get((name, upcard))
+                if play is not None:
+                    index, action = play
+                    count = self.trueCount()
+                    taken = count >= index if action != st.HIT else count < index
+                    if taken and action in allowed:
+                        return action
+        return self.strategy.bestAction(hand, upcard, allowed)
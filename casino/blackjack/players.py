@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""Players and the game loop for blackjack.
+
+A :obj:`Player` decides how much to bet and how to play each hand; the :obj:`Game`
+deals the cards, enforces the :obj:`.Rules` and settles the hands. :obj:`BasicStrategy`
+plays the composition dependent strategy computed by :mod:`.strategy`, loading the
+table from disk when it has already been solved.
+"""
+
+import logging
+from abc import ABCMeta, abstractmethod
+
+from . import board as bd
+from . import strategy as st
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+
+class Player(metaclass=ABCMeta):
+    """This is a base class for designing blackjack players.
+
+    Note:
+        Subclass must implement :meth:`.placeBets()` and :meth:`.decide()`\.
+
+    Attributes:
+        rules (:obj:`.Rules`): the rules of the table the player sits at.
+        stake (int, default 1000): the :obj:`Player`\'s current stake.
+        roundsToGo (int, default 100): the number of rounds to play.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.stake = 1000  # default, can be set with method
+        self.roundsToGo = 100  # default, can be set with method
+
+    def _placeBets_helper(self, amount):
+        self.stake -= amount
+        self.roundsToGo -= 1
+        return amount
+
+    @abstractmethod
+    def placeBets(self):
+        """Wager on the next round.
+
+        Return:
+            int: the amount bet, already taken from :attr:`stake`.
+        """
+        pass
+
+    @abstractmethod
+    def decide(self, hand, upcard, allowed):
+        """Choose how to play ``hand``.
+
+        Args:
+            hand (:obj:`.Hand`): the hand to play.
+            upcard (int): the dealer's exposed card.
+            allowed (tuple of str): the actions the :obj:`Game` permits right now.
+
+        Return:
+            str: one of ``allowed``.
+        """
+        pass
+
+    def observe(self, card):
+        """Notification from :obj:`Game` that ``card`` has been exposed.
+
+        Called once for every card the player can see, including the dealer's hole card
+        when it is turned over. The default player ignores it.
+        """
+        pass
+
+    def shuffled(self):
+        """Notification from :obj:`Game` that the shoe has been reshuffled."""
+        pass
+
+    def settle(self, hand, amount):
+        """Notification from :obj:`Game` that ``hand`` returned ``amount``, stake included.
+
+        Args:
+            hand (:obj:`.Hand`): the settled hand.
+            amount (float): zero when the hand lost.
+        """
+        self.stake += amount
+
+    def playing(self):
+        """Check if the :obj:`Player` stills wants to play.
+
+        Return:
+            bool"""
+        return self.roundsToGo > 0 and self.stake > 0
+
+    def setStake(self, stake):
+        self.stake = stake
+
+    def setRounds(self, rounds):
+        self.roundsToGo = rounds
+
+    def reset(self):
+        """Forget strategy state at the start of a session. The default player has none."""
+        pass
+
+    def parameters(self):
+        """Settings which change how the player bets, used to identify cached results.
+
+        Return:
+            dict: the default player has none.
+        """
+        return {}
+
+
+class BasicStrategy(Player):
+    """Flat bettor who always takes the action with the best expected value.
+
+    The :obj:`.StrategyTable` is loaded with :meth:`.StrategyTable.fromRules`, which
+    reads it from ``directory`` or solves and saves it the first time.
+
+    Attributes:
+        amount (int): flat bet.
+        strategy (:obj:`.StrategyTable`): expected values for every hand.
+    """
+
+    amount = 10
+    directory = st.DEFAULT_DIRECTORY
+
+    def __init__(self, rules, directory=None):
+        super(BasicStrategy, self).__init__(rules)  # call abc __init__
+        if directory is None:
+            directory = self.directory
+        self.strategy = st.StrategyTable.fromRules(rules, directory)
+
+    def placeBets(self):
+        """Flat bet of :attr:`amount`, or whatever is left of the stake."""
+        return self._placeBets_helper(min(self.amount, self.stake))
+
+    def parameters(self):
+        return {'amount': self.amount}
+
+    def decide(self, hand, upcard, allowed):
+        """Best action from the strategy table"""
+        return self.strategy.bestAction(hand, upcard, allowed)
+
+
+class Game:
+    """manages the sequence of actions that defines the game of blackjack
+
+    The dealer peeks for blackjack before the player acts. Pairs may be split once and
+    split aces receive a single card each.
+
+    Attributes:
+        rules (:obj:`.Rules`): the rules of the table.
+        shoe (:obj:`.Shoe`): the cards, reshuffled between rounds once the cut card is out.
+    """
+
+    def __init__(self, rules, shoe=None):
+        self.rules = rules
+        if shoe is None:
+            shoe = bd.Shoe(rules.decks, rules.penetration)
+        self.shoe = shoe
+
+    def seed(self, value):
+        """Reseed and reshuffle the shoe; players hear about it on the next round"""
+        self.shoe.seed(value)
+
+    def fingerprint(self):
+        """Rules and penetration, used to identify cached results."""
+        return '{0:s}/{1!r}'.format(self.rules.key(), self.shoe.penetration)
+
+    def _deal(self, player, exposed=True):
+        if self.shoe.isEmpty():
+            self.shoe.shuffle()  # ran dry mid-round
+            player.shuffled()
+        card = self.shoe.deal()
+        if exposed:
+            player.observe(card)
+        return card
+
+    def _allowed(self, player, hand, split):
+        if len(hand) > 2:
+            return (st.STAND, st.HIT)
+        allowed = [st.STAND, st.HIT]
+        if player.stake >= hand.bet:
+            if not hand.fromSplit or self.rules.doubleAfterSplit:
+                allowed.append(st.DOUBLE)
+            if hand.isPair() and not split:
+                allowed.append(st.SPLIT)
+        if self.rules.surrender and not split:
+            allowed.append(st.SURRENDER)
+        return tuple(allowed)
+
+    def _play(self, player, hand, upcard, split):
+        """Let the player act on ``hand``; returns the hands it turned into."""
+        while not hand.isBust() and hand.total < 21:
+            action = player.decide(hand, upcard, self._allowed(player, hand, split))
+            if action == st.STAND:
+                break
+            elif action == st.HIT:
+                hand.add(self._deal(player))
+            elif action == st.DOUBLE:
+                player.stake -= hand.bet
+                hand.bet *= 2
+                hand.doubled = True
+                hand.add(self._deal(player))
+                break
+            elif action == st.SPLIT:
+                player.stake -= hand.bet
+                card = hand.cards[0]
+                hands = []
+                for _ in range(2):
+                    new = bd.Hand(hand.bet, (card, self._deal(player)), fromSplit=True)
+                    if card == bd.ACE:
+                        hands.append(new)
+                    else:
+                        hands.extend(self._play(player, new, upcard, True))
+                return hands
+            elif action == st.SURRENDER:
+                player.settle(hand, hand.bet / 2)
+                return []
+            else:
+                raise ValueError('unknown action %r' % action)
+        return [hand]
+
+    def cycle(self, player):
+        """Executes a single round of play.
+
+        Cycle:
+            1. reshuffle if the cut card has been reached.
+            2. call the :meth:`Player.placeBets()` to get the bet.
+            3. deal, settle naturals, then let the player act.
+            4. play the dealer's hand and call :meth:`Player.settle()` for every hand.
+
+        Every exposed card is passed to :meth:`Player.observe()` as it is dealt; the
+        dealer's hole card is passed when it is turned over.
+
+        Args:
+            player (:obj:`Player`): the individual player that places bets,
+                receives winnings and pays losses.
+        """
+        if not player.playing():
+            return
+        if self.shoe.needsShuffle():
+            self.shoe.shuffle()
+        if self.shoe.position == 0:
+            player.shuffled()
+        hand = bd.Hand(player.placeBets())
+        hand.add(self._deal(player))
+        dealer = bd.Hand(cards=(self._deal(player),))
+        hand.add(self._deal(player))
+        dealer.add(self._deal(player, exposed=False))  # hole card
+        upcard = dealer.cards[0]
+        if dealer.isBlackjack():
+            player.observe(dealer.cards[1])
+            player.settle(hand, hand.bet if hand.isBlackjack() else 0)
+            return
+        if hand.isBlackjack():
+            player.observe(dealer.cards[1])
+            player.settle(hand, hand.bet * (1 + self.rules.blackjackPays))
+            return
+        hands = self._play(player, hand, upcard, False)
+        player.observe(dealer.cards[1])
+        if any(not h.isBust() for h in hands):
+            while dealer.total < 17 or (dealer.total == 17 and dealer.soft
+                                        and self.rules.hitSoft17):
+                dealer.add(self._deal(player))
+        for h in hands:
+            if h.isBust():
+                player.settle(h, 0)
+            elif dealer.isBust() or h.total > dealer.total:
+                player.settle(h, 2 * h.bet)
+            elif h.total == dealer.total:
+                player.settle(h, h.bet)
+            else:
+                player.settle(h, 0)
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""Expected value solver for blackjack strategy tables.
+
+The solver computes the expected value of standing, hitting, doubling, splitting and
+surrendering for every two card player hand against every dealer upcard. It is
+composition dependent: the player's two cards and the upcard are removed from the
+shoe before the dealer's outcome probabilities are computed, and every card the
+dealer or player draws afterwards is removed as well.
+
+Dealer outcome probabilities are found recursively over the remaining shoe
+composition and memoized on it, so the many hands which lead to the same dealer
+state only pay for it once. Solving a six deck shoe still takes a while, so the
+resulting :obj:`StrategyTable` is written to disk and strategy players load it at
+startup instead of recomputing it.
+
+Examples:
+    >>> from .board import Rules
+    >>> table = StrategyTable.fromRules(Rules(decks=1), directory=None)  # doctest: +SKIP
+    >>> table.bestAction(Hand(10, [10, 6]), 10)  # doctest: +SKIP
+    'hit'
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+
+from .board import ACE, RANKS, TEN, Hand, Rules, deckComposition
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+STAND = 'stand'
+HIT = 'hit'
+DOUBLE = 'double'
+SPLIT = 'split'
+SURRENDER = 'surrender'
+ACTIONS = (STAND, HIT, DOUBLE, SPLIT, SURRENDER)
+
+BUST = 5  # index of the bust probability in a dealer outcome vector, 0 to 4 are 17 to 21
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.casino', 'blackjack')
+
+
+def _remove(counts, rank):
+    """Composition ``counts`` with one card of ``rank`` taken out."""
+    index = rank - 1
+    return counts[:index] + (counts[index] - 1,) + counts[index + 1:]
+
+
+@lru_cache(maxsize=None)
+def _dealerOutcomes(hard, hasAce, counts, hitSoft17):
+    """Probability of each final dealer total from a dealer hand and shoe composition.
+
+    Args:
+        hard (int): dealer total counting aces as one.
+        hasAce (bool): the dealer holds at least one ace.
+        counts (tuple): remaining composition.
+        hitSoft17 (bool): dealer hits soft 17.
+
+    Return:
+        tuple: probabilities of finishing on 17, 18, 19, 20, 21 and bust.
+    """
+    if hard > 21:
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+    soft = hasAce and hard <= 11
+    total = hard + 10 if soft else hard
+    if total > 17 or (total == 17 and not (soft and hitSoft17)):
+        outcome = [0.0] * 6
+        outcome[total - 17] = 1.0
+        return tuple(outcome)
+    remaining = sum(counts)
+    result = [0.0] * 6
+    for rank, count in zip(RANKS, counts):
+        if count:
+            chance = count / remaining
+            sub = _dealerOutcomes(hard + rank, hasAce or rank == ACE,
+                                  _remove(counts, rank), hitSoft17)
+            for i in range(6):
+                result[i] += chance * sub[i]
+    return tuple(result)
+
+
+def dealerProbabilities(upcard, counts, hitSoft17=False):
+    """Final dealer totals given the upcard, assuming the dealer has peeked for blackjack.
+
+    Args:
+        upcard (int): dealer's exposed card.
+        counts (tuple): composition with the upcard and any known cards already removed.
+        hitSoft17 (bool): dealer hits soft 17.
+
+    Return:
+        tuple: probabilities of finishing on 17, 18, 19, 20, 21 and bust.
+
+    Examples:
+        >>> probs = dealerProbabilities(6, _remove(deckComposition(1), 6))
+        >>> round(probs[BUST], 4)
+        0.4208
+    """
+    excluded = {ACE: TEN, TEN: ACE}.get(upcard)
+    remaining = sum(count for rank, count in zip(RANKS, counts) if rank != excluded)
+    result = [0.0] * 6
+    for rank, count in zip(RANKS, counts):
+        if count and rank != excluded:
+            chance = count / remaining
+            sub = _dealerOutcomes(upcard + rank, upcard == ACE or rank == ACE,
+                                  _remove(counts, rank), hitSoft17)
+            for i in range(6):
+                result[i] += chance * sub[i]
+    return tuple(result)
+
+
+def standValue(total, dealer):
+    """Expected value of standing on ``total`` against dealer outcome probabilities."""
+    if total > 21:
+        return -1.0
+    win = dealer[BUST]
+    lose = 0.0
+    for i in range(5):
+        if 17 + i < total:
+            win += dealer[i]
+        elif 17 + i > total:
+            lose += dealer[i]
+    return win - lose
+
+
+class _HandSolver:
+    """Player side recursion for one dealer outcome vector.
+
+    Hitting removes cards from the composition, so the memo is keyed on it as well.
+    """
+
+    def __init__(self, dealer):
+        self.dealer = dealer
+        self.memo = {}
+
+    def best(self, hard, hasAce, counts):
+        """Best of standing and hitting, without doubling."""
+        key = (hard, hasAce, counts)
+        value = self.memo.get(key)
+        if value is None:
+            value = max(self.stand(hard, hasAce), self.hit(hard, hasAce, counts))
+            self.memo[key] = value
+        return value
+
+    def stand(self, hard, hasAce):
+        if hasAce and hard <= 11:
+            return standValue(hard + 10, self.dealer)
+        return standValue(hard, self.dealer)
+
+    def hit(self, hard, hasAce, counts):
+        if hard >= 21:
+            return -1.0 if hard > 21 else self.stand(hard, hasAce)
+        remaining = sum(counts)
+        value = 0.0
+        for rank, count in zip(RANKS, counts):
+            if count:
+                nextHard = hard + rank
+                if nextHard > 21:
+                    value -= count / remaining
+                else:
+                    value += count / remaining * self.best(
+                        nextHard, hasAce or rank == ACE, _remove(counts, rank))
+        return value
+
+    def double(self, hard, hasAce, counts):
+        remaining = sum(counts)
+        value = 0.0
+        for rank, count in zip(RANKS, counts):
+            if count:
+                value += count / remaining * self.stand(hard + rank, hasAce or rank == ACE)
+        return 2 * value
+
+
+class StrategySolver:
+    """Builds a :obj:`StrategyTable` for one set of :obj:`.Rules`.
+
+    Attributes:
+        rules (:obj:`.Rules`): the rules to solve for.
+        counts (tuple): composition of the full shoe.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.counts = deckComposition(rules.decks)
+
+    def pairValues(self, first, second, upcard):
+        """Expected value of every legal action for a two card hand.
+
+        Args:
+            first (int): first player card.
+            second (int): second player card.
+            upcard (int): dealer's exposed card.
+
+        Return:
+            dict: action name to expected value per unit bet.
+        """
+        counts = _remove(_remove(_remove(self.counts, upcard), first), second)
+        dealer = dealerProbabilities(upcard, counts, self.rules.hitSoft17)
+        solver = _HandSolver(dealer)
+        hard, hasAce = first + second, ACE in (first, second)
+        if hasAce and hard == 11:
+            return {STAND: self.rules.blackjackPays}
+        values = {
+            STAND: solver.stand(hard, hasAce),
+            HIT: solver.hit(hard, hasAce, counts),
+            DOUBLE: solver.double(hard, hasAce, counts),
+        }
+        if self.rules.surrender:
+            values[SURRENDER] = -0.5
+        if first == second:
+            values[SPLIT] = self._splitValue(first, counts, solver)
+        return values
+
+    def _splitValue(self, card, counts, solver):
+        """Two hands, each starting with ``card``; split aces receive one card only."""
+        remaining = sum(counts)
+        value = 0.0
+        for rank, count in zip(RANKS, counts):
+            if not count:
+                continue
+            hard, hasAce = card + rank, card == ACE or rank == ACE
+            if card == ACE:
+                hand = solver.stand(hard, hasAce)
+            else:
+                after = _remove(counts, rank)
+                hand = solver.best(hard, hasAce, after)
+                if self.rules.doubleAfterSplit:
+                    hand = max(hand, solver.double(hard, hasAce, after))
+            value += count / remaining * hand
+        return 2 * value
+
+    def totalValues(self, upcard):
+        """Stand and hit values by total, used once a hand has three or more cards.
+
+        Only the upcard is removed from the shoe, so these values are total dependent.
+
+        Return:
+            dict: ``'hard 16'`` style keys to ``{action: value}``.
+        """
+        counts = _remove(self.counts, upcard)
+        solver = _HandSolver(dealerProbabilities(upcard, counts, self.rules.hitSoft17))
+        values = {}
+        for total in range(4, 22):
+            values['hard %d' % total] = {STAND: solver.stand(total, False),
+                                         HIT: solver.hit(total, False, counts)}
+        for total in range(12, 22):
+            values['soft %d' % total] = {STAND: solver.stand(total - 10, True),
+                                         HIT: solver.hit(total - 10, True, counts)}
+        return values
+
+    def solve(self):
+        """Solve every hand against every upcard.
+
+        Return:
+            :obj:`StrategyTable`
+        """
+        entries = {}
+        for upcard in RANKS:
+            LOGGER.debug('solving upcard %d for %s', upcard, self.rules.key())
+            for first in RANKS:
+                for second in RANKS[first - 1:]:
+                    key = StrategyTable.entryKey('%d,%d' % (first, second), upcard)
+                    entries[key] = self.pairValues(first, second, upcard)
+            for name, values in self.totalValues(upcard).items():
+                entries[StrategyTable.entryKey(name, upcard)] = values
+        _dealerOutcomes.cache_clear()  # the memo is only shared within one shoe
+        return StrategyTable(self.rules, entries)
+
+
+class StrategyTable:
+    """Expected values of every action for every hand and upcard.
+
+    Tables are keyed by the rules which produced them and are cached both in memory and
+    on disk, so creating many players for the same rules costs one file read at most.
+
+    Attributes:
+        rules (:obj:`.Rules`): the rules the table was solved for.
+        entries (dict): ``'<upcard>:<hand>'`` keys to ``{action: value}``.
+    """
+
+    _loaded = {}
+
+    def __init__(self, rules, entries):
+        self.rules = rules
+        self.entries = entries
+
+    @staticmethod
+    def entryKey(hand, upcard):
+        return '%d:%s' % (upcard, hand)
+
+    @staticmethod
+    def handKey(hand):
+        """Key of a :obj:`.Hand`: its cards when there are two, otherwise its total."""
+        if len(hand) == 2:
+            return '%d,%d' % tuple(sorted(hand.cards))
+        return '%s %d' % ('soft' if hand.soft else 'hard', hand.total)
+
+    def values(self, hand, upcard):
+        """Action values for ``hand`` against ``upcard``.
+
+        Return:
+            dict: action name to expected value per unit bet.
+        """
+        return self.entries[self.entryKey(self.handKey(hand), upcard)]
+
+    def bestAction(self, hand, upcard, allowed=ACTIONS):
+        """Action with the highest expected value among the ``allowed`` ones.
+
+        Args:
+            hand (:obj:`.Hand`): the player's hand.
+            upcard (int): the dealer's exposed card.
+            allowed (iterable of str): actions the table permits right now.
+
+        Return:
+            str
+        """
+        values = self.values(hand, upcard)
+        return max((action for action in values if action in allowed), key=values.get)
+
+    def save(self, path):
+        """Write the table to ``path`` as JSON, atomically."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump({'rules': vars(self.rules), 'entries': self.entries}, handle)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a table written by :meth:`save`."""
+        with open(path) as handle:
+            data = json.load(handle)
+        return cls(Rules(**data['rules']), data['entries'])
+
+    @staticmethod
+    def path(rules, directory=DEFAULT_DIRECTORY):
+        return os.path.join(directory, 'strategy-%s.json' % rules.key())
+
+    @classmethod
+    def fromRules(cls, rules, directory=DEFAULT_DIRECTORY):
+        """Load the table for ``rules``, solving and saving it on first use.
+
+        Args:
+            rules (:obj:`.Rules`): the table rules.
+            directory (str or None): where tables are stored. ``None`` disables the disk cache.
+
+        Return:
+            :obj:`StrategyTable`
+        """
+        key = (rules.key(), directory)
+        if key in cls._loaded:
+            return cls._loaded[key]
+        path = None if directory is None else cls.path(rules, directory)
+        if path is not None and os.path.exists(path):
+            table = cls.load(path)
+        else:
+            LOGGER.info('solving strategy table for %s', rules.key())
+            table = StrategySolver(rules).solve()
+            if path is not None:
+                table.save(path)
+        cls._loaded[key] = table
+        return table
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""Content addressed cache of seeded :obj:`.Simulator` results.
+
+A seeded simulation is a pure function of its configuration, so its statistics can be
+reused. The cache key is a digest of:
+
+    * the player class and its :meth:`parameters`,
+    * the game's :meth:`fingerprint`, i.e. the wheel layout and table limits,
+    * the initial stake and duration,
+    * the seed,
+    * the code version: a digest of the package's source.
+
+The number of samples is deliberately left out. Session ``i`` of a seeded run is the
+same whatever the sample count, so a run asking for more samples than are cached plays
+only the missing sessions and merges them into the cached accumulators. A run asking
+for exactly the cached count is answered without playing. Accumulators cannot be
+truncated, so a run asking for fewer samples than are cached plays every session again
+and leaves the larger entry in place.
+
+Entries live in a small in-memory LRU in front of an optional directory of JSON files,
+which is kept under a byte budget by evicting the least recently used files.
+
+Examples:
+    >>> cache = ResultCache(directory=os.path.expanduser('~/.casino/results'))  # doctest: +SKIP
+    >>> simulator = Simulator(game, player, seed=1, cache=cache)  # doctest: +SKIP
+    >>> result = simulator.run()  # plays 50 sessions  # doctest: +SKIP
+    >>> simulator.samples = 80  # doctest: +SKIP
+    >>> result = simulator.run()  # plays sessions 50 to 79 only  # doctest: +SKIP
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+
+from . import simulation as sim
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+_version = {}
+
+
+def codeVersion():
+    """Digest of every module in the package, tests excluded, computed once per process."""
+    if 'digest' not in _version:
+        root = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for directory, subdirectories, files in os.walk(root):
+            subdirectories[:] = sorted(d for d in subdirectories
+                                       if d not in ('test', '__pycache__'))
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    path = os.path.join(directory, name)
+                    digest.update(os.path.relpath(path, root).encode())
+                    with open(path, 'rb') as handle:
+                        digest.update(handle.read())
+        _version['digest'] = digest.hexdigest()
+    return _version['digest']
+
+
+def cacheKey(simulator):
+    """Content address of a simulator's configuration.
+
+    Return:
+        str: hex digest.
+    """
+    player = simulator.player
+    description = {
+        'player': '{0}.{1}'.format(type(player).__module__, type(player).__qualname__),
+        'parameters': player.parameters(),
+        'game': simulator.game.fingerprint(),
+        'initStake': simulator.initStake,
+        'initDuration': simulator.initDuration,
+        'seed': simulator.seed,
+        'code': codeVersion(),
+    }
+    text = json.dumps(description, sort_keys=True, default=repr)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """Two tier cache of :obj:`.SimulationResult`\\s.
+
+    Args:
+        entries (int, default 256): results kept in memory.
+        directory (str, default None): where results are written; ``None`` keeps the
+            cache in memory only.
+        maxBytes (int, default 64 MiB): size budget of ``directory``.
+
+    Attributes:
+        hits (int): lookups answered by either tier.
+        misses (int): lookups answered by neither.
+    """
+
+    def __init__(self, entries=256, directory=None, maxBytes=64 * 2 ** 20):
+        self.entries = entries
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        """Cached result for ``key``, or ``None``.
+
+        Return:
+            :obj:`.SimulationResult`: a fresh copy, safe to merge into.
+        """
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory.move_to_end(key)
+        elif self.directory is not None and os.path.exists(self._path(key)):
+            path = self._path(key)
+            with open(path) as handle:
+                data = json.load(handle)
+            os.utime(path)  # mark as recently used
+            self._remember(key, data)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return sim.SimulationResult.fromDict(data)
+
+    def put(self, key, result):
+        """Store ``result`` under ``key`` in both tiers."""
+        data = result.toDict()
+        self._remember(key, data)
+        if self.directory is not None:
+            path = self._path(key)
+            temporary = path + '.tmp'
+            with open(temporary, 'w') as handle:
+                json.dump(data, handle)
+            os.replace(temporary, path)
+            self._evict()
+
+    def _remember(self, key, data):
+        self.memory[key] = data
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.entries:
+            self.memory.popitem(last=False)
+
+    def _evict(self):
+        """Delete the least recently used files until the directory fits the budget."""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                status = os.stat(os.path.join(self.directory, name))
+                files.append((status.st_mtime, status.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.maxBytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            self.memory.pop(name[:-len('.json')], None)
+            total -= size
+
+    def lookup(self, simulator):
+        """Cached result for ``simulator``'s configuration, or ``None``."""
+        return self.get(cacheKey(simulator))
+
+    def store(self, simulator, result):
+        """Cache ``result`` unless a result with more samples is already cached.
+
+        Both tiers are checked, so a short run never replaces a longer result which only
+        survives on disk.
+        """
+        key = cacheKey(simulator)
+        data = self.memory.get(key)
+        if data is None and self.directory is not None and os.path.exists(self._path(key)):
+            with open(self._path(key)) as handle:
+                data = json.load(handle)
+        if data is not None and data['durations']['count'] >= result.samples:
+            return
+        self.put(key, result)
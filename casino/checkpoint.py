@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Checkpoints which let a long :obj:`.Simulator` run survive the death of its process.
+
+A :obj:`Checkpoint` given to a simulator is written every :attr:`~Checkpoint.interval`
+seconds, between batches of sessions, to a single compact JSON file which replaces the
+previous one atomically. It holds:
+
+    * the configuration of the run: the :func:`.cacheKey` of the simulator, which covers
+      the player and its parameters, the game, stake, duration, seed and code version,
+      plus the range of sessions asked for,
+    * the sessions completed and the accumulators of their statistics,
+    * the seed the sessions are played with, which matters for an unseeded run on worker
+      processes since it draws one,
+    * for an unseeded run in this process, the game's random state from
+      ``game.getstate()``, as its sessions carry on from one another.
+
+Running the same simulator again with the same checkpoint picks up after the last
+completed session and gives bit for bit the result of an uninterrupted run. Only the
+sessions played after resuming reach the result sinks. The file is removed once the run
+completes.
+
+Examples:
+    >>> simulator = Simulator(game, player, samples=10 ** 6, seed=1,
+    ...                       checkpoint=Checkpoint('martingale.ckpt'))  # doctest: +SKIP
+    >>> simulator.run()  # killed, then started again: resumes  # doctest: +SKIP
+"""
+
+import json
+import logging
+import os
+import time
+
+from . import cache as ch
+from . import simulation as sim
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+VERSION = 1
+
+
+class Checkpoint:
+    """Periodic, atomic snapshots of a running :obj:`.Simulator`.
+
+    Args:
+        path (str): checkpoint file.
+        interval (float, default 60): least seconds between two writes; ``0`` writes
+            after every batch.
+
+    Attributes:
+        writes (int): checkpoints written by this object.
+        seconds (float): time spent writing them, the overhead of checkpointing.
+    """
+
+    def __init__(self, path, interval=60.0):
+        self.path = path
+        self.interval = interval
+        self.writes = 0
+        self.seconds = 0.0
+        self.run = None
+        self.last = time.monotonic()
+
+    def begin(self, simulator, start, stop):
+        """Start checkpointing a run and pick up an earlier attempt at it.
+
+        Return:
+            tuple: ``(result, start, seed)`` to carry on from, or ``None``.
+
+        Raises:
+            ValueError: if the file belongs to another run, or the run is unseeded and
+                the game cannot save its random state.
+        """
+        self.run = {'version': VERSION, 'key': ch.cacheKey(simulator),
+                    'start': start, 'stop': stop}
+        self.last = time.monotonic()
+        if simulator.seed is None and isinstance(simulator.executor, sim.ScalarExecutor) \
+                and not hasattr(simulator.game, 'getstate'):
+            raise ValueError('an unseeded run needs game.getstate() to be checkpointed')
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as handle:
+            data = json.load(handle)
+        if data['run'] != self.run:
+            raise ValueError('%s is the checkpoint of another run' % self.path)
+        if data['state'] is not None:
+            simulator.game.setstate(data['state'])
+        LOGGER.info('resuming at session %d of %d', data['position'], stop)
+        return sim.SimulationResult.fromDict(data['result']), data['position'], data['seed']
+
+    def update(self, simulator, result, position):
+        """Write a checkpoint if :attr:`interval` has passed since the last one."""
+        if time.monotonic() - self.last >= self.interval:
+            self.save(simulator, result, position)
+
+    def save(self, simulator, result, position):
+        """Write a checkpoint of ``result`` with sessions up to ``position`` completed."""
+        begun = time.monotonic()
+        state = simulator.game.getstate() if simulator.seed is None else None
+        data = {'run': self.run, 'position': position, 'seed': simulator.seed,
+                'result': result.toDict(), 'state': state}
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(data, handle, separators=(',', ':'))
+        os.replace(temporary, self.path)
+        self.last = time.monotonic()
+        self.writes += 1
+        self.seconds += self.last - begun
+
+    def finish(self):
+        """Remove the file of a completed run and log the overhead."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        LOGGER.info('wrote %d checkpoints in %.3fs', self.writes, self.seconds)
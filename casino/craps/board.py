@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""Bets, dice and the resolution tables of craps.
+
+Every bet a player may have on the layout has an id, its position in :data:`BETS`. A
+player's bets are an int used as a bitset, with bit ``id`` set while the bet is on the
+layout, and a list of amounts indexed by id. A come bet travels to its own id, e.g.
+``'Come 5'``, when its point is rolled.
+
+There are 15 kinds of roll: the 11 sums of two dice, with 4, 6, 8 and 10 told apart as
+the hard way, a pair, or the easy way. What a roll does to each bet depends on the kind
+of roll and on the point, so it is worked out once, at import, for every *phase* (no
+point, or a point of 4, 5, 6, 8, 9 or 10) and kind of roll, into a :obj:`Resolution`:
+bitsets of the bets which win, lose, are returned or travel, and what the winners pay.
+Settling a roll for a player is then a few ``&`` of ints plus a step for each bet which
+the roll decided, however many bets are on the layout.
+
+Bets which are off on the come out roll (odds, place bets and hardways) are not in any
+bitset of the no point phase, except that the odds of come bets are returned when their
+come bet is decided.
+
+Examples:
+    >>> ROLLS[rollKind(4, 4)], ROLLS[rollKind(3, 5)]
+    ((8, True), (8, False))
+    >>> resolution = RESOLUTIONS[phaseOf(8)][rollKind(4, 4)]
+    >>> sorted(BETS[bet] for bet in bits(resolution.wins))
+    ['Come 8', 'Come odds 8', 'Hard 8', 'Pass', 'Pass odds', 'Place 8']
+    >>> resolution.payout(ID['Hard 8'], 10), resolution.payout(ID['Place 8'], 6)
+    (100, 13)
+"""
+
+import logging
+import random
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+POINTS = (4, 5, 6, 8, 9, 10)
+HARDWAYS = (4, 6, 8, 10)
+PHASES = (0,) + POINTS  # no point, then each point
+ROLLS = tuple((total, hard) for total in range(2, 13)
+              for hard in ((False, True) if total in HARDWAYS else (False,)))
+
+BETS = (('Pass', 'Pass odds', "Don't pass", 'Come', 'Field')
+        + tuple('Come %d' % number for number in POINTS)
+        + tuple('Come odds %d' % number for number in POINTS)
+        + tuple('Place %d' % number for number in POINTS)
+        + tuple('Hard %d' % number for number in HARDWAYS))
+ID = {name: bet for bet, name in enumerate(BETS)}
+
+ODDS = {4: (2, 1), 5: (3, 2), 6: (6, 5), 8: (6, 5), 9: (3, 2), 10: (2, 1)}  # true odds
+PLACE = {4: (9, 5), 5: (7, 5), 6: (7, 6), 8: (7, 6), 9: (7, 5), 10: (9, 5)}
+HARD = {4: (7, 1), 6: (9, 1), 8: (9, 1), 10: (7, 1)}
+FIELD = {2: (2, 1), 3: (1, 1), 4: (1, 1), 9: (1, 1), 10: (1, 1), 11: (1, 1), 12: (2, 1)}
+
+# bets which cannot be taken down once made
+CONTRACT = sum(1 << ID[name] for name in BETS
+               if name in ('Pass', "Don't pass", 'Come') or name.startswith('Come ')
+               and not name.startswith('Come odds'))
+
+PHASE = {point: phase for phase, point in enumerate(PHASES)}
+WIN, LOSE, PUSH, TRAVEL = 'win', 'lose', 'push', 'travel'
+
+
+def rollKind(first, second):
+    """Kind of roll of two dice, a position in :data:`ROLLS`."""
+    total = first + second
+    return ROLLS.index((total, first == second and total in HARDWAYS))
+
+
+def phaseOf(point):
+    """Phase of ``point``, a position in :data:`PHASES`; ``0`` for no point."""
+    return PHASE[point]
+
+
+def bits(mask):
+    """Ids of the bets in the bitset ``mask``, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def decide(name, point, total, hard):
+    """What a roll does to a bet, by the rules of the game.
+
+    Args:
+        name (str): the bet, one of :data:`BETS`.
+        point (int): the point, ``0`` if there is none.
+        total (int): sum of the dice.
+        hard (bool): the dice are a pair.
+
+    Return:
+        tuple: ``(what, pays)``: :data:`WIN` with the odds paid as ``(numerator,
+        denominator)``, :data:`LOSE`, :data:`PUSH`, :data:`TRAVEL` with the id of the
+        bet it travels to, or ``None`` if the bet stays as it is.
+    """
+    if name == 'Pass':
+        if not point:
+            return (WIN, (1, 1)) if total in (7, 11) else (LOSE, None) if total in (2, 3, 12) \
+                else None
+        return (WIN, (1, 1)) if total == point else (LOSE, None) if total == 7 else None
+    if name == 'Pass odds':
+        if not point:
+            return None
+        return (WIN, ODDS[point]) if total == point else (LOSE, None) if total == 7 else None
+    if name == "Don't pass":
+        if not point:
+            return (WIN, (1, 1)) if total in (2, 3) else (PUSH, None) if total == 12 \
+                else (LOSE, None) if total in (7, 11) else None
+        return (WIN, (1, 1)) if total == 7 else (LOSE, None) if total == point else None
+    if name == 'Come':
+        return (WIN, (1, 1)) if total in (7, 11) else (LOSE, None) if total in (2, 3, 12) \
+            else (TRAVEL, ID['Come %d' % total])
+    if name == 'Field':
+        return (WIN, FIELD[total]) if total in FIELD else (LOSE, None)
+    kind, number = name.rsplit(' ', 1)
+    number = int(number)
+    if kind == 'Come':
+        return (WIN, (1, 1)) if total == number else (LOSE, None) if total == 7 else None
+    if kind == 'Come odds':
+        if not point:  # off, and returned once the come bet is decided
+            return (PUSH, None) if total in (number, 7) else None
+        return (WIN, ODDS[number]) if total == number else (LOSE, None) if total == 7 else None
+    if not point:  # place bets and hardways are off on the come out roll
+        return None
+    if kind == 'Place':
+        return (WIN, PLACE[number]) if total == number else (LOSE, None) if total == 7 else None
+    if total == number and hard:
+        return WIN, HARD[number]
+    return (LOSE, None) if total in (number, 7) else None
+
+
+class Resolution:
+    """What one kind of roll does to every bet in one phase.
+
+    Attributes:
+        wins (int): bitset of the bets which win.
+        loses (int): bitset of the bets which lose.
+        pushes (int): bitset of the bets returned to the player.
+        travels (int): bitset of the bets which travel, the come bet or nothing.
+        target (int): id of the bet a come bet travels to, or ``None``.
+        keep (int): bitset of the bets this roll leaves on the layout.
+        pays (dict): bet id to ``(numerator, denominator)`` of the odds, for the winners.
+        point (int): the point after the roll.
+    """
+
+    def __init__(self, point, total, hard):
+        self.wins = self.loses = self.pushes = self.travels = 0
+        self.target = None
+        self.pays = {}
+        for bet, name in enumerate(BETS):
+            decision = decide(name, point, total, hard)
+            if decision is None:
+                continue
+            what, detail = decision
+            if what == WIN:
+                self.wins |= 1 << bet
+                self.pays[bet] = detail
+            elif what == LOSE:
+                self.loses |= 1 << bet
+            elif what == PUSH:
+                self.pushes |= 1 << bet
+            else:
+                self.travels |= 1 << bet
+                self.target = detail
+        self.keep = ~(self.wins | self.loses | self.pushes | self.travels)
+        if point:
+            self.point = 0 if total in (point, 7) else point
+        else:
+            self.point = total if total in POINTS else 0
+
+    def payout(self, bet, amount):
+        """What a winning bet of ``amount`` on ``bet`` returns, stake included.
+
+        Winnings are rounded down to a whole chip, as the house pays.
+        """
+        numerator, denominator = self.pays[bet]
+        return amount + amount * numerator // denominator
+
+
+RESOLUTIONS = tuple(tuple(Resolution(point, total, hard) for total, hard in ROLLS)
+                    for point in PHASES)
+
+
+class InvalidBet(Exception):
+    """InvalidBet is raised when a :obj:`.Player` makes a bet the :obj:`Table` does not allow.
+    """
+    pass
+
+
+class Table:
+    """Limits of a craps table.
+
+    Attributes:
+        limit (int): most on any one bet other than odds.
+        minimum (int): least on any bet.
+        odds (int, default 3): most odds behind a line or come bet, as a multiple of it.
+    """
+
+    def __init__(self, limit, minimum, odds=3):
+        self.limit = limit
+        self.minimum = minimum
+        self.odds = odds
+
+    def isValid(self, bet, amount, amounts):
+        """Check a bet of ``amount`` on ``bet``, given the ``amounts`` already on the layout.
+
+        Raises:
+            :obj:`InvalidBet`: if the bet does not pass the table limits, or is odds
+                without the bet they go behind.
+        """
+        name = BETS[bet]
+        if name == 'Pass odds':
+            behind = amounts[ID['Pass']]
+        elif name.startswith('Come odds'):
+            behind = amounts[ID['Come' + name[len('Come odds'):]]]
+        else:
+            if not self.minimum <= amounts[bet] + amount <= self.limit:
+                raise InvalidBet
+            return None
+        if not 0 < amounts[bet] + amount <= self.odds * behind:
+            raise InvalidBet
+
+    def __repr__(self):
+        return '{class_:s}({limit!r}, {minimum!r}, odds={odds!r})'.format(
+            class_=type(self).__name__, **vars(self))
+
+
+class Dice:
+    """A pair of dice.
+
+    Attributes:
+        rng (:obj:`random.Random`): source of randomness.
+    """
+
+    KINDS = tuple(rollKind(first, second) for first in range(1, 7) for second in range(1, 7))
+
+    def __init__(self, rng=None):
+        self.rng = random.Random() if rng is None else rng
+
+    def roll(self):
+        """Roll both dice.
+
+        Return:
+            int: the kind of roll, a position in :data:`ROLLS`.
+        """
+        return self.KINDS[self.rng.randrange(36)]
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""Players and the game loop for craps.
+
+A :obj:`Player` keeps its bets on the layout as a bitset and a list of amounts indexed by
+bet id (see :mod:`.board`) and adds to them before each roll. The :obj:`Game` rolls the
+dice, keeps the point and settles every player's bets from the precomputed
+:obj:`.Resolution` of the roll, so a roll costs a few operations on ints per player
+plus one step for each bet it decides. :meth:`Game.round` settles any number of players
+seated at the table on one roll.
+
+A round is one roll. Once a player has no rolls left to bet on, bets which may be taken
+down are returned to the stake and the player keeps playing only until their line and
+come bets are decided, so the final stake of a session has nothing left on the layout.
+"""
+
+import logging
+from abc import ABCMeta, abstractmethod
+
+from . import board as bd
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+
+class Player(metaclass=ABCMeta):
+    """This is a base class for designing craps players.
+
+    Note:
+        Subclass must implement :meth:`.placeBets()` and may override `__init__`\\.
+
+    Attributes:
+        table (:obj:`.Table`): the limits of the table.
+        stake (int, default 1000): the :obj:`Player`\\'s current stake, not counting the
+            bets on the layout.
+        roundsToGo (int, default 100): the number of rolls to bet on.
+        bets (int): bitset of the bets on the layout, bit ``id`` for bet ``id``.
+        amounts (list of int): amount on each bet, by id.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.stake = 1000  # default, can be set with method
+        self.roundsToGo = 100  # default, can be set with method
+        self.bets = 0
+        self.amounts = [0] * len(bd.BETS)
+
+    def place(self, name, amount):
+        """Put ``amount`` on the bet ``name``, if the stake covers it.
+
+        Return:
+            bool: whether the bet was made.
+
+        Raises:
+            :obj:`.InvalidBet`: if the table does not allow the bet.
+        """
+        if amount > self.stake:
+            return False
+        bet = bd.ID[name]
+        self.table.isValid(bet, amount, self.amounts)
+        self.stake -= amount
+        self.amounts[bet] += amount
+        self.bets |= 1 << bet
+        return True
+
+    def has(self, name):
+        """Check whether the bet ``name`` is on the layout.
+
+        Return:
+            bool"""
+        return bool(self.bets >> bd.ID[name] & 1)
+
+    @abstractmethod
+    def placeBets(self, point):
+        """Add bets before a roll, with :meth:`place`.
+
+        Args:
+            point (int): the point, ``0`` on a come out roll.
+        """
+        pass
+
+    def takeDown(self):
+        """Return every bet which is not a line or come bet to the stake."""
+        for bet in bd.bits(self.bets & ~bd.CONTRACT):
+            self.stake += self.amounts[bet]
+            self.amounts[bet] = 0
+        self.bets &= bd.CONTRACT
+
+    def win(self, bet, amount):
+        """Notification from :obj:`Game` that bet ``bet`` returned ``amount``, stake included.
+
+        Bets which are pushed are returned this way too.
+        """
+        self.stake += amount
+
+    def lose(self, bet):
+        """Notification from :obj:`Game` that bet ``bet`` lost."""
+        pass
+
+    def playing(self):
+        """Check if the :obj:`Player` stills wants to play: there are rolls to bet on and
+        money to bet or bets on the layout, or line and come bets still to be decided.
+
+        Return:
+            bool"""
+        return (self.roundsToGo > 0 and (self.stake > 0 or self.bets > 0)
+                or self.bets & bd.CONTRACT != 0)
+
+    def setStake(self, stake):
+        self.stake = stake
+
+    def setRounds(self, rounds):
+        self.roundsToGo = rounds
+
+    def reset(self):
+        """Clear the layout at the start of a session."""
+        self.bets = 0
+        self.amounts = [0] * len(bd.BETS)
+
+    def parameters(self):
+        """Settings which change how the player bets, used to identify cached results.
+
+        Return:
+            dict: the default player has none.
+        """
+        return {}
+
+
+class PassLine(Player):
+    """Bets the pass line on every come out roll and takes odds behind it.
+
+    Attributes:
+        base (int, default 10): the line bet.
+        odds (int, default 0): odds taken once the point is set, as a multiple of
+            :attr:`base`.
+    """
+
+    base = 10
+    odds = 0
+
+    def placeBets(self, point):
+        if not point and not self.has('Pass'):
+            self.place('Pass', self.base)
+        elif point and self.odds and self.has('Pass') and not self.has('Pass odds'):
+            self.place('Pass odds', self.odds * self.base)
+
+    def parameters(self):
+        return {'base': self.base, 'odds': self.odds}
+
+
+class DontPass(Player):
+    """Bets the don't pass line on every come out roll.
+
+    Attributes:
+        base (int, default 10): the line bet.
+    """
+
+    base = 10
+
+    def placeBets(self, point):
+        if not point and not self.has("Don't pass"):
+            self.place("Don't pass", self.base)
+
+    def parameters(self):
+        return {'base': self.base}
+
+
+class ComePlayer(PassLine):
+    """A :obj:`PassLine` player who also makes come bets while the point is on, until
+    :attr:`comes` of them have travelled to their numbers, with odds behind each.
+
+    Attributes:
+        comes (int, default 2): most come bets on numbers at once.
+    """
+
+    comes = 2
+    odds = 1
+    NUMBERS = tuple(('Come %d' % number, 'Come odds %d' % number) for number in bd.POINTS)
+
+    def placeBets(self, point):
+        super(ComePlayer, self).placeBets(point)
+        if not point:
+            return
+        travelled = 0
+        for come, odds in self.NUMBERS:
+            if self.has(come):
+                travelled += 1
+                if self.odds and not self.has(odds):
+                    self.place(odds, self.odds * self.base)
+        if travelled < self.comes and not self.has('Come'):
+            self.place('Come', self.base)
+
+    def parameters(self):
+        return {'base': self.base, 'odds': self.odds, 'comes': self.comes}
+
+
+class IronCross(Player):
+    """Covers every number but the 7 once the point is on: place bets on the 5, 6 and 8
+    and the field on every roll.
+
+    Attributes:
+        base (int, default 5): the field and place 5 bets; the 6 and 8 get six fifths of
+            it, which they pay 7 to 6 on.
+    """
+
+    base = 5
+
+    def placeBets(self, point):
+        if not point:
+            return
+        for name, amount in (('Place 5', self.base), ('Place 6', self.base * 6 // 5),
+                             ('Place 8', self.base * 6 // 5)):
+            if not self.has(name):
+                self.place(name, amount)
+        self.place('Field', self.base)
+
+    def parameters(self):
+        return {'base': self.base}
+
+
+class Game:
+    """manages the sequence of actions that defines the game of craps
+
+    Attributes:
+        table (:obj:`.Table`): the limits of the table.
+        dice (:obj:`.Dice`): the dice.
+        point (int): the point, ``0`` before a come out roll.
+    """
+
+    def __init__(self, table, dice=None):
+        self.table = table
+        self.dice = bd.Dice() if dice is None else dice
+        self.point = 0
+
+    def seed(self, value):
+        """Reseed the :obj:`.Dice`\\' rng."""
+        self.dice.rng.seed(value)
+
+    def getstate(self):
+        """State of the :obj:`.Dice`\\' rng and the point, as JSON compatible lists."""
+        version, internal, gauss = self.dice.rng.getstate()
+        return [version, list(internal), gauss, self.point]
+
+    def setstate(self, state):
+        """Restore a state from :meth:`getstate`."""
+        version, internal, gauss, self.point = state
+        self.dice.rng.setstate((version, tuple(internal), gauss))
+
+    def reset(self):
+        """Start a session on a come out roll."""
+        self.point = 0
+
+    def fingerprint(self):
+        """Table limits, used to identify cached results."""
+        return 'craps/{0!r}/{1!r}/{2!r}'.format(self.table.limit, self.table.minimum,
+                                                self.table.odds)
+
+    def cycle(self, player):
+        """Executes a single roll of play.
+
+        Cycle:
+            1. call the :meth:`Player.placeBets()` with the point, unless the player
+               has no rolls left to bet on.
+            2. roll the :obj:`.Dice`\\.
+            3. settle the player's bets from the :obj:`.Resolution` of the roll and move
+               the point.
+            4. once the player has no rolls left, call :meth:`Player.takeDown()`\\.
+
+        Args:
+            player (:obj:`Player`): the individual player that places bets,
+                receives winnings and pays losses.
+        """
+        self.round([player])
+
+    def round(self, players):
+        """One roll shared by every player at the table, as :meth:`cycle` plays it for one.
+
+        Args:
+            players (list of :obj:`Player`): the players seated; those no longer
+                :meth:`~Player.playing` sit the roll out.
+        """
+        playing = [player for player in players if player.playing()]
+        if not playing:
+            return
+        point = self.point
+        for player in playing:
+            if player.roundsToGo > 0:
+                player.placeBets(point)
+                player.roundsToGo -= 1
+        resolution = bd.RESOLUTIONS[bd.PHASE[point]][self.dice.roll()]
+        for player in playing:
+            self._settle(player, resolution)
+            if player.roundsToGo <= 0:
+                player.takeDown()
+        self.point = resolution.point
+
+    def _settle(self, player, resolution):
+        active = player.bets
+        if not active:
+            return
+        amounts = player.amounts
+        for bet in bd.bits(active & resolution.wins):
+            player.win(bet, resolution.payout(bet, amounts[bet]))
+            amounts[bet] = 0
+        for bet in bd.bits(active & resolution.pushes):
+            player.win(bet, amounts[bet])
+            amounts[bet] = 0
+        for bet in bd.bits(active & resolution.loses):
+            player.lose(bet)
+            amounts[bet] = 0
+        kept = active & resolution.keep
+        if active & resolution.travels:
+            come = bd.ID['Come']
+            amounts[resolution.target] += amounts[come]
+            amounts[come] = 0
+            kept |= 1 << resolution.target
+        player.bets = kept
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Run :obj:`.Simulator` sessions on worker processes spread across machines.
+
+A :obj:`DistributedExecutor` is the coordinator. It listens on a TCP port with
+:mod:`multiprocessing.connection`, which authenticates every worker against a shared key,
+and plugs into :meth:`.Simulator.run` like any other executor. Workers started with
+:func:`work`, on any machine which can reach the port, connect and are handed:
+
+    * the simulator, once per run,
+    * session ranges to play. A range needs no other stream assignment: session ``i``
+      is seeded with :func:`.sessionSeed` of the simulator's seed and ``i``, so every
+      range draws from its own streams wherever it runs.
+
+Workers send back the records of each range. They are mergeable partials: the
+coordinator folds them into the run's :obj:`.SimulationResult` in session order, so the
+result, sinks and checkpoints are the same as with any other executor. A range is leased
+to one worker at a time. When the worker disconnects or the lease runs out, the range
+is handed to another worker. An exception raised playing a range, such as
+:obj:`.InvalidBet`, is sent back instead and raised by the run; so is a
+``RuntimeError`` when every worker has been lost and none joins within a lease.
+
+Objects are pickled over the wire, so the port must only be reachable from trusted
+machines.
+
+Example:
+    python -m casino.distributed coordinator --port 9000 --samples 100000 --seed 1
+    python -m casino.distributed worker --connect coordinator.local:9000  # on each node
+"""
+
+import argparse
+import collections
+import logging
+import multiprocessing
+import pickle
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from . import sweep as sw
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+AUTHKEY = b'casino'
+
+
+class WorkerStats:
+    """What one worker has done for the coordinator.
+
+    Attributes:
+        name (str): worker's host and process id.
+        sessions (int): sessions played.
+        busy (float): seconds spent playing them, as timed by the worker.
+        failed (bool): the worker died or timed out holding a range.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.sessions = 0
+        self.busy = 0.0
+        self.failed = False
+
+    def __repr__(self):
+        return '{class_:s}({name!r}, sessions={sessions!r}, busy={busy:.3f}, ' \
+            'failed={failed!r})'.format(class_=type(self).__name__, **vars(self))
+
+
+class DistributedExecutor:
+    """Coordinator which leases session ranges to remote workers.
+
+    Args:
+        address (tuple, default ('127.0.0.1', 0)): address to listen on; port ``0``
+            picks a free port, see :attr:`address` once started.
+        authkey (bytes): key shared with the workers.
+        batchSize (int, default 256): sessions per range.
+        lease (float, default 300): seconds a worker may hold a range.
+
+    Attributes:
+        workers (list of :obj:`WorkerStats`): every worker which has connected.
+    """
+
+    def __init__(self, address=('127.0.0.1', 0), authkey=AUTHKEY, batchSize=256,
+                 lease=300.0):
+        self.authkey = authkey
+        self.batchSize = batchSize
+        self.lease = lease
+        self.workers = []
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self.condition = threading.Condition()
+        self.job = None
+        self.pending = collections.deque()
+        self.finished = {}
+        self.errors = {}
+        self.alive = 0
+        self.deserted = None  # when the last worker was lost
+        self.closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while not self.closed:
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                if self.closed:
+                    return
+                LOGGER.warning('refused a worker', exc_info=True)
+                continue
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _next(self):
+        """Block until there is a range to lease, or the coordinator closes."""
+        with self.condition:
+            while not self.pending and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return None
+            return self.job + self.pending.popleft()
+
+    def _serve(self, connection):
+        """Lease ranges to one worker until it fails or the coordinator closes."""
+        stats = WorkerStats(connection.recv())
+        self.workers.append(stats)
+        with self.condition:
+            self.alive += 1
+            self.deserted = None
+        LOGGER.info('worker %s joined', stats.name)
+        job = task = None
+        try:
+            while True:
+                task = self._next()
+                if task is None:
+                    connection.send(('stop',))
+                    return
+                number, simulator, start, stop = task
+                if number != job:
+                    connection.send(('job', number, simulator))
+                    job = number
+                connection.send(('work', number, start, stop))
+                if not connection.poll(self.lease):
+                    raise TimeoutError('lease of sessions %d to %d expired' % (start, stop))
+                message = connection.recv()
+                with self.condition:
+                    if message[0] == 'error':
+                        _, number, start, error = message
+                        if number == self.job[0]:
+                            self.errors[start] = error
+                    else:
+                        _, number, start, records, seconds = message
+                        stats.sessions += len(records)
+                        stats.busy += seconds
+                        if number == self.job[0]:
+                            self.finished[start] = records
+                    self.condition.notify_all()
+                task = None
+        except (OSError, EOFError, TimeoutError) as error:
+            stats.failed = True
+            LOGGER.warning('worker %s lost: %s', stats.name, error)
+            with self.condition:
+                if task is not None and task[0] == self.job[0]:
+                    self.pending.appendleft(task[2:])  # hand the range to someone else
+                    self.condition.notify_all()
+        finally:
+            connection.close()
+            with self.condition:
+                self.alive -= 1
+                if not self.alive:
+                    self.deserted = time.monotonic()
+                self.condition.notify_all()
+
+    def _wait(self, start, stop):
+        """Wait on the condition, held, for news of the range ``start`` to ``stop``.
+
+        Raises:
+            Exception: the one a worker raised playing the range.
+            RuntimeError: if every worker was lost a lease ago and none has joined since.
+        """
+        if start in self.errors:
+            raise self.errors.pop(start)
+        timeout = None
+        if not self.alive and self.deserted is not None:
+            timeout = self.deserted + self.lease - time.monotonic()
+            if timeout <= 0:
+                raise RuntimeError('no workers left for sessions %d to %d' % (start, stop))
+        self.condition.wait(timeout)
+
+    def run(self, simulator, start, stop):
+        """Yield lists of session records in session order.
+
+        Ranges wait for workers to connect; there is no local fallback.
+
+        Raises:
+            Exception: the one a worker raised playing a range.
+            RuntimeError: if every worker was lost a lease ago and none has joined since.
+        """
+        with self.condition:
+            number = 0 if self.job is None else self.job[0] + 1
+            self.job = (number, simulator)
+            self.finished.clear()
+            self.errors.clear()
+            self.pending.extend((low, min(low + self.batchSize, stop))
+                                for low in range(start, stop, self.batchSize))
+            self.condition.notify_all()
+        try:
+            for low in range(start, stop, self.batchSize):
+                with self.condition:
+                    while low not in self.finished:
+                        self._wait(low, min(low + self.batchSize, stop))
+                    records = self.finished.pop(low)
+                yield records
+        finally:
+            with self.condition:
+                self.pending.clear()
+
+    def close(self):
+        """Stop the workers and the listener."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.listener.close()
+
+
+def work(address, authkey=AUTHKEY, name=None):
+    """Play the sessions a coordinator hands out until it says stop.
+
+    Args:
+        address (tuple): the coordinator's ``(host, port)``.
+        authkey (bytes): key shared with the coordinator.
+        name (str, default the process's pid): how the coordinator refers to this worker.
+    """
+    connection = Client(tuple(address), authkey=authkey)
+    connection.send(name or '%s/%d' % (address[0], multiprocessing.current_process().pid))
+    simulators = {}
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] == 'stop':
+                return
+            if message[0] == 'job':
+                simulators = {message[1]: message[2]}
+                continue
+            _, number, start, stop = message
+            begun = time.perf_counter()
+            try:
+                records = simulators[number].records(start, stop)
+            except Exception as error:
+                LOGGER.warning('sessions %d to %d failed: %r', start, stop, error)
+                connection.send(('error', number, start, _portable(error)))
+                continue
+            connection.send(('records', number, start, records, time.perf_counter() - begun))
+    except (EOFError, OSError):
+        LOGGER.info('coordinator went away')
+    finally:
+        connection.close()
+
+
+def _portable(error):
+    """``error`` if it can be pickled back to the coordinator, else a ``RuntimeError``."""
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        return RuntimeError(repr(error))
+    return error
+
+
+def startWorkers(address, count, authkey=AUTHKEY):
+    """Start ``count`` worker processes on this machine.
+
+    Return:
+        list of :obj:`multiprocessing.Process`
+    """
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=work, args=(address, authkey), daemon=True)
+                 for _ in range(count)]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def get_args():
+    '''This function parses and return arguments passed in'''
+    parser = argparse.ArgumentParser(description="Distribute roulette simulations.")
+    parser.add_argument("--authkey", default=AUTHKEY.decode(), help="key shared by all nodes")
+    parser.add_argument("-v", "--verbose", help="increase output verbosity",
+                        action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+    coordinator = commands.add_parser("coordinator", help="hand out sessions")
+    coordinator.add_argument("--host", default="0.0.0.0", help="address to bind")
+    coordinator.add_argument("--port", type=int, default=9000, help="port to bind")
+    coordinator.add_argument("--player", default=sw.DEFAULTS['player'], help="player class")
+    for name in ('stake', 'duration', 'limit', 'minimum'):
+        coordinator.add_argument("--" + name, type=int, default=sw.DEFAULTS[name],
+                                 help="value of %s" % name)
+    coordinator.add_argument("--samples", type=int, default=10000, help="sessions to play")
+    coordinator.add_argument("--seed", type=int, help="seed of the sessions")
+    coordinator.add_argument("--batch", type=int, default=256, help="sessions per range")
+    coordinator.add_argument("--local", type=int, default=0,
+                             help="workers to start on this machine")
+    worker = commands.add_parser("worker", help="play sessions for a coordinator")
+    worker.add_argument("--connect", required=True, help="coordinator's HOST:PORT")
+    return parser.parse_args()
+
+
+def main(args=None):
+    """enters function"""
+    if args is None:
+        args = get_args()
+    loglevel = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    authkey = args.authkey.encode()
+    if args.command == 'worker':
+        host, _, port = args.connect.rpartition(':')
+        work((host, int(port)), authkey)
+        return
+    point = {name: getattr(args, name)
+             for name in ('player', 'stake', 'duration', 'limit', 'minimum')}
+    simulator = sw.buildSimulator(point, args.samples, args.seed)
+    executor = DistributedExecutor((args.host, args.port), authkey, args.batch)
+    simulator.executor = executor
+    startWorkers(('127.0.0.1', executor.address[1]), args.local, authkey)
+    try:
+        result = simulator.run()
+    finally:
+        executor.close()
+    for stats in executor.workers:
+        LOGGER.info('%r', stats)
+    print('sessions {0:d}  maximum {1:.2f} ± {2:.2f}  final {3:.2f} ± {4:.2f}'.format(
+        result.samples, result.maxima.mean, result.halfWidth('maximum'),
+        result.finals.mean, result.halfWidth('final')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Discrete event simulation of a casino floor.
+
+A :obj:`Floor` holds many :obj:`FloorTable`\\s, each a game of :mod:`casino.simulation`'s
+protocol dealt at its own pace, and a stream of patrons. Simulated time, in seconds,
+moves from event to event taken off a heap:
+
+    arrival
+        a patron with a fresh stake walks in, sits at a random table with a free seat,
+        or leaves at once if every seat is taken. Arrivals are a Poisson process.
+    round
+        a table plays a round for everyone seated. A game with a ``round(players)``
+        method, such as the roulette :obj:`.Game`, plays them on one spin; otherwise
+        each seat gets a :meth:`cycle`. Then patrons who are no longer ``playing()``
+        leave, and each of the others moves to another table with chance ``switch``.
+
+A patron carries their stake and the rounds they have left from table to table, and a
+seat is a fresh player made by the table for them. A table with nobody seated schedules
+no rounds. The work of a table is batched: a table keeps dealing rounds without going
+back to the heap for as long as no other event comes first.
+
+The house result of every round and the occupation of every table are folded into
+:obj:`TableStats` as the rounds are dealt, and an hourly record per table can be streamed
+to any result sinks, so memory does not grow with the simulated time.
+
+Example:
+    python -m casino.floor --roulette 200 --blackjack 50 --arrivals 600 --hours 8
+"""
+
+import argparse
+import copy
+import heapq
+import logging
+import random
+
+from . import simulation as sim
+from .blackjack import board as bjb
+from .blackjack import players as bjp
+from .roulette import bin_builder as bb
+from .roulette import board as bd
+from .roulette import players as ply
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+ARRIVAL, ROUND = 0, 1
+FIELDS = ('hour', 'table', 'rounds', 'seatRounds', 'house')
+
+
+class FloorTable:
+    """A table on the floor.
+
+    Args:
+        name (str): unique name of the table.
+        game: game of the :mod:`casino.simulation` protocol.
+        makePlayer (callable): returns a fresh player for a seat, given no arguments.
+        roundsPerHour (float): pace of the game.
+        seats (int, default 7): most players seated at once.
+
+    Attributes:
+        seated (list): ``(patron, player)`` pairs.
+        stats (:obj:`TableStats`): what the table has done.
+    """
+
+    def __init__(self, name, game, makePlayer, roundsPerHour, seats=7):
+        self.name = name
+        self.game = game
+        self.makePlayer = makePlayer
+        self.interval = 3600.0 / roundsPerHour
+        self.seats = seats
+        self.seated = []
+        self.scheduled = False
+        self.stats = TableStats()
+
+    @property
+    def free(self):
+        return len(self.seated) < self.seats
+
+    def sit(self, patron):
+        """Seat ``patron`` with a fresh player carrying their stake and rounds."""
+        player = self.makePlayer()
+        player.setStake(patron.stake)
+        player.setRounds(patron.rounds)
+        player.reset()
+        self.seated.append((patron, player))
+
+    def stand(self, index):
+        """Unseat the patron in seat ``index``, with what their player has left."""
+        patron, player = self.seated.pop(index)
+        patron.stake, patron.rounds = player.stake, player.roundsToGo
+        return patron
+
+    def deal(self):
+        """Play a round for everyone seated.
+
+        Return:
+            int: the house result, what the players lost.
+        """
+        players = [player for _, player in self.seated]
+        before = sum(player.stake for player in players)
+        round = getattr(self.game, 'round', None)
+        if round is not None:
+            round(players)
+        else:
+            for player in players:
+                self.game.cycle(player)
+        return before - sum(player.stake for player in players)
+
+
+class Patron:
+    """Someone on the floor.
+
+    Attributes:
+        number (int): order of arrival.
+        stake (int): money left.
+        rounds (int): rounds left to play.
+        arrived (float): time of arrival.
+    """
+
+    def __init__(self, number, stake, rounds, arrived):
+        self.number = number
+        self.stake = stake
+        self.rounds = rounds
+        self.arrived = arrived
+
+
+class TableStats:
+    """Streaming statistics of a :obj:`FloorTable`.
+
+    Attributes:
+        rounds (int): rounds dealt.
+        seatRounds (int): rounds dealt times the players seated for them.
+        busy (float): seconds with somebody seated.
+        total (int): house result of every round together.
+        house (:obj:`.RunningStats`): house result of each round.
+    """
+
+    def __init__(self):
+        self.rounds = 0
+        self.seatRounds = 0
+        self.busy = 0.0
+        self.total = 0
+        self.house = sim.RunningStats()
+
+    def add(self, seated, house, seconds):
+        self.rounds += 1
+        self.seatRounds += seated
+        self.busy += seconds
+        self.total += house
+        self.house.add(house)
+
+
+class FloorResult:
+    """What happened on the floor.
+
+    Attributes:
+        hours (float): simulated time.
+        tables (dict): table name to its :obj:`TableStats`.
+        arrivals (int): patrons who walked in.
+        turnedAway (int): patrons who found every seat taken.
+        departures (int): patrons who left after playing.
+        switches (int): moves from one table to another.
+        events (int): arrivals and rounds processed.
+    """
+
+    def __init__(self, hours, tables, arrivals, turnedAway, departures, switches, events):
+        self.hours = hours
+        self.tables = tables
+        self.arrivals = arrivals
+        self.turnedAway = turnedAway
+        self.departures = departures
+        self.switches = switches
+        self.events = events
+
+    @property
+    def house(self):
+        """Total house result."""
+        return sum(stats.total for stats in self.tables.values())
+
+    def utilization(self, name):
+        """Fraction of the time table ``name`` had somebody seated."""
+        return self.tables[name].busy / (self.hours * 3600) if self.hours else 0.0
+
+
+class Floor:
+    """Discrete event simulation of many tables and the patrons moving between them.
+
+    Args:
+        tables (list of :obj:`FloorTable`): the floor.
+        arrivals (float): patrons walking in per hour.
+        stake (int, default 100): stake of a patron walking in.
+        rounds (int, default 250): most rounds a patron plays.
+        switch (float, default 0.01): chance a patron moves to another table after a
+            round.
+        seed (int, default None): seed of the arrivals, moves and every table's game.
+        sinks (list): result sinks which receive a ``(hour, table, rounds, seatRounds,
+            house)`` record per table and hour.
+
+    Raises:
+        ValueError: if two tables share a name.
+    """
+
+    def __init__(self, tables, arrivals, stake=100, rounds=250, switch=0.01, seed=None,
+                 sinks=()):
+        self.tables = list(tables)
+        if len({table.name for table in self.tables}) != len(self.tables):
+            raise ValueError('table names must be unique')
+        self.arrivals = arrivals
+        self.stake = stake
+        self.rounds = rounds
+        self.switch = switch
+        self.seed = random.getrandbits(31) if seed is None else seed
+        self.sinks = list(sinks)
+        self.rng = random.Random(self.seed)
+        for index, table in enumerate(self.tables):
+            table.number = index
+            table.game.seed(sim.sessionSeed(self.seed, index))
+        self.open = [table for table in self.tables if table.free]
+        self.slots = {table.number: slot for slot, table in enumerate(self.open)}
+
+    def _close(self, table):
+        """Take a full table out of :attr:`open`, swapping the last one into its slot."""
+        slot = self.slots.pop(table.number)
+        last = self.open.pop()
+        if last is not table:
+            self.open[slot] = last
+            self.slots[last.number] = slot
+
+    def _stand(self, table, index):
+        if not table.free:
+            self.slots[table.number] = len(self.open)
+            self.open.append(table)
+        return table.stand(index)
+
+    def _seat(self, patron, table, now, events):
+        table.sit(patron)
+        if not table.free:
+            self._close(table)
+        if not table.scheduled:
+            table.scheduled = True
+            heapq.heappush(events, (now + table.interval, ROUND, table.number, table))
+
+    def _hourly(self, hour, table, totals):
+        rounds, seatRounds, house = totals.pop(table.name, (0, 0, 0))
+        if rounds:
+            for sink in self.sinks:
+                sink.write((hour, table.name, rounds, seatRounds, house))
+
+    def run(self, hours):
+        """Simulate ``hours`` of the floor.
+
+        Return:
+            :obj:`FloorResult`
+        """
+        horizon = hours * 3600.0
+        events = []
+        arrived = turnedAway = departures = switches = count = 0
+        totals = {}  # table name to (rounds, seatRounds, house) of the current hour
+        hour = 0
+        if self.arrivals > 0:
+            heapq.heappush(events, (self.rng.expovariate(self.arrivals / 3600.0), ARRIVAL,
+                                    0, None))
+        while events and events[0][0] < horizon:
+            now, kind, _, table = heapq.heappop(events)
+            while now >= (hour + 1) * 3600:
+                for each in self.tables:
+                    self._hourly(hour, each, totals)
+                hour += 1
+            if kind == ARRIVAL:
+                count += 1
+                arrived += 1
+                patron = Patron(arrived, self.stake, self.rounds, now)
+                if self.open:
+                    self._seat(patron, self.rng.choice(self.open), now, events)
+                else:
+                    turnedAway += 1
+                heapq.heappush(events, (now + self.rng.expovariate(self.arrivals / 3600.0),
+                                        ARRIVAL, 0, None))
+                continue
+            # deal rounds until another event is due, the hour ends or nobody is left
+            while True:
+                count += 1
+                seated = len(table.seated)
+                house = table.deal()
+                table.stats.add(seated, house, table.interval)
+                rounds, seatRounds, total = totals.get(table.name, (0, 0, 0))
+                totals[table.name] = (rounds + 1, seatRounds + seated, total + house)
+                for index in range(len(table.seated) - 1, -1, -1):
+                    patron, player = table.seated[index]
+                    if not player.playing():
+                        self._stand(table, index)
+                        departures += 1
+                    elif self.switch and self.rng.random() < self.switch:
+                        other = self.rng.choice(self.open) if self.open else table
+                        if other is not table:  # drew its own table: stays put
+                            switches += 1
+                            self._seat(self._stand(table, index), other, now, events)
+                if not table.seated:
+                    table.scheduled = False
+                    break
+                now += table.interval
+                if now >= min(events[0][0] if events else horizon, horizon,
+                              (hour + 1) * 3600):
+                    heapq.heappush(events, (now, ROUND, table.number, table))
+                    break
+        for each in self.tables:
+            self._hourly(hour, each, totals)
+        LOGGER.info('%d events, %d arrivals, %d turned away', count, arrived, turnedAway)
+        return FloorResult(hours, {table.name: table.stats for table in self.tables},
+                           arrived, turnedAway, departures, switches, count)
+
+
+def rouletteTable(name, player_class=ply.Martingale, limit=1000, minimum=5,
+                  roundsPerHour=40, seats=7):
+    """:obj:`FloorTable` of roulette on its own wheel.
+
+    A seat is a copy of one player made up front, with its own :obj:`.Table` for its
+    bets, which is much cheaper than making a player.
+    """
+    wheel = bd.Wheel()
+    bb.BinBuilder.buildBins(wheel)
+    game = ply.Game(bd.Table(limit, minimum), wheel)
+    template = player_class(bd.Table(limit, minimum), wheel)
+
+    def makePlayer():
+        player = copy.copy(template)
+        player.table = bd.Table(limit, minimum)
+        return player
+
+    return FloorTable(name, game, makePlayer, roundsPerHour, seats)
+
+
+def blackjackTable(name, rules=None, roundsPerHour=60, seats=7, directory=None):
+    """:obj:`FloorTable` of blackjack; the seats share a shoe and a
+    :obj:`.BasicStrategy` table, solved or loaded from ``directory`` once."""
+    rules = bjb.Rules() if rules is None else rules
+    template = bjp.BasicStrategy(rules, directory)
+    return FloorTable(name, bjp.Game(rules), lambda: copy.copy(template), roundsPerHour,
+                      seats)
+
+
+def get_args():
+    '''This function parses and return arguments passed in'''
+    parser = argparse.ArgumentParser(description="Simulate a casino floor.")
+    parser.add_argument("--roulette", type=int, default=100, help="roulette tables")
+    parser.add_argument("--blackjack", type=int, default=0, help="blackjack tables")
+    parser.add_argument("--player", default='Martingale', help="roulette player class")
+    parser.add_argument("--arrivals", type=float, default=600, help="patrons per hour")
+    parser.add_argument("--stake", type=int, default=100, help="stake of a patron")
+    parser.add_argument("--rounds", type=int, default=250, help="most rounds a patron plays")
+    parser.add_argument("--switch", type=float, default=0.01,
+                        help="chance of changing tables after a round")
+    parser.add_argument("--hours", type=float, default=8, help="simulated hours")
+    parser.add_argument("--seed", type=int, help="seed of the simulation")
+    parser.add_argument("-v", "--verbose", help="increase output verbosity",
+                        action="store_true")
+    return parser.parse_args()
+
+
+def main(args=None):
+    """enters function"""
+    if args is None:
+        args = get_args()
+    loglevel = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    player_class = ply.playerClasses()[args.player]
+    tables = [rouletteTable('roulette %d' % number, player_class)
+              for number in range(args.roulette)]
+    tables += [blackjackTable('blackjack %d' % number) for number in range(args.blackjack)]
+    floor = Floor(tables, args.arrivals, args.stake, args.rounds, args.switch, args.seed)
+    result = floor.run(args.hours)
+    busy = sum(result.utilization(table.name) for table in tables) / max(len(tables), 1)
+    print('house result: %d over %d events' % (result.house, result.events))
+    print('patrons: %d arrived, %d turned away, %d switched tables' % (
+        result.arrivals, result.turnedAway, result.switches))
+    print('mean table utilization: %.1f%%' % (100 * busy))
+
+
+if __name__ == '__main__':
+    main()
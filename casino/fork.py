@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Snapshots of a session part way through, and what-if continuations from them.
+
+"Given this Martingale player is down 6 in a row at round 120, what happens next?" is
+answered without playing the first 120 rounds again for every continuation:
+
+    :func:`playTo`
+        plays one session of a :obj:`.Simulator` until a round or a condition is reached
+        and returns a :obj:`Snapshot` of it.
+    :obj:`Snapshot`
+        holds the state of the game and player at that point. It is taken once and
+        restored in place before each continuation, so a branch costs a few attribute
+        writes rather than a copy of the game. Unchanging parts, such as the level
+        tables of a progression, are shared by reference; only what a round changes in
+        place is copied.
+    :obj:`Fork`
+        a :obj:`.Simulator` whose sessions all start from the snapshot, each reseeded
+        with its own spins. It runs on any executor: on worker processes, and on the
+        :obj:`.CompiledExecutor`, which starts compiled players in the state they
+        were in.
+
+Besides the protocol of :mod:`casino.simulation`, forking needs:
+
+    player:
+        ``getstate()`` and ``setstate(state)`` for everything it carries within a
+        session: stake, rounds to go, strategy state and bets on the table.
+    game:
+        ``getstate()`` and ``setstate(state)`` for its random state, as for checkpoints,
+        and, if it keeps other state within a session such as a history of spins,
+        ``snapshot()`` and ``restore(state)``.
+
+Examples:
+    >>> simulator = Simulator(game, Martingale(table, wheel), seed=1)  # doctest: +SKIP
+    >>> snapshot = playTo(simulator, index=0, rounds=1000,
+    ...                   until=lambda player: player.lossCount == 6)  # doctest: +SKIP
+    >>> Fork(game, simulator.player, snapshot, samples=10000).run()  # doctest: +SKIP
+"""
+
+import logging
+
+from . import simulation as sim
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """State of a game and player part way through a session.
+
+    Attributes:
+        player: the player's state, from its ``getstate()``.
+        random: the game's random state, from its ``getstate()``.
+        game: the game's other state, from its ``snapshot()``, or ``None``.
+        stake (int): the player's stake.
+        rounds (int): the rounds the player still had to go.
+        played (int): rounds played before the snapshot.
+    """
+
+    def __init__(self, player, random, game, stake, rounds, played=0):
+        self.player = player
+        self.random = random
+        self.game = game
+        self.stake = stake
+        self.rounds = rounds
+        self.played = played
+
+    @classmethod
+    def take(cls, game, player, played=0):
+        """Snapshot of ``game`` and ``player`` as they are, between two rounds.
+
+        Args:
+            played (int, default 0): rounds played so far, for reference.
+        """
+        snapshot = getattr(game, 'snapshot', None)
+        return cls(player.getstate(), game.getstate(),
+                   None if snapshot is None else snapshot(), player.stake,
+                   player.roundsToGo, played)
+
+    def restore(self, game, player, random=True):
+        """Put ``game`` and ``player`` back in the state of the snapshot.
+
+        Args:
+            random (bool, default True): restore the game's random state too; not
+                needed when the game is reseeded straight after.
+        """
+        player.setstate(self.player)
+        if random:
+            game.setstate(self.random)
+        if self.game is not None:
+            game.restore(self.game)
+
+    def __repr__(self):
+        return '{0:s}(stake={1!r}, rounds={2!r}, played={3!r})'.format(
+            type(self).__name__, self.stake, self.rounds, self.played)
+
+
+def playTo(simulator, index=None, rounds=None, until=None):
+    """Play a session of ``simulator`` part way and snapshot it.
+
+    The session starts as :meth:`.Simulator.session` starts it, with session ``index``'s
+    seed, and stops after ``rounds`` rounds or as soon as ``until(player)`` is true,
+    whichever comes first.
+
+    Args:
+        index (int, default None): session number, used to reseed the game.
+        rounds (int, default None): rounds to play; no limit when ``None``.
+        until (callable, default None): condition on the player checked after each round.
+
+    Return:
+        :obj:`Snapshot`: or ``None`` if the session ended first.
+    """
+    game, player = simulator.game, simulator.player
+    if index is not None and simulator.seed is not None:
+        game.seed(sim.sessionSeed(simulator.seed, index))
+    reset = getattr(game, 'reset', None)
+    if reset is not None:
+        reset()
+    player.setStake(simulator.initStake)
+    player.setRounds(simulator.initDuration)
+    player.reset()
+    played = 0
+    while rounds is None or played < rounds:
+        if not player.playing():
+            return None
+        game.cycle(player)
+        played += 1
+        if until is not None and until(player):
+            break
+    LOGGER.debug('snapshot after %d rounds, stake %r', played, player.stake)
+    return Snapshot.take(game, player, played)
+
+
+class Fork(sim.Simulator):
+    """Sessions which all carry on from one :obj:`Snapshot`, each with its own spins.
+
+    Session ``i`` restores the snapshot into the game and player, reseeds the game with
+    ``sessionSeed(seed, i)`` and plays until the player stops. Its records count the
+    rounds played after the snapshot, so ``duration`` is how much longer the player
+    lasted, and the ``maximum`` and ``final`` stakes are reached from the snapshot's
+    stake.
+
+    Results depend on the snapshot, which no cache key covers, so a fork takes no
+    result cache or checkpoint.
+
+    Args:
+        game: the game the snapshot was taken of, or one like it.
+        player: the player the snapshot was taken of, or one like it.
+        snapshot (:obj:`Snapshot`): where every session starts.
+        samples (int, default 1000): number of continuations.
+        seed (int, default 0): seed of the continuations. ``None`` restores the random
+            state of the snapshot instead, so every continuation replays the one the
+            original session had, except on worker processes, which draw a seed.
+        executor (default :obj:`.ScalarExecutor`): runs the sessions.
+        sinks (list): result sinks which receive every session record.
+
+    Attributes:
+        snapshot (:obj:`Snapshot`): see args.
+    """
+
+    def __init__(self, game, player, snapshot, samples=1000, seed=0, executor=None,
+                 sinks=()):
+        super(Fork, self).__init__(game, player, initDuration=snapshot.rounds,
+                                   initStake=snapshot.stake, samples=samples, seed=seed,
+                                   executor=executor, sinks=sinks)
+        self.snapshot = snapshot
+
+    def session(self, index=None):
+        """Play a continuation of the snapshot.
+
+        Args:
+            index (int, default None): continuation number, used to reseed the game.
+
+        Return:
+            `list` of stake values after the snapshot.
+        """
+        game, player = self.game, self.player
+        reseed = index is not None and self.seed is not None
+        self.snapshot.restore(game, player, random=not reseed)
+        if reseed:
+            game.seed(sim.sessionSeed(self.seed, index))
+        stakes = []
+        while player.playing():
+            game.cycle(player)
+            stakes.append(player.stake)
+        return stakes
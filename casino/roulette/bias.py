@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Streaming tests of logged spins for a biased wheel.
+
+Spin logs are read in chunks of bin numbers, the index space of :attr:`.Wheel.bins`:
+``0`` to ``36`` and ``37`` for ``00``. :func:`readCSV` takes the labels from a column of
+a CSV file and :func:`readBinary` takes a file of one byte per spin. A
+:obj:`BiasMonitor` folds every chunk into:
+
+    * counts per bin and per :obj:`.Outcome`, over the whole log,
+    * counts per bin over a rolling window of the latest spins, kept in a ring of
+      one byte per spin,
+    * counts per sector, arcs of neighbouring pockets on the wheel, which show the
+      tilt of a worn or warped wheel better than any single bin.
+
+From these it gives Pearson's chi-square test of a fair wheel over the whole log or the
+window, and Wald's sequential probability ratio test for every bin: does the bin come up
+``1 + bias`` times as often as it should? Memory does not grow with the log.
+
+The counts also drive a biased wheel: :meth:`BiasMonitor.biasedWheel` builds a
+:obj:`.Wheel` whose spins follow them, for simulating strategies which exploit the bias.
+
+Example:
+    python -m casino.roulette.bias spins.csv --window 100000
+"""
+
+import argparse
+import collections
+import csv
+import logging
+import math
+
+from .. import variance as vr
+from . import bin_builder as bb
+from . import board as bd
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+BINS = 38
+LABELS = dict({str(number): number for number in range(37)}, **{'00': 37})
+# pockets of the American wheel, clockwise from 0; 37 is 00
+WHEEL_ORDER = (0, 28, 9, 26, 30, 11, 7, 20, 32, 17, 5, 22, 34, 15, 3, 24, 36, 13, 1, 37,
+               27, 10, 25, 29, 12, 8, 19, 31, 18, 6, 21, 33, 16, 4, 23, 35, 14, 2)
+CHUNK = 1 << 16
+
+
+def readCSV(handle, column=0, chunkSize=CHUNK):
+    """Chunks of bin numbers from the spin labels in a column of a CSV file.
+
+    A first row whose column is not a spin label is taken for a header.
+
+    Args:
+        handle: open text file.
+        column (int, default 0): position of the spin label in each row.
+        chunkSize (int, default 65536): spins per chunk.
+
+    Yield:
+        bytes: bin numbers.
+
+    Raises:
+        ValueError: if a row after the first holds no spin label.
+    """
+    chunk = bytearray()
+    for line, row in enumerate(csv.reader(handle), 1):
+        number = LABELS.get(row[column].strip()) if len(row) > column else None
+        if number is None:
+            if line == 1:
+                continue
+            raise ValueError('line %d: %r is not a spin' % (line, row))
+        chunk.append(number)
+        if len(chunk) == chunkSize:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+def readBinary(handle, chunkSize=CHUNK):
+    """Chunks of bin numbers from a binary file of one byte per spin.
+
+    Yield:
+        bytes: bin numbers.
+
+    Raises:
+        ValueError: if a byte is not a bin number.
+    """
+    while True:
+        chunk = handle.read(chunkSize)
+        if not chunk:
+            return
+        if max(chunk) >= BINS:
+            raise ValueError('%d is not a bin number' % max(chunk))
+        yield chunk
+
+
+def readSpins(path, chunkSize=CHUNK):
+    """Chunks of a spin log: CSV if the name ends in ``.csv``, binary otherwise."""
+    if path.endswith('.csv'):
+        with open(path, newline='') as handle:
+            yield from readCSV(handle, chunkSize=chunkSize)
+    else:
+        with open(path, 'rb') as handle:
+            yield from readBinary(handle, chunkSize)
+
+
+def chiSquareSurvival(statistic, freedom):
+    """Chance that a chi-square variable with ``freedom`` degrees exceeds ``statistic``.
+
+    The regularized upper incomplete gamma function, by its series or its continued
+    fraction (Numerical Recipes, 6.2).
+
+    Examples:
+        >>> round(chiSquareSurvival(3.841, 1), 3)
+        0.05
+    """
+    a, x = freedom / 2, statistic / 2
+    if x <= 0:
+        return 1.0
+    logPrefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1 - total * math.exp(logPrefix))
+    tiny = 1e-300
+    b = x + 1 - a
+    c, d = 1 / tiny, 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return math.exp(logPrefix) * h
+
+
+class BiasMonitor:
+    """Streaming counts and bias tests of logged spins.
+
+    Args:
+        wheel (:obj:`.Wheel`): gives the outcomes of each bin.
+        window (int, default 100000): spins in the rolling window.
+        sector (int, default 5): pockets in a sector.
+        bias (float, default 0.2): the sequential test's alternative: a bin comes up
+            ``1 + bias`` times as often as on a fair wheel.
+        alpha (float, default 0.001): chance the sequential test flags a fair bin.
+        beta (float, default 0.01): chance it misses a biased one.
+
+    Attributes:
+        spins (int): spins counted.
+        counts (list of int): spins of each bin.
+        outcomeCounts (dict): outcome name to the spins it won.
+        recent (list of int): spins of each bin in the window.
+        alarms (dict): bin number to the spin count at which the sequential test found
+            it biased. A bin found fair is tested again from there on, so a wheel which
+            goes bad later is still caught.
+
+    Raises:
+        ValueError: if a setting is out of range.
+    """
+
+    def __init__(self, wheel, window=100000, sector=5, bias=0.2, alpha=0.001, beta=0.01):
+        if window < 1 or not 0 < sector <= BINS or bias <= 0 or not 0 < alpha < 1 \
+                or not 0 < beta < 1:
+            raise ValueError('window, sector, bias, alpha or beta out of range')
+        self.wheel = wheel
+        self.window = window
+        self.sector = sector
+        self.spins = 0
+        self.counts = [0] * BINS
+        self.outcomeCounts = {outcome.name: 0 for outcome in wheel.all_outcomes}
+        self.binOutcomes = [[outcome.name for outcome in bin] for bin in wheel.bins]
+        self.recent = [0] * BINS
+        self.ring = bytearray(window)
+        self.position = 0
+        self.filled = 0
+        p0, p1 = 1 / BINS, (1 + bias) / BINS
+        self.hit = math.log(p1 / p0)
+        self.miss = math.log((1 - p1) / (1 - p0))
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self.since = [(0, 0)] * BINS  # (spins, count) when each bin's test started
+        self.alarms = {}
+
+    def add(self, chunk):
+        """Fold a chunk of bin numbers in, then run the sequential tests.
+
+        The tests are checked once per chunk, a group sequential test: smaller chunks
+        check more often.
+        """
+        tally = collections.Counter(chunk)
+        self.spins += len(chunk)
+        for number, count in tally.items():
+            self.counts[number] += count
+            for name in self.binOutcomes[number]:
+                self.outcomeCounts[name] += count
+        self._remember(chunk, tally)
+        for number in range(BINS):
+            if number in self.alarms:
+                continue
+            spins, count = self.since[number]
+            hits = self.counts[number] - count
+            ratio = hits * self.hit + (self.spins - spins - hits) * self.miss
+            if ratio >= self.upper:
+                self.alarms[number] = self.spins
+                LOGGER.warning('bin %d looks biased after %d spins', number, self.spins)
+            elif ratio <= self.lower:
+                self.since[number] = (self.spins, self.counts[number])
+        return self
+
+    def ingest(self, chunks):
+        """:meth:`add` every chunk of an iterable, such as :func:`readSpins`.
+
+        Return:
+            :obj:`BiasMonitor`: ``self``.
+        """
+        for chunk in chunks:
+            self.add(chunk)
+        return self
+
+    def _remember(self, chunk, tally):
+        """Keep the chunk in the window ring and its counts in :attr:`recent`."""
+        size = len(self.ring)
+        if len(chunk) >= size:
+            self.ring[:] = chunk[-size:]
+            self.recent = [0] * BINS
+            for number, count in collections.Counter(self.ring).items():
+                self.recent[number] = count
+            self.position, self.filled = 0, size
+            return
+        evicted = max(0, self.filled + len(chunk) - size)
+        oldest = (self.position - self.filled) % size
+        for number, count in collections.Counter(self._slice(oldest, evicted)).items():
+            self.recent[number] -= count
+        for number, count in tally.items():
+            self.recent[number] += count
+        first = min(len(chunk), size - self.position)
+        self.ring[self.position:self.position + first] = chunk[:first]
+        self.ring[:len(chunk) - first] = chunk[first:]
+        self.position = (self.position + len(chunk)) % size
+        self.filled = min(size, self.filled + len(chunk))
+
+    def _slice(self, start, count):
+        end = start + count
+        if end <= len(self.ring):
+            return self.ring[start:end]
+        return self.ring[start:] + self.ring[:end - len(self.ring)]
+
+    def chiSquare(self, recent=False):
+        """Pearson's test of a fair wheel.
+
+        Args:
+            recent (bool, default False): test the window instead of the whole log.
+
+        Return:
+            tuple: ``(statistic, p-value)``; a small p-value speaks against a fair wheel.
+        """
+        counts = self.recent if recent else self.counts
+        expected = sum(counts) / BINS
+        if not expected:
+            return 0.0, 1.0
+        statistic = sum((count - expected) ** 2 for count in counts) / expected
+        return statistic, chiSquareSurvival(statistic, BINS - 1)
+
+    def sectors(self, recent=False):
+        """Spins of every arc of :attr:`sector` neighbouring pockets.
+
+        Return:
+            list of tuple: ``(bin numbers, spins)`` of the arc starting at each pocket,
+            hottest first.
+        """
+        counts = self.recent if recent else self.counts
+        arcs = []
+        for start in range(BINS):
+            pockets = tuple(WHEEL_ORDER[(start + step) % BINS] for step in range(self.sector))
+            arcs.append((pockets, sum(counts[number] for number in pockets)))
+        return sorted(arcs, key=lambda arc: arc[1], reverse=True)
+
+    def weights(self, smoothing=1.0, recent=False):
+        """Estimated relative chance of each bin: its count plus ``smoothing``."""
+        counts = self.recent if recent else self.counts
+        return [count + smoothing for count in counts]
+
+    def biasedWheel(self, smoothing=1.0, recent=False, seed=None):
+        """A :obj:`.Wheel` whose spins follow :meth:`weights`.
+
+        Its rng is a :obj:`.TiltedRandom`, so it plays with any :obj:`.Game` and seeds like
+        any wheel; the compiled engine leaves it to the reference one.
+
+        Raises:
+            ValueError: if ``smoothing`` leaves a bin no chance.
+        """
+        weights = self.weights(smoothing, recent)
+        if min(weights) <= 0:
+            raise ValueError('every bin needs a chance; raise the smoothing')
+        wheel = bd.Wheel()
+        bb.BinBuilder.buildBins(wheel)
+        wheel.rng = vr.TiltedRandom(weights, seed)
+        return wheel
+
+    def report(self):
+        """Summary of the tests, one line per item."""
+        total, recent = self.chiSquare(), self.chiSquare(recent=True)
+        pockets, spins = self.sectors()[0]
+        expected = self.spins * len(pockets) / BINS
+        lines = ['spins: %d' % self.spins,
+                 'chi-square: %.2f, p = %.3g' % total,
+                 'chi-square of the last %d: %.2f, p = %.3g' % ((self.filled,) + recent),
+                 'hottest sector: %s, %d spins for %.1f expected' % (
+                     '-'.join('00' if number == 37 else str(number) for number in pockets),
+                     spins, expected)]
+        for number, at in sorted(self.alarms.items(), key=lambda alarm: alarm[1]):
+            lines.append('bin %s biased after %d spins' % ('00' if number == 37 else number, at))
+        return lines
+
+
+def get_args():
+    '''This function parses and return arguments passed in'''
+    parser = argparse.ArgumentParser(description="Test spin logs for a biased wheel.")
+    parser.add_argument("paths", nargs='+', help="spin logs, CSV or one byte per spin")
+    parser.add_argument("--window", type=int, default=100000, help="spins in the window")
+    parser.add_argument("--sector", type=int, default=5, help="pockets in a sector")
+    parser.add_argument("--bias", type=float, default=0.2,
+                        help="excess frequency of a biased bin")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="spins per chunk")
+    parser.add_argument("-v", "--verbose", help="increase output verbosity",
+                        action="store_true")
+    return parser.parse_args()
+
+
+def main(args=None):
+    """enters function"""
+    if args is None:
+        args = get_args()
+    loglevel = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    monitor = BiasMonitor(bb.sharedWheel(), args.window, args.sector, args.bias)
+    for path in args.paths:
+        monitor.ingest(readSpins(path, args.chunk))
+    print('\n'.join(monitor.report()))
+
+
+if __name__ == '__main__':
+    main()
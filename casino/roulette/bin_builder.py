@@ -1,6 +1,8 @@
 """This module contains the BinBuilder class. Frankly, this class should just be turned into a module."""
 
-from .board import Outcome
+from .board import Outcome, Wheel
+
+_shared = {}
 
 
 class BinBuilder:
@@ -136,7 +138,7 @@ class BinBuilder:
 
     def _color_bet(self, wheel, bin_num):
         """Create color bet outcomes for bin"""
-        reds = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 34, 36}
+        reds = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36}
         if 0 < bin_num < 37:
             wheel.addOutcome(
                 bin_num,
@@ -153,7 +155,7 @@ class BinBuilder:
 
     def _hight_bet(self, wheel, bin_num):
         """Create hight bet outcomes for bin"""
-        if 0 < bin_num < 18:
+        if 0 < bin_num <= 18:
             wheel.addOutcome(bin_num, Outcome('Low', 1))
         elif 18 < bin_num < 37:
             wheel.addOutcome(bin_num, Outcome('High', 1))
@@ -188,3 +190,37 @@ class BinBuilder:
         for bin_num in range(38):
             for bet in bets:
                 getattr(builder, bet)(wheel, bin_num)
+
+
+def sharedWheel():
+    """American :obj:`.Wheel` built once per process and shared by every caller.
+
+    Process pool workers use it so that only their first task pays for building the bins.
+    """
+    wheel = _shared.get('american')
+    if wheel is None:
+        wheel = _shared['american'] = Wheel()
+        BinBuilder.buildBins(wheel)
+    return wheel
+
+
+def useArrays(arrays):
+    """Make the American wheel of this process the one packed in ``arrays``.
+
+    Workers which attached to a :obj:`.SharedWheel` rebuild :func:`sharedWheel` from it
+    rather than with :obj:`BinBuilder`, and the compiled engine reads its tables from
+    the arrays, see :func:`sharedArrays`.
+
+    Args:
+        arrays (:obj:`.WheelArrays`): tables of the American wheel.
+    """
+    _shared['arrays'] = arrays
+    if 'american' not in _shared:
+        _shared['american'] = arrays.wheel()
+
+
+def sharedArrays(wheel):
+    """Packed tables of ``wheel`` given to :func:`useArrays`, or ``None``."""
+    if wheel is _shared.get('american'):
+        return _shared.get('arrays')
+    return None
@@ -7,6 +7,7 @@ This module contains two important classes:
 
     :obj:`Wheel` which contains the set of all bets and all bets for each bin (00, and 0 to 36).
     :obj:`Table` which contains all present bets by a player.
+    :obj:`TableRules` which adds limits per bet family to a :obj:`Table`\'s.
 
 The game and player exist independently from casino table game.
 
@@ -25,8 +26,12 @@ Todo:
     http://sphinxcontrib-napoleon.readthedocs.io/en/latest/example_google.html
 """
 
+import collections
+import hashlib
 import logging
+import math
 import random
+from array import array
 from pprint import pprint
 
 # for tips on logging go to
@@ -79,6 +84,8 @@ class Wheel:
         self.all_outcomes = set()
         # index 37 = '00', else index matches slot
         self.rng = random.Random()
+        self.history = None
+        self.version = 0  # changes with the bins, so caches of them can tell
 
     def addOutcome(self, number, outcome):
         """Add outcomes to bin and maintain set of distinct outcomes.
@@ -89,6 +96,7 @@ class Wheel:
         """
         self.bins[number].add(outcome)
         self.all_outcomes.add(outcome)
+        self.version += 1
 
     def getOutcome(self, name):
         """get all outcomes containing ``name``
@@ -102,18 +110,180 @@ class Wheel:
         return {oc for oc in self.all_outcomes if name.casefold()
                 in oc.name.casefold()}
 
+    def fingerprint(self):
+        """Digest of the layout: every bin's outcomes and their odds.
+
+        Return:
+            str: hex digest, equal for wheels built the same way.
+        """
+        digest = hashlib.sha256()
+        for number, bin in enumerate(self.bins):
+            for outcome in sorted(bin, key=lambda oc: oc.name):
+                digest.update('{0:d}:{1:s}:{2:d};'.format(
+                    number, outcome.name, outcome.odds).encode())
+        return digest.hexdigest()
+
+    def track(self, size=64):
+        """Keep a :obj:`SpinHistory` of at least ``size`` spins from now on.
+
+        Call once the bins are built. Players sharing the wheel share the history: one
+        asking for more spins than it keeps grows it in place, so every player holding
+        it keeps reading the same counters.
+
+        Return:
+            :obj:`SpinHistory`
+        """
+        if self.history is None:
+            self.history = SpinHistory(self, size)
+        elif self.history.size < size:
+            self.history.grow(size)
+        return self.history
+
+    def spin(self):
+        """Select a bin number, and add it to the :attr:`history` if one is kept.
+
+        Return:
+            int: index of the bin, the same draw :meth:`next` makes.
+        """
+        number = self.rng.choice(range(len(self.bins)))
+        if self.history is not None:
+            self.history.record(number)
+        return number
+
     def next(self):
         """Select bin from bins
 
         Return:
             :obj:`Bin`: random bin from wheel.
         """
-        return self.rng.choice(self.bins)
+        return self.bins[self.spin()]
 
     def __getitem__(self, index):
         return self.bins[index]
 
 
+class SpinHistory:
+    """Ring buffer of the last :attr:`size` spins of a :obj:`Wheel`, with running counters.
+
+    Recording a spin only touches the outcomes of the bin which came up and of the bin
+    which dropped out of the window, so however long the window, every question below is
+    answered in constant time rather than by rescanning past bins.
+
+    Examples:
+        >>> wheel = Wheel()
+        >>> wheel.addOutcome(1, Outcome('Red', 1)); wheel.addOutcome(2, Outcome('Black', 1))
+        >>> history = SpinHistory(wheel, size=3)
+        >>> for number in (1, 1, 2, 1, 1):
+        ...     history.record(number)
+        >>> red = Outcome('Red', 1)
+        >>> history.recent(), history.count(red), history.streak(red), history.absence(red)
+        ([2, 1, 1], 2, 2, 0)
+
+    Args:
+        wheel (:obj:`Wheel`): a wheel whose bins are built.
+        size (int, default 64): spins kept.
+
+    Attributes:
+        size (int): spins kept.
+        spins (int): spins recorded since the last :meth:`clear`.
+
+    Raises:
+        ValueError: if ``size`` is less than one.
+    """
+
+    def __init__(self, wheel, size=64):
+        if size < 1:
+            raise ValueError('a history keeps at least one spin')
+        self.size = size
+        outcomes = sorted(wheel.all_outcomes, key=lambda oc: oc.name)
+        self.ids = {outcome: number for number, outcome in enumerate(outcomes)}
+        self.binOutcomes = [tuple(self.ids[outcome] for outcome in bin) for bin in wheel.bins]
+        self.clear()
+
+    def clear(self):
+        """Forget every spin, at the start of a session."""
+        self.ring = array('B', bytes(self.size))
+        self.spins = 0
+        self.first = 0  # oldest spin the ring holds, counted from 0
+        self.counts = [0] * len(self.ids)
+        self.lastSeen = [0] * len(self.ids)  # spin of the last hit, 0 if none
+        self.runStart = [0] * len(self.ids)  # first spin of the current run of hits
+
+    def record(self, number):
+        """Add a spin which landed in bin ``number``."""
+        position = self.spins % self.size
+        counts = self.counts
+        if self.spins - self.size >= self.first:
+            for outcome in self.binOutcomes[self.ring[position]]:
+                counts[outcome] -= 1
+        self.ring[position] = number
+        self.spins += 1
+        spins = self.spins
+        lastSeen, runStart = self.lastSeen, self.runStart
+        for outcome in self.binOutcomes[number]:
+            counts[outcome] += 1
+            if not lastSeen[outcome] or lastSeen[outcome] != spins - 1:
+                runStart[outcome] = spins
+            lastSeen[outcome] = spins
+
+    def grow(self, size):
+        """Keep ``size`` spins from now on, with the spins and counters kept so far.
+
+        The window fills up to ``size`` spins as new ones are recorded.
+        """
+        if size <= self.size:
+            return
+        ring = array('B', bytes(size))
+        kept = len(self)
+        for spin in range(self.spins - kept, self.spins):
+            ring[spin % size] = self.ring[spin % self.size]
+        self.ring, self.size, self.first = ring, size, self.spins - kept
+
+    def getstate(self):
+        """The window and counters, as immutable values.
+
+        Return:
+            tuple
+        """
+        return (bytes(self.ring), self.spins, self.first, tuple(self.counts),
+                tuple(self.lastSeen), tuple(self.runStart))
+
+    def setstate(self, state):
+        """Restore a state from :meth:`getstate`."""
+        ring, self.spins, self.first, counts, lastSeen, runStart = state
+        self.ring = array('B', ring)
+        self.size = len(self.ring)
+        self.counts, self.lastSeen, self.runStart = list(counts), list(lastSeen), list(runStart)
+
+    def __len__(self):
+        """Spins in the window."""
+        return min(self.spins - self.first, self.size)
+
+    def recent(self, count=None):
+        """Bin numbers of the last ``count`` spins in the window, oldest first.
+
+        Return:
+            list of int
+        """
+        count = len(self) if count is None else min(count, len(self))
+        return [self.ring[spin % self.size] for spin in range(self.spins - count, self.spins)]
+
+    def count(self, outcome):
+        """Spins in the window which ``outcome`` won."""
+        return self.counts[self.ids[outcome]]
+
+    def streak(self, outcome):
+        """Spins in a row, up to the last, which ``outcome`` won; not limited to the window."""
+        number = self.ids[outcome]
+        if self.spins and self.lastSeen[number] == self.spins:
+            return self.spins - self.runStart[number] + 1
+        return 0
+
+    def absence(self, outcome):
+        """Spins since ``outcome`` last won, or since :meth:`clear` if it has not."""
+        return self.spins - self.lastSeen[self.ids[outcome]]
+
+
 class Bet:
     """Player to Outcome API.
 
@@ -157,12 +327,253 @@ class Bet:
         return other + self.amount
 
 
+class Layout:
+    """:obj:`Bet`\s on a :obj:`Table` compiled against the bins of a :obj:`Wheel`.
+
+    Settling the bets against a bin is then an index into per-bin tables rather than a
+    search of the bin for each bet's outcome, and the tables give the exact distribution
+    of a round's result under a fair spin.
+
+    Examples:
+        >>> wheel = Wheel()
+        >>> red, black = Outcome('Red', 1), Outcome('Black', 1)
+        >>> wheel.addOutcome(0, red); wheel.addOutcome(1, black)
+        >>> layout = Layout(wheel.bins[:2], [Bet(10, red), Bet(5, black)])
+        >>> layout.net, layout.mean, layout.variance
+        ([5, -5], 0.0, 25.0)
+
+    Args:
+        bins (list of :obj:`Bin`): the wheel's bins, in order.
+        bets (list of :obj:`Bet`): the bets to compile.
+
+    Attributes:
+        staked (int): total amount bet.
+        returns (list of int): paid back when the ball lands in each bin, stakes included.
+        net (list of int): ``returns`` less ``staked``, the result of a round.
+        hits (list of tuple of bool): ``hits[bin][i]`` tells whether the ``i``-th bet wins.
+    """
+
+    def __init__(self, bins, bets):
+        self.staked = sum(bet.amount for bet in bets)
+        self.hits = [tuple(bet.outcome in bin for bet in bets) for bin in bins]
+        self.returns = [sum(bet.winAmount() for bet, won in zip(bets, hits) if won)
+                        for hits in self.hits]
+        self.net = [returned - self.staked for returned in self.returns]
+
+    @property
+    def mean(self):
+        """Expected result of a round."""
+        return sum(self.net) / len(self.net)
+
+    @property
+    def variance(self):
+        """Variance of the result of a round."""
+        mean = self.mean
+        return sum((net - mean) ** 2 for net in self.net) / len(self.net)
+
+
+class LayoutCache:
+    """Compiled :obj:`Layout`\s of a :obj:`Wheel`, keyed by the outcomes and amounts bet.
+
+    Players who bet the same way round after round compile their layout once. Rows of
+    outcomes first bet on after the cache was made are built when they are asked for, and
+    everything is compiled again once outcomes are added to the wheel.
+
+    Args:
+        wheel (:obj:`Wheel`): the wheel whose bins the layouts are compiled against.
+        size (int, default 1024): layouts kept; the least recently used goes first.
+
+    Attributes:
+        hits (int): layouts found in the cache.
+        misses (int): layouts compiled.
+    """
+
+    def __init__(self, wheel, size=1024):
+        self.wheel = wheel
+        self.size = size
+        self.layouts = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.version = None
+        self.fresh()
+
+    def fresh(self):
+        """Compile the rows again if outcomes were added to the wheel since.
+
+        Return:
+            dict: outcome name to its :meth:`row`.
+        """
+        if self.version != self.wheel.version:
+            self.version = self.wheel.version
+            self.layouts.clear()
+            self.rows = {outcome.name: bytes(outcome in bin for bin in self.wheel.bins)
+                         for outcome in self.wheel.all_outcomes}
+        return self.rows
+
+    def row(self, outcome):
+        """Whether ``outcome`` wins in each bin, as a single bet :obj:`Layout`\'s hits.
+
+        An outcome which is not on the wheel never wins.
+
+        Return:
+            bytes: ``1`` for the bins holding the outcome, ``0`` elsewhere.
+        """
+        row = self.rows.get(outcome.name)
+        if row is None:
+            row = self.rows[outcome.name] = bytes(outcome in bin for bin in self.wheel.bins)
+        return row
+
+    def compile(self, bets):
+        """:obj:`Layout` of ``bets``.
+
+        Return:
+            :obj:`Layout`
+        """
+        self.fresh()
+        key = tuple((bet.outcome.name, bet.amount) for bet in bets)
+        layout = self.layouts.get(key)
+        if layout is not None:
+            self.hits += 1
+            self.layouts.move_to_end(key)
+            return layout
+        self.misses += 1
+        layout = self.layouts[key] = Layout(self.wheel.bins, bets)
+        if len(self.layouts) > self.size:
+            self.layouts.popitem(last=False)
+        return layout
+
+
 class InvalidBet(Exception):
     """InvalidBet is raised when the :obj:`Player` attempts to place a bet which exceeds the table’s limit.
     """
     pass
 
 
+FAMILIES = ('Straight', 'Split', 'Street', 'Corner', 'Five', 'Line', 'Dozen', 'Column',
+            'Even money')
+GROUPS = {'inside': FAMILIES[:6], 'outside': FAMILIES[6:]}
+
+
+def family(outcome):
+    """Family of an :obj:`Outcome`, one of :data:`FAMILIES`, from its name.
+
+    Examples:
+        >>> family(Outcome('Split 1-2', 17)), family(Outcome('00-0-1-2-3', 6))
+        ('Split', 'Five')
+        >>> family(Outcome('Red', 1))
+        'Even money'
+    """
+    word = outcome.name.split(' ', 1)[0]
+    if word in FAMILIES:
+        return word
+    return 'Five' if '-' in word else 'Even money'
+
+
+class TableRules:
+    """Limits of a table per bet family, compiled once into flat lists by outcome id.
+
+    Real tables cap more than the sum of a player's bets: a straight up bet has its own
+    maximum, outside bets another, and each spot bet on has a minimum. The rules are
+    given per family of :data:`FAMILIES`, or per group of :data:`GROUPS`, ``'inside'``
+    or ``'outside'``, for every family of the group which has no rule of its own.
+    Outcome ids are positions in the order of names, as in :obj:`SpinHistory`\.
+
+    Examples:
+        >>> wheel = Wheel()
+        >>> for number, name in enumerate(('Straight 1', 'Red', 'Black'), 1):
+        ...     wheel.addOutcome(number, Outcome(name, 35 if number == 1 else 1))
+        >>> rules = TableRules(wheel, spots={'inside': (1, 100), 'outside': (5, 500)},
+        ...                    totals={'outside': 800})
+        >>> red, black = wheel.getOutcome('Red').pop(), wheel.getOutcome('Black').pop()
+        >>> rules.isValid([Bet(400, red), Bet(400, black)]), rules.bounds(red)
+        (True, (5, 500))
+        >>> rules.isValid([Bet(400, red), Bet(401, black)])
+        False
+
+    Args:
+        wheel (:obj:`Wheel`): a wheel whose bins are built.
+        spots (dict, default None): family or group to ``(minimum, maximum)`` of the bets
+            on any one outcome; ``None`` for no maximum.
+        totals (dict, default None): family or group to the maximum of all bets on it.
+
+    Attributes:
+        ids (dict): outcome name to id.
+        low (list of int): least bet on each outcome, by id.
+        high (list of float): most bet on each outcome, by id.
+        sums (list of tuple): the two totals each outcome's bets count towards: its
+            family's, numbered as in :data:`FAMILIES`, then its group's.
+        caps (list of float): most bet on each family, then on each group.
+        capped (list of tuple): the totals of :attr:`sums` which have a maximum.
+
+    Raises:
+        ValueError: for a rule of an unknown family.
+    """
+
+    def __init__(self, wheel, spots=None, totals=None):
+        self.spots = dict(spots or {})
+        self.totals = dict(totals or {})
+        names = FAMILIES + tuple(GROUPS)
+        unknown = [name for name in list(self.spots) + list(self.totals) if name not in names]
+        if unknown:
+            raise ValueError('unknown bet families %r' % unknown)
+        groupOf = {name: group for group, members in GROUPS.items() for name in members}
+        outcomes = sorted(wheel.all_outcomes, key=lambda oc: oc.name)
+        self.ids = {outcome.name: number for number, outcome in enumerate(outcomes)}
+        self.low, self.high, self.sums = [], [], []
+        for outcome in outcomes:
+            name = family(outcome)
+            low, high = self.spots.get(name, self.spots.get(groupOf[name], (0, None)))
+            self.low.append(low)
+            self.high.append(math.inf if high is None else high)
+            self.sums.append((FAMILIES.index(name), names.index(groupOf[name])))
+        self.caps = [self.totals.get(name, math.inf) for name in names]
+        self.capped = [tuple(total for total in pair if self.caps[total] < math.inf)
+                       for pair in self.sums]
+
+    def isValid(self, bets):
+        """Check a whole layout of :obj:`Bet`\s against every rule, in one pass.
+
+        Bets on the same outcome count as one bet on its spot.
+
+        Return:
+            bool
+        """
+        ids, capped = self.ids, self.capped
+        spots, totals = {}, {}
+        for bet in bets:
+            number = ids.get(bet.outcome.name)
+            if number is None:
+                return False
+            amount = bet.amount
+            spots[number] = spots.get(number, 0) + amount
+            for total in capped[number]:
+                totals[total] = totals.get(total, 0) + amount
+        low, high, caps = self.low, self.high, self.caps
+        for number, amount in spots.items():
+            if amount < low[number] or amount > high[number]:
+                return False
+        for total, amount in totals.items():
+            if amount > caps[total]:
+                return False
+        return True
+
+    def bounds(self, outcome):
+        """Least and most which may be bet on ``outcome`` when it is the only bet.
+
+        Return:
+            tuple: ``(minimum, maximum)``
+        """
+        number = self.ids[outcome.name]
+        own, group = self.sums[number]
+        return (self.low[number],
+                min(self.high[number], self.caps[own], self.caps[group]))
+
+    def __repr__(self):
+        return '{0:s}(spots={1!r}, totals={2!r})'.format(
+            type(self).__name__, dict(sorted(self.spots.items())),
+            dict(sorted(self.totals.items())))
+
+
 class Table:
     """Table contains all the Bets created by the Player.
     A table also has a betting limit, and the sum of all of a player’s bets must be
@@ -176,19 +587,23 @@ class Table:
             The sum of the bets from a Player must be less than or equal to this limit.
 
         minimum (int): This is the table minimum.
-            Each individual bet from a Player must be greate than this limit.
+            The sum of the bets from a Player must be greater than or equal to this minimum.
 
         bets (:obj:`list` of :obj:`Bet`\s): This is a list of the Bets currently active.
             These will result in either wins or losses to the Player.
+
+        rules (:obj:`TableRules`, default None): limits per bet family, on top of the
+            table limit and minimum.
     """
 
-    def __init__(self, limit, minimum, bets=None):
+    def __init__(self, limit, minimum, bets=None, rules=None):
         self.limit = limit
         self.minimum = minimum
         if bets is None:
             self.bets = []
         else:
             self.bets = bets
+        self.rules = rules
 
     def placeBet(self, bets):
         """Table to bet interface.
@@ -213,18 +628,40 @@ class Table:
 
         Applies the table-limit rules:
 
-        * The sum of all bets is less than or equal to the table limit.
-        * All bet amounts are greater than or equal to the table minimum
+        * The sum of all bets is between the table minimum and the table limit.
+        * With :attr:`rules`, the bets on each spot are within its family's limits and
+          the bets on each family within its maximum, checked in one pass by
+          :meth:`TableRules.isValid`\.
         """
-        if self.minimum <= sum(self.bets) <= self.limit:
+        if self.minimum <= sum(self.bets) <= self.limit and (
+                self.rules is None or self.rules.isValid(self.bets)):
             return None
         else:
             raise InvalidBet
 
+    def bounds(self, outcome):
+        """Least and most which may be bet on ``outcome`` when it is the only bet.
+
+        Return:
+            tuple: ``(minimum, maximum)``
+        """
+        if self.rules is None:
+            return self.minimum, self.limit
+        low, high = self.rules.bounds(outcome)
+        return max(self.minimum, low), min(self.limit, high)
+
     def clear(self):
         """Remove :obj:`Bet`\s once a :obj:`.Player` has won or lost."""
         self.bets = []
 
+    def layout(self, cache):
+        """The current bets compiled by ``cache``, a :obj:`LayoutCache`.
+
+        Return:
+            :obj:`Layout`
+        """
+        return cache.compile(self.bets)
+
     def __iter__(self):
         """Iterate over all bet in bets.
 
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""Compiled session engine for roulette players with simple state machines.
+
+Going through :meth:`.Game.cycle` costs a few microseconds a round: the player builds a
+:obj:`.Bet`, the :obj:`.Table` validates it, the bin is searched for the outcome and the
+player is notified. For players whose strategy is a small state machine the whole
+session can instead be lowered to a loop over plain integers:
+
+    :obj:`WheelTables`
+        flattens the :obj:`.Wheel` into a row per :obj:`.Outcome` of what each bin pays
+        back per unit bet, stake included, or nothing.
+    :obj:`Program`
+        describes a player's state machine as flat tables: the bet of each state and
+        the next state for each kind of spin. :func:`compilePlayer` lowers the players
+        it knows, the progressions of :mod:`casino.roulette.players` among them, and
+        returns ``None`` for the others. :func:`programState` finds the state a
+        player part way through a session is in, so the sessions of a :obj:`.Fork`
+        start from it.
+    :obj:`CompiledExecutor`
+        a :mod:`casino.simulation` executor which plays compiled sessions.
+
+When `Numba <https://numba.pydata.org>`_ is installed, the session loop is JIT compiled
+and fed an array of spins drawn up front. Otherwise a pure Python loop draws spins as it
+goes. Players which cannot be compiled, and unseeded simulators, fall back to
+:meth:`.Simulator.records`, which stays the reference: compiled sessions give the same
+records as :meth:`.Game.cycle`, spin for spin.
+"""
+
+import logging
+import random
+
+from .. import fork as fk
+from .. import simulation as sim
+from . import bin_builder as bb
+from . import board as bd
+from . import players as ply
+
+try:
+    import numba
+    import numpy
+except ImportError:  # optional: the pure Python engine is used instead
+    numba = None
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+BACKEND = 'python' if numba is None else 'numba'
+INVALID = -1  # rounds played when a bet breaks the table limits
+
+
+class WheelTables:
+    """Flat lookup tables of a :obj:`.Wheel`.
+
+    Attributes:
+        outcomes (list of :obj:`.Outcome`): every outcome, sorted by name.
+        index (dict): outcome to its position in :attr:`outcomes`.
+        payouts (list of list of int): ``payouts[outcome][bin]`` is what a unit bet on
+            the outcome pays back when the ball lands in the bin, stake included.
+    """
+
+    def __init__(self, wheel):
+        self.outcomes = sorted(wheel.all_outcomes, key=lambda outcome: outcome.name)
+        self.index = {outcome: position for position, outcome in enumerate(self.outcomes)}
+        self.payouts = [[outcome.odds + 1 if outcome in bin else 0 for bin in wheel.bins]
+                        for outcome in self.outcomes]
+
+    @property
+    def bins(self):
+        """Number of bins"""
+        return len(self.payouts[0])
+
+    @classmethod
+    def fromArrays(cls, arrays):
+        """Tables read from a wheel packed by :mod:`casino.roulette.shared`, without the wheel.
+
+        Args:
+            arrays (:obj:`.WheelArrays`): e.g. a :obj:`.SharedWheel` a worker attached to.
+
+        Return:
+            :obj:`ArrayTables`
+        """
+        return ArrayTables(arrays)
+
+    def row(self, outcome):
+        """Payouts of ``outcome`` for every bin."""
+        return self.payouts[self.index[outcome]]
+
+
+class ArrayTables(WheelTables):
+    """:obj:`WheelTables` read from packed arrays, as a worker attached to a
+    :obj:`.SharedWheel` gets them.
+
+    Only the rows of the outcomes asked for are worked out, from the bin index of the
+    arrays; :attr:`outcomes` and :attr:`payouts` are built on first use.
+
+    Attributes:
+        arrays (:obj:`.WheelArrays`): the packed tables.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.rows = {}
+        self._outcomes = None
+
+    @property
+    def bins(self):
+        return self.arrays.bins
+
+    @property
+    def outcomes(self):
+        if self._outcomes is None:
+            self._outcomes = [bd.Outcome(self.arrays.outcomeName(number), self.arrays.odds[number])
+                              for number in range(len(self.arrays))]
+        return self._outcomes
+
+    @property
+    def payouts(self):
+        return [self.row(outcome) for outcome in self.outcomes]
+
+    def row(self, outcome):
+        """Payouts of ``outcome`` for every bin.
+
+        Raises:
+            KeyError: if the wheel has no such outcome.
+        """
+        row = self.rows.get(outcome.name)
+        if row is None:
+            row = self.rows[outcome.name] = self.arrays.payouts(self.arrays.find(outcome.name))
+        return row
+
+
+def wheelTables(wheel):
+    """Tables of ``wheel``, read from the shared arrays it was rebuilt from if any.
+
+    Return:
+        :obj:`WheelTables`
+    """
+    arrays = bb.sharedArrays(wheel)
+    return WheelTables(wheel) if arrays is None else WheelTables.fromArrays(arrays)
+
+
+class Program:
+    """State machine of a compiled player.
+
+    The state after a round depends on the state and on the kind of spin: ``0`` when
+    none of the :attr:`watch` outcomes is in the winning bin, otherwise one plus the
+    position of the first which is. The tables are flat lists of int, so every session
+    of a batch shares them and only carries its state number.
+
+    Attributes:
+        outcome (:obj:`.Outcome`): the outcome bet on.
+        base (int): the unit bet.
+        units (list of int): bet of each state, in multiples of :attr:`base`; ``0``
+            sits the round out.
+        moves (list of int): ``moves[state * width + kind]`` is the next state.
+        watch (list of :obj:`.Outcome`): outcomes which tell spins apart.
+        stopping (bool): the player stops when the next bet is more than the stake or
+            the table limit.
+        size (int, default 1): chips staked for each unit bet. A program betting a
+            portfolio of outcomes at once, as :mod:`casino.roulette.search` does, is
+            played with the portfolio's payouts and its total size.
+        start (int, default 0): state sessions start in.
+    """
+
+    def __init__(self, outcome, base, units, moves, watch, stopping=True, size=1, start=0):
+        self.outcome = outcome
+        self.base = base
+        self.units = list(units)
+        self.moves = list(moves)
+        self.watch = list(watch)
+        self.stopping = stopping
+        self.size = size
+        self.start = start
+
+    @property
+    def width(self):
+        """Kinds of spin."""
+        return len(self.watch) + 1
+
+    @classmethod
+    def flat(cls, outcome, base):
+        """The same bet every round, whatever happens."""
+        return cls(outcome, base, [1], [0, 0], [outcome], stopping=False)
+
+    @classmethod
+    def levels(cls, player):
+        """The level tables of a :obj:`.LevelProgression`."""
+        moves = []
+        for lose, win in zip(player.onLose, player.onWin):
+            moves.extend((lose, win))
+        return cls(player.black, player.base, player.units, moves, [player.black])
+
+    @classmethod
+    def sevenReds(cls, player):
+        """:obj:`.SevenReds`: a Martingale level for every number of reds seen in a row.
+
+        State ``seen * levels + level``; kinds are 0 for neither colour, 1 for black and
+        2 for red.
+        """
+        levels, top, wait = len(player.units), len(player.units) - 1, player.WAIT
+        units, moves = [], []
+        for seen in range(wait + 1):
+            for level in range(levels):
+                if seen < wait:
+                    units.append(0)
+                    moves.extend((level, level, (seen + 1) * levels + level))
+                else:
+                    climb = min(level + 1, top)
+                    units.append(player.units[level])
+                    moves.extend((climb, 0, seen * levels + climb))
+        return cls(player.black, player.base, units, moves, [player.black, player.red])
+
+
+COMPILERS = {
+    ply.Passenger57: lambda player: Program.flat(player.black, 10),
+    ply.Martingale: Program.levels,
+    ply.Paroli: Program.levels,
+    ply.Player1326: Program.levels,
+    ply.Fibonacci: Program.levels,
+    ply.DAlembert: Program.levels,
+    ply.SevenReds: Program.sevenReds,
+}
+
+
+def _sevenRedsState(player):
+    return (player.WAIT - player.redCount) * len(player.units) + player.level
+
+
+STATES = {
+    ply.Passenger57: lambda player: 0,
+    ply.Martingale: lambda player: player.level,
+    ply.Paroli: lambda player: player.level,
+    ply.Player1326: lambda player: player.level,
+    ply.Fibonacci: lambda player: player.level,
+    ply.DAlembert: lambda player: player.level,
+    ply.SevenReds: _sevenRedsState,
+}
+
+
+def compilePlayer(player):
+    """Lower ``player`` to a :obj:`Program`, or ``None`` if its strategy is not known.
+
+    Only the exact classes of :data:`COMPILERS` are compiled, since a subclass may change
+    any method. :obj:`.Labouchere` is not: its line of units has no bound, so it has no
+    finite table of states.
+    """
+    compiler = COMPILERS.get(type(player))
+    return None if compiler is None else compiler(player)
+
+
+def programState(player):
+    """State of :func:`compilePlayer`\'s program which ``player`` is in right now.
+
+    Return:
+        int: or ``None`` if the player is not compiled.
+    """
+    state = STATES.get(type(player))
+    return None if state is None else state(player)
+
+
+def playSession(draw, payouts, kinds, units, moves, width, stake, rounds, base, size,
+                stopping, minimum, limit, state=0):
+    """Play one compiled session, drawing each spin with ``draw()``.
+
+    Args:
+        payouts (list of int): what a unit bet pays back from each bin, stake included.
+        kinds (list of int): kind of spin of each bin.
+        units, moves, width, size: the :obj:`Program`\'s tables and size.
+        state (int, default 0): state the session starts in.
+
+    Return:
+        tuple: ``(rounds played, highest stake, final stake)``; the rounds played are
+        :data:`INVALID` if a bet broke the table limits.
+    """
+    played = 0
+    maximum = None
+    while played < rounds and stake > 0:
+        amount = base * units[state]
+        cost = amount * size
+        if stopping and (cost > stake or cost > limit):
+            break
+        spin = draw()
+        if amount:
+            if not minimum <= cost <= limit:
+                return INVALID, maximum, stake
+            stake -= cost
+            stake += amount * payouts[spin]
+        state = moves[state * width + kinds[spin]]
+        played += 1
+        if maximum is None or stake > maximum:
+            maximum = stake
+    return played, maximum, stake
+
+
+def playSpins(spins, payouts, kinds, units, moves, width, stake, rounds, base, size,
+              stopping, minimum, limit, state=0):
+    """:func:`playSession` over spins drawn up front, in a form Numba can compile.
+
+    ``maximum`` starts from the lowest stake possible, ``stake - rounds * limit``, since
+    Numba needs one type for it; sessions with no rounds are handled by the caller.
+    """
+    played = 0
+    maximum = stake - rounds * limit - 1
+    while played < rounds and stake > 0:
+        amount = base * units[state]
+        cost = amount * size
+        if stopping and (cost > stake or cost > limit):
+            break
+        spin = spins[played]
+        if amount:
+            if cost < minimum or cost > limit:
+                return INVALID, maximum, stake
+            stake -= cost
+            stake += amount * payouts[spin]
+        state = moves[state * width + kinds[spin]]
+        played += 1
+        if stake > maximum:
+            maximum = stake
+    return played, maximum, stake
+
+
+if numba is not None:
+    playSpins = numba.njit(cache=True)(playSpins)
+
+
+class CompiledExecutor:
+    """Plays seeded sessions of compiled players in this process.
+
+    Sessions of players :func:`compilePlayer` does not know, of unseeded simulators, and
+    of games or wheels whose behaviour has been changed by a subclass are played by
+    :meth:`.Simulator.records` instead. The sessions of a :obj:`.Fork` start in the
+    program state of its snapshot, with its stake and rounds to go, unless bets were
+    left on the table or the wheel keeps a history, which compiled sessions do not.
+
+    A compiled player bets on one outcome, so the :obj:`.TableRules` of its table come
+    down to the least and most it may bet there, looked up once per batch; each round
+    then checks its bet against two numbers.
+
+    Args:
+        batchSize (int, default 64): sessions per yielded batch.
+    """
+
+    def __init__(self, batchSize=64):
+        self.batchSize = batchSize
+        self.tables = {}
+
+    def _tables(self, wheel):
+        tables = self.tables.get(id(wheel))
+        if tables is None or tables[0] is not wheel:
+            tables = self.tables[id(wheel)] = (wheel, wheelTables(wheel))
+        return tables[1]
+
+    def run(self, simulator, start, stop):
+        """Yield lists of session records in session order."""
+        program = compilePlayer(simulator.player)
+        game = simulator.game
+        if program is not None and isinstance(simulator, fk.Fork):
+            simulator.snapshot.restore(game, simulator.player, random=False)
+            if simulator.player.table.bets or game.wheel.history is not None:
+                program = None
+            else:
+                program.start = programState(simulator.player)
+        if program is None or simulator.seed is None or type(game) is not ply.Game \
+                or type(game.wheel.rng) is not random.Random:
+            LOGGER.debug('playing %s with the reference engine', type(simulator.player).__name__)
+            for low in range(start, stop, self.batchSize):
+                yield simulator.records(low, min(low + self.batchSize, stop))
+            return
+        for low in range(start, stop, self.batchSize):
+            yield self.records(simulator, program, low, min(low + self.batchSize, stop))
+
+    def arguments(self, simulator, program):
+        """The arguments of :func:`playSpins` after the spins, for ``simulator``\'s
+        sessions of ``program``.
+
+        Return:
+            tuple
+        """
+        game = simulator.game
+        tables = self._tables(game.wheel)
+        payouts = tables.row(program.outcome)
+        rows = [tables.row(outcome) for outcome in program.watch]
+        kinds = [next((kind + 1 for kind, row in enumerate(rows) if row[bin]), 0)
+                 for bin in range(len(payouts))]
+        minimum, limit = game.table.bounds(program.outcome)  # the rules of a one bet layout
+        return (payouts, kinds, program.units, program.moves, program.width,
+                simulator.initStake, simulator.initDuration, program.base,
+                program.size, program.stopping, minimum, limit, program.start)
+
+    def records(self, simulator, program, start, stop):
+        """Compiled equivalent of :meth:`.Simulator.records`.
+
+        Raises:
+            :obj:`.InvalidBet`: if the program bets outside the table limits.
+        """
+        game = simulator.game
+        rng = game.wheel.rng
+        arguments = self.arguments(simulator, program)
+        if numba is not None:
+            arrays = tuple(numpy.array(table) for table in arguments[:4])
+        draw = rng.randrange
+        size = len(game.wheel.bins)
+        records = []
+        for index in range(start, stop):
+            game.seed(sim.sessionSeed(simulator.seed, index))
+            if numba is None:
+                played, maximum, final = playSession(lambda: draw(size), *arguments)
+            else:
+                spins = numpy.array([draw(size) for _ in range(simulator.initDuration)])
+                played, maximum, final = playSpins(spins, *arrays, *arguments[4:])
+            if played == INVALID:
+                raise bd.InvalidBet
+            if not played:
+                maximum = final = simulator.initStake
+            records.append((index, played, maximum, final))
+        return records
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""Exact session statistics of flat betting roulette players, without simulation.
+
+A player who places the same bets every round, such as :obj:`.Passenger57`, wins the
+:attr:`.Layout.net` of the bin the ball lands in, each bin with probability one in 38.
+A session is a random walk with those steps which stops when the stake runs out or the
+rounds do. :obj:`ExactSessions` pushes the probability of every ``(stake, highest
+stake)`` pair through the rounds instead of sampling walks, which gives:
+
+    * the probability of ruin by each round,
+    * the distributions of the duration, highest stake and final stake which
+      :meth:`.Simulator.run` estimates, with their means, deviations and quantiles.
+
+The work grows with the number of distinct pairs, about the square of the rounds for a
+single even money bet, rather than with a sample count; results are exact up to
+floating point rounding.
+
+Examples:
+    >>> exact = ExactSessions.fromSimulator(simulator)  # doctest: +SKIP
+    >>> exact.maxima.mean, exact.ruin[-1], exact.finals.quantile(0.05)  # doctest: +SKIP
+"""
+
+import bisect
+import itertools
+import logging
+import math
+
+from . import board as bd
+from . import players as ply
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+FLAT = {
+    ply.Passenger57: lambda player: [bd.Bet(10, player.black)],
+}
+
+
+class Distribution:
+    """Discrete distribution of a session statistic.
+
+    Args:
+        probabilities (dict): value to probability.
+
+    Attributes:
+        values (list): values in increasing order.
+        probabilities (list of float): probability of each value.
+    """
+
+    def __init__(self, probabilities):
+        self.values = sorted(probabilities)
+        self.probabilities = [probabilities[value] for value in self.values]
+        self.cumulative = list(itertools.accumulate(self.probabilities))
+
+    @property
+    def mean(self):
+        return sum(value * p for value, p in zip(self.values, self.probabilities))
+
+    @property
+    def stdev(self):
+        mean = self.mean
+        return math.sqrt(sum((value - mean) ** 2 * p
+                             for value, p in zip(self.values, self.probabilities)))
+
+    def atLeast(self, value):
+        """Probability of ``value`` or more."""
+        return sum(self.probabilities[bisect.bisect_left(self.values, value):])
+
+    def quantile(self, q):
+        """Smallest value whose cumulative probability reaches ``q``."""
+        position = bisect.bisect_left(self.cumulative, q - 1e-12)
+        return self.values[min(position, len(self.values) - 1)]
+
+    def __repr__(self):
+        return '{0:s}(mean={1!r}, stdev={2!r}, values={3!r})'.format(
+            type(self).__name__, self.mean, self.stdev, len(self.values))
+
+
+class ExactSessions:
+    """Exact statistics of sessions which place the same bets every round.
+
+    The session rules are those of :meth:`.Simulator.session` for a player whose
+    :meth:`~.Player.playing` only asks for a positive stake: a round is played while the
+    stake is above zero and rounds are left.
+
+    Args:
+        layout (:obj:`.Layout`): the bets of every round.
+        initStake (int): stake at the start.
+        initDuration (int): most rounds.
+
+    Attributes:
+        ruin (list of float): ``ruin[r]`` is the probability that the stake is gone after
+            ``r`` rounds.
+        durations (:obj:`Distribution`): rounds played.
+        maxima (:obj:`Distribution`): highest stake after a round; the initial stake for
+            sessions with no round.
+        finals (:obj:`Distribution`): final stake.
+    """
+
+    def __init__(self, layout, initStake, initDuration):
+        steps = {}
+        for net in layout.net:
+            steps[net] = steps.get(net, 0.0) + 1.0 / len(layout.net)
+        steps = list(steps.items())
+        durations, maxima, finals = {}, {}, {}
+        self.ruin = [0.0 if initStake > 0 else 1.0]
+        alive = {(initStake, None): 1.0} if initStake > 0 and initDuration > 0 else {}
+        if not alive:
+            durations[0] = maxima[initStake] = finals[initStake] = 1.0
+        for round in range(1, initDuration + 1):
+            following, ruined = {}, 0.0
+            for (stake, highest), p in alive.items():
+                for net, q in steps:
+                    after = stake + net
+                    top = after if highest is None or after > highest else highest
+                    if after > 0 and round < initDuration:
+                        key = (after, top)
+                        following[key] = following.get(key, 0.0) + p * q
+                        continue
+                    durations[round] = durations.get(round, 0.0) + p * q
+                    maxima[top] = maxima.get(top, 0.0) + p * q
+                    finals[after] = finals.get(after, 0.0) + p * q
+                    if after <= 0:
+                        ruined += p * q
+            self.ruin.append(self.ruin[-1] + ruined)
+            alive = following
+        self.durations = Distribution(durations)
+        self.maxima = Distribution(maxima)
+        self.finals = Distribution(finals)
+
+    @classmethod
+    def fromSimulator(cls, simulator):
+        """Exact statistics of a roulette :obj:`.Simulator`\\'s sessions.
+
+        Raises:
+            ValueError: if the player does not bet the same way every round, or its bets
+                break the table limits.
+        """
+        flat = FLAT.get(type(simulator.player))
+        if flat is None:
+            raise ValueError('%s does not place the same bets every round'
+                             % type(simulator.player).__name__)
+        game = simulator.game
+        bets = flat(simulator.player)
+        try:
+            bd.Table(game.table.limit, game.table.minimum, list(bets),
+                     game.table.rules).isValid()
+        except bd.InvalidBet:
+            raise ValueError('the bets break the table limits')
+        return cls(game.layouts.compile(bets), simulator.initStake, simulator.initDuration)
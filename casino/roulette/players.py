@@ -12,15 +12,18 @@ Todo:
 """
 
 import logging
-import statistics as stats
 from abc import ABCMeta, abstractmethod
 
+from .. import simulation as sim
 from . import board as bd
+from . import sizing as sz
 
 # for tips on logging go to
 # http://docs.python-guide.org/en/latest/writing/logging/
 LOGGER = logging.getLogger(__name__)
 
+TOP = 2 ** 40  # largest multiple of the base bet in a level table
+
 
 class Player(metaclass=ABCMeta):
     """This is a base class for designing players.
@@ -44,6 +47,7 @@ class Player(metaclass=ABCMeta):
     def _placeBets_helper(self, bets):
         for bet in bets:
             self.stake -= bet.loseAmount()
+        self.roundsToGo -= 1
         self.table.placeBet(bets)
 
     @abstractmethod
@@ -81,7 +85,7 @@ class Player(metaclass=ABCMeta):
 
         Return:
             bool"""
-        return (self.roundsToGo > 0)
+        return self.roundsToGo > 0 and self.stake > 0
 
     def setStake(self, stake):
         self.stake = stake
@@ -89,6 +93,64 @@ class Player(metaclass=ABCMeta):
     def setRounds(self, rounds):
         self.roundsToGo = rounds
 
+    def reset(self):
+        """Forget strategy state at the start of a session. The default player has none."""
+        self.table.clear()
+
+    def winners(self, outcomes):
+        """Notification from :obj:`Game` of the winning :obj:`.Bin`, after bets are settled.
+
+        Args:
+            outcomes (:obj:`.Bin`): the bin the ball landed in.
+        """
+        pass
+
+    def parameters(self):
+        """Settings which change how the player bets, used to identify cached results.
+
+        Return:
+            dict: the default player has none.
+        """
+        return {}
+
+    def getstate(self):
+        """Everything the player carries within a session, for :mod:`casino.fork`.
+
+        Attributes are kept by reference, apart from lists, which strategies change in
+        place and are copied. The bets on the :attr:`table` are included.
+
+        Return:
+            tuple: ``(attributes, bets)``
+        """
+        attributes = {name: list(value) if type(value) is list else value
+                      for name, value in vars(self).items()
+                      if name != 'table' and name != 'wheel'}
+        return attributes, tuple(self.table.bets)
+
+    def setstate(self, state):
+        """Restore a state from :meth:`getstate`."""
+        attributes, bets = state
+        vars(self).update(attributes)
+        for name, value in attributes.items():
+            if type(value) is list:
+                setattr(self, name, list(value))
+        self.table.bets = list(bets)
+
+
+def playerClasses():
+    """Every concrete :obj:`Player` subclass by name.
+
+    Return:
+        dict: class name to class.
+    """
+    classes, pending = {}, list(Player.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if not getattr(cls, '__abstractmethods__', None):
+            classes[cls.__name__] = cls
+    return classes
+
 
 class Passenger57(Player):
     """Dead simple player that always bets on black and has infinite money.
@@ -113,39 +175,330 @@ class Passenger57(Player):
         self._placeBets_helper(bets)
 
 
-class Martingale(Player):
+class Progression(Player):
+    """A :obj:`Player` who bets on black, with a bet that depends on how earlier bets went.
+
+    Note:
+        Subclass must implement :meth:`amount` and may override :meth:`win` and
+        :meth:`lose` to move along the progression.
+
+    Attributes:
+        base (int, default 10): the unit bet.
+    """
+
+    base = 10
+
+    def __init__(self, table, wheel):
+        super(Progression, self).__init__(table, wheel)  # call abc __init__
+        self.black = self.wheel.getOutcome('Black').pop()  # getOutcome returns a set
+
+    @abstractmethod
+    def amount(self):
+        """Next bet; ``0`` sits the round out."""
+        pass
+
+    def playing(self):
+        """Stop once the next bet is more than the stake or the table allows on black."""
+        amount = self.amount()
+        return (super(Progression, self).playing() and amount <= self.stake
+                and amount <= self.table.bounds(self.black)[1])
+
+    def parameters(self):
+        return {'base': self.base}
+
+    def placeBets(self):
+        """Bet :meth:`amount` on black."""
+        self._placeBets_helper([bd.Bet(self.amount(), self.black)])
+
+
+class LevelProgression(Progression):
+    """A :obj:`Progression` which moves between numbered levels after every bet.
+
+    The bet of each level and the level after a win or a loss are tables computed once
+    per class by :meth:`tables` and shared by every instance, so a player's whole state
+    is :attr:`level`. The last level of a table is never left by a loss.
+
+    Note:
+        Subclass must implement :meth:`tables`.
+
+    Attributes:
+        level (int): current level, ``0`` at the start of a session.
+        units (tuple of int): bet of each level, in multiples of :attr:`base`.
+        onWin (tuple of int): level after a win at each level.
+        onLose (tuple of int): level after a loss at each level.
+    """
+
+    def __init__(self, table, wheel):
+        super(LevelProgression, self).__init__(table, wheel)
+        cls = type(self)
+        if '_tables' not in cls.__dict__:
+            cls._tables = cls.tables()
+        self.units, self.onWin, self.onLose = cls._tables
+        self.level = 0
+
+    @classmethod
+    @abstractmethod
+    def tables(cls):
+        """Bet, level after a win and level after a loss of each level.
+
+        Return:
+            tuple: ``(units, onWin, onLose)`` tuples of int.
+        """
+        pass
+
+    def amount(self):
+        return self.base * self.units[self.level]
+
+    def reset(self):
+        """Start the progression over."""
+        self.level = 0
+        super(LevelProgression, self).reset()
+
+    def win(self, bet):
+        self.level = self.onWin[self.level]
+        super(LevelProgression, self).win(bet)
+
+    def lose(self):
+        self.level = self.onLose[self.level]
+        super(LevelProgression, self).lose()
+
+
+def _climbing(units, back):
+    """Tables of a progression which climbs a level on a loss and drops ``back`` on a win."""
+    last = len(units) - 1
+    return (tuple(units), tuple(max(level - back, 0) for level in range(len(units))),
+            tuple(min(level + 1, last) for level in range(len(units))))
+
+
+def _cycling(units):
+    """Tables of a progression which climbs a level on a win, back to the first after the
+    last, and starts over on a loss."""
+    return (tuple(units), tuple((level + 1) % len(units) for level in range(len(units))),
+            (0,) * len(units))
+
+
+class Martingale(LevelProgression):
     """`Martingale` is a :obj:`Player` who doubles their bet on every loss and resets their bet on win.
 
     Attributes:
+        base (int, default 10): bet after a win, doubled after every loss.
         lossCount (int): number of times to double the bet.
         betMultiple (int): bet multiplier based on the number of bets. Equal to 2^lossCount.
         """
 
-    def __init__(self, table, wheel):
-        super(Martingale, self).__init__(table, wheel)  # call abc __init__
-        self.black = self.wheel.getOutcome('Black').pop()  # getOutcome returns a set
-        self.lossCount = 0
+    @classmethod
+    def tables(cls):
+        units = [2 ** level for level in range(TOP.bit_length())]
+        return _climbing(units, back=len(units))
+
+    @property
+    def lossCount(self):
+        return self.level
+
+    @lossCount.setter
+    def lossCount(self, value):
+        self.level = value
 
     @property
     def betMultiple(self):
         """Double bet after each loss"""
-        return 2**self.lossCount
+        return self.units[self.level]
+
+
+class Paroli(LevelProgression):
+    """Doubles the bet after each win, up to three wins in a row, and resets it on a loss."""
+
+    @classmethod
+    def tables(cls):
+        return _cycling([1, 2, 4])
+
+
+class Player1326(LevelProgression):
+    """Bets 1, 3, 2 then 6 units on a run of wins and starts over on a loss or after the 6."""
+
+    @classmethod
+    def tables(cls):
+        return _cycling([1, 3, 2, 6])
 
-    def placeBets(self):
-        """Bet amount doubles after each loss and resets after each win"""
-        amount = 10 * self.betMultiple  # actually, not implemented
-        bets = [bd.Bet(amount, self.black)]  # instance of bet black
-        self._placeBets_helper(bets)
+
+class Fibonacci(LevelProgression):
+    """Moves one step along the Fibonacci sequence after a loss and two steps back after a win."""
+
+    @classmethod
+    def tables(cls):
+        units = [1, 1]
+        while units[-1] + units[-2] <= TOP:
+            units.append(units[-1] + units[-2])
+        return _climbing(units, back=2)
+
+
+class DAlembert(LevelProgression):
+    """Adds a unit to the bet after a loss and takes one off after a win."""
+
+    LEVELS = 4096
+
+    @classmethod
+    def tables(cls):
+        return _climbing(range(1, cls.LEVELS + 1), back=1)
+
+
+class Labouchere(Progression):
+    """Cancellation player: bets the sum of the ends of a line of units.
+
+    A win crosses both ends off the line and a loss adds the bet to its end. The line
+    starts over once every unit is crossed off.
+
+    Attributes:
+        line (tuple of int, default (1, 2, 3, 4)): the line at the start.
+        sequence (list of int): what is left of the line.
+    """
+
+    line = (1, 2, 3, 4)
+
+    def __init__(self, table, wheel):
+        super(Labouchere, self).__init__(table, wheel)
+        self.sequence = list(self.line)
+
+    def amount(self):
+        sequence = self.sequence
+        return self.base * (sequence[0] + sequence[-1] if len(sequence) > 1 else sequence[0])
+
+    def reset(self):
+        self.sequence = list(self.line)
+        super(Labouchere, self).reset()
+
+    def parameters(self):
+        return {'base': self.base, 'line': list(self.line)}
 
     def win(self, bet):
-        """Same as :obj:`Player`\'s win method but resets :attr:`lossCount`\."""
-        self.lossCount = 0
-        super(Martingale, self).win(bet)
+        if len(self.sequence) > 2:
+            del self.sequence[-1], self.sequence[0]
+        else:
+            self.sequence = list(self.line)
+        super(Labouchere, self).win(bet)
 
     def lose(self):
-        """Same as :obj:`Player`\'s :meth:`lose` method but increments :attr:`lossCount`\."""
-        self.lossCount += 1
-        super(Martingale, self).lose()
+        self.sequence.append(self.amount() // self.base)
+        super(Labouchere, self).lose()
+
+
+class SevenReds(Martingale):
+    """Waits for seven reds in a row, then bets black with a :obj:`Martingale`.
+
+    Any spin other than red starts the count over. The doubling carries over from one
+    series of bets to the next until black wins.
+
+    Attributes:
+        redCount (int): reds still to wait for before betting.
+    """
+
+    WAIT = 7
+
+    def __init__(self, table, wheel):
+        super(SevenReds, self).__init__(table, wheel)
+        self.red = self.wheel.getOutcome('Red').pop()
+        self.redCount = self.WAIT
+
+    def amount(self):
+        return super(SevenReds, self).amount() if self.redCount == 0 else 0
+
+    def reset(self):
+        self.redCount = self.WAIT
+        super(SevenReds, self).reset()
+
+    def placeBets(self):
+        """Bet black once enough reds have come up, otherwise sit the round out."""
+        if self.redCount == 0:
+            super(SevenReds, self).placeBets()
+        else:
+            self.roundsToGo -= 1
+
+    def winners(self, outcomes):
+        """Count the reds."""
+        if self.red in outcomes:
+            self.redCount = max(self.redCount - 1, 0)
+        else:
+            self.redCount = self.WAIT
+
+
+class SleepingDozen(Player):
+    """Bets on the dozen which has gone longest without a hit, once it has missed
+    :attr:`patience` spins in a row; sits the round out otherwise.
+
+    Reads the :obj:`.SpinHistory` of the :obj:`.Wheel`, which it starts keeping.
+
+    Attributes:
+        base (int, default 10): the bet.
+        patience (int, default 12): spins a dozen must miss before it is bet on.
+    """
+
+    base = 10
+    patience = 12
+
+    def __init__(self, table, wheel):
+        super(SleepingDozen, self).__init__(table, wheel)  # call abc __init__
+        self.dozens = sorted(self.wheel.getOutcome('Dozen'), key=lambda oc: oc.name)
+        self.history = self.wheel.track()
+
+    def playing(self):
+        """Stop once the stake cannot cover a bet."""
+        return super(SleepingDozen, self).playing() and self.base <= self.stake
+
+    def parameters(self):
+        return {'base': self.base, 'patience': self.patience}
+
+    def placeBets(self):
+        """Bet the sleepiest dozen if it has slept long enough."""
+        dozen = max(self.dozens, key=self.history.absence)
+        if self.history.absence(dozen) >= self.patience:
+            self._placeBets_helper([bd.Bet(self.base, dozen)])
+        else:
+            self.roundsToGo -= 1
+
+
+class KellyPlayer(Player):
+    """Bets a fixed fraction of the stake on each of its outcomes, the fractions which
+    make the stake grow fastest (the Kelly criterion), within an optional drawdown limit.
+
+    The fractions are solved once by :func:`.sizing` and cached; each round only scales
+    them by the stake. On a fair wheel every bet loses on average, so the player does
+    not bet at all unless :attr:`weights` favour some bins.
+
+    Attributes:
+        outcomes (tuple of str, default ('Black',)): names of the outcomes bet on.
+        weights (tuple of float, default None): relative chance of each bin, e.g. spin
+            counts of a biased wheel; every bin is as likely when ``None``.
+        drawdown (tuple, default None): ``(alpha, beta)``: the stake falls to ``alpha`` of
+            its value with a chance of at most ``beta``.
+        sizing (:obj:`.Sizing`): the solved fractions.
+    """
+
+    outcomes = ('Black',)
+    weights = None
+    drawdown = None
+
+    def __init__(self, table, wheel):
+        super(KellyPlayer, self).__init__(table, wheel)  # call abc __init__
+        self.sizing = None
+        self.reset()
+
+    def reset(self):
+        """Look the fractions up again, in case a setting changed."""
+        self.sizing = sz.sizing(self.wheel, self.table, self.outcomes, self.weights,
+                                self.drawdown)
+        super(KellyPlayer, self).reset()
+
+    def playing(self):
+        """Stop once the stake is too small for the table minimum."""
+        return super(KellyPlayer, self).playing() and any(self.sizing.amounts(self.stake))
+
+    def parameters(self):
+        return {'outcomes': list(self.outcomes), 'weights': self.weights,
+                'drawdown': self.drawdown}
+
+    def placeBets(self):
+        """Bet each outcome's fraction of the stake."""
+        self._placeBets_helper(self.sizing.bets(self.stake))
 
 
 class Game:
@@ -158,95 +511,132 @@ class Game:
         table (:obj:`.Table`): the :obj:`.Table` which contains the :obj:`.Bet`\s
             placed by :obj:`Player`\.
         wheel (:obj:`.Wheel`): The :obj:`.Wheel` that returns a randomly selected :obj:`.Bin`\.
+        layouts (:obj:`.LayoutCache`): compiled bet layouts of the wheel; a bet is settled
+            by indexing its outcome's row with the bin number, rather than by a search
+            of the winning :obj:`.Bin`\.
     """
 
     def __init__(self, table, wheel):
         self.table = table
         self.wheel = wheel
+        self.layouts = bd.LayoutCache(wheel)
+
+    def seed(self, value):
+        """Reseed the :obj:`.Wheel`\'s rng."""
+        self.wheel.rng.seed(value)
+
+    def getstate(self):
+        """State of the :obj:`.Wheel`\'s rng, as JSON compatible lists."""
+        version, internal, gauss = self.wheel.rng.getstate()
+        return [version, list(internal), gauss]
+
+    def setstate(self, state):
+        """Restore a state from :meth:`getstate`."""
+        version, internal, gauss = state
+        self.wheel.rng.setstate((version, tuple(internal), gauss))
+
+    def reset(self):
+        """Forget the spins of the previous session, if the :obj:`.Wheel` keeps them."""
+        if self.wheel.history is not None:
+            self.wheel.history.clear()
+
+    def snapshot(self):
+        """State kept within a session other than the rng's: the :obj:`.SpinHistory`, if
+        the :obj:`.Wheel` keeps one."""
+        return None if self.wheel.history is None else self.wheel.history.getstate()
+
+    def restore(self, state):
+        """Restore a state from :meth:`snapshot`."""
+        if state is not None:
+            self.wheel.history.setstate(state)
+
+    def fingerprint(self):
+        """Wheel layout and table limits, used to identify cached results."""
+        fingerprint = '{0:s}/{1!r}/{2!r}'.format(
+            self.wheel.fingerprint(), self.table.limit, self.table.minimum)
+        if self.table.rules is not None:
+            fingerprint += '/{0!r}'.format(self.table.rules)
+        return fingerprint
 
     def cycle(self, player):
         """Executes a single cycle of play.
 
         Cycle:
             1. call the :meth:`Player.placeBets()` to get bet.
-            2. call the :obj:`.Wheel`\'s :meth:`.next()` to get winning :obj:`.Bin`\.
-            3. iterate over :obj:`.Table`\'s :obj:`.Bet`\s.
+            2. call the :obj:`.Wheel`\'s :meth:`.spin()` to get the winning bin number.
+            3. iterate over :obj:`.Table`\'s :obj:`.Bet`\s, looking the bin number up in the
+               :obj:`.LayoutCache` row of each bet's :obj:`.Outcome`\.
             4. call the :meth:`Player.win()` or :meth:`Player.lose()` method.
 
         Args:
             player (:obj:`Player`): the individual player that places bets,
                 receives winnings and pays losses.
         """
-        if player.playing:
+        if player.playing():
             player.placeBets()  # real work of placing bet is delegated to Player class
-            winning_outcomes = self.wheel.next()
-            for bet in player.table:
-                if bet.outcome in winning_outcomes:
-                    player.win(bet)
-                else:
-                    player.lose()
+            self._settle(player, self.wheel.spin())
+
+    def round(self, players):
+        """One spin shared by every player at the table, as :meth:`cycle` plays it for one.
 
+        Each player keeps their bets on their own :obj:`.Table`\.
 
-class Simulator:
+        Args:
+            players (list of :obj:`Player`): the players seated; those no longer
+                :meth:`~Player.playing` sit the spin out.
+        """
+        playing = [player for player in players if player.playing()]
+        if playing:
+            for player in playing:
+                player.placeBets()
+            number = self.wheel.spin()
+            for player in playing:
+                self._settle(player, number)
+
+    def _settle(self, player, number):
+        layouts = self.layouts
+        if layouts.wheel is not self.wheel:
+            layouts = self.layouts = bd.LayoutCache(self.wheel)
+        rows = layouts.rows if layouts.version == self.wheel.version else layouts.fresh()
+        for bet in player.table.bets:
+            row = rows.get(bet.outcome.name)
+            if row is None:
+                row = layouts.row(bet.outcome)
+            if row[number]:
+                player.win(bet)
+            else:
+                player.lose()
+        player.winners(self.wheel.bins[number])
+
+    def resolve(self, player, winning_outcomes):
+        """Settle every :obj:`.Bet` on the table against the winning :obj:`.Bin`\.
+
+        Args:
+            player (:obj:`Player`): the player whose bets are settled.
+            winning_outcomes (:obj:`.Bin`): the bin the ball landed in.
+        """
+        for bet in player.table:
+            if bet.outcome in winning_outcomes:
+                player.win(bet)
+            else:
+                player.lose()
+        player.winners(winning_outcomes)
+
+
+class Simulator(sim.Simulator):
     """Simulate the Roulette game with the :obj:`Player` class.
     Reports saw statistics on a number of sessions of play
 
-    Notes:
-        cycle:
-            A single cycle of betting and bet resolution.
-        session:
-            One or more cycles in which a player starts with a full stakes.
-            Player may decide to leave or may run out of money.
-        game:
-            Some games may have intermediate events between cycles and sessions.
+    The session loop, statistics and executors are shared with every game and live in
+    :mod:`casino.simulation`.
 
     Args:
         game (:obj:`Game`): The Game to simulate.
         player (:obj:`Player`): The player and thus betting strategy.
         initDuration (int, default 250): Length of simulation.
         initStake (int, default 100): Initial money amount.
-        samples (int, default 50): Number of game cycles.
-
-    Attributes:
-        durations (list): list of lenghts of time the :obj:`Player` remained in the game.
-        maxima (list): list of maximum stakes for each :obj:`Player`.
-        See args.
+        samples (int, default 50): Number of sessions.
+        seed (int, default None): Seed for the sessions.
+        executor (default :obj:`.ScalarExecutor`): runs the sessions.
+        sinks (list): result sinks which receive every session record.
     """
-
-    def __init__(self, game, player, initDuration=250, initStake=100, samples=50):
-        self.game = game
-        self.player = player
-        self.initDuration = initDuration
-        self.initStake = initStake
-        self.samples = samples
-
-    def session(self):
-        """Execute a single game session.
-
-        Return:
-            `list` of stake values.
-        """
-        stakes = []
-        self.player.setStake(self.initStake)
-        self.player.setRounds(self.initDuration)
-        while self.player.playing:
-            self.game.cycle(self.player)
-            stakes.append(self.player.stake)
-        return stakes
-
-    def gather(self):
-        """Execute a number of sessions and collect statistics"""
-        duration = []
-        maxima = []
-        for _ in range(self.samples):
-            stakes = self.session()
-            self.duration.append(len(stakes))
-            self.maxima.apppend(max(stakes))
-        average_duration, stdev_of_duration = stats.mean(duration), stats.stdev(duration)
-        average_maxima, stdev_of_maxima = stats.mean(maxima), stats.stdev(maxima)
-        return (average_duration, stdev_of_duration), (average_maxima, stdev_of_maxima)
-
-
-
-if __name__ == '__main__':
-    wheel = bd.Wheel()
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Evolutionary search for roulette betting strategies.
+
+A candidate strategy, a :obj:`Genome`, is a portfolio of bets on any outcomes of the
+:obj:`.Wheel`, some chips on each, together with how the whole portfolio grows:
+
+    ``family``
+        ``'Flat'``, the same bets every round, or the name of a
+        :obj:`.LevelProgression` whose level tables multiply the portfolio.
+    ``base``
+        chips per unit at the first level.
+    ``levels``
+        levels of the progression kept. A loss at the last level kept stays there
+        and a win beyond it starts over, so a capped :obj:`.Martingale` stops doubling.
+
+A round is a win for the progression when the portfolio pays back more than it cost.
+A candidate stops when its next bets cost more than its stake or the table limit.
+
+Candidates are lowered to the flat tables of :mod:`casino.roulette.engine` and scored
+by :obj:`Evaluator` against one fixed set of spin sequences: session ``i`` of every
+candidate sees the spins :obj:`.CompiledExecutor` would draw for it. These common random
+numbers make the comparison of two candidates far less noisy than their separate
+scores, and the spins are only drawn once per process. :obj:`Search` runs a genetic
+algorithm over a process pool whose workers keep those spins, and caches the score of
+every genome it has evaluated so that survivors and repeats cost nothing.
+
+The objectives are:
+
+    ``endurance``
+        rounds played per chip lost, the time on device a unit of loss buys.
+    ``target``
+        fraction of sessions whose stake reaches a target.
+    ``duration``
+        rounds played.
+    ``final``
+        final stake.
+
+Example:
+    python -m casino.roulette.search --objective target --target 200 --generations 30
+"""
+
+import argparse
+import logging
+import math
+import random
+from array import array
+from collections import OrderedDict
+
+from .. import simulation as sim
+from . import bin_builder as bb
+from . import engine as en
+from . import players as ply
+from . import shared as sh
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+FAMILIES = {
+    'Flat': None,
+    'Martingale': ply.Martingale,
+    'Paroli': ply.Paroli,
+    'Player1326': ply.Player1326,
+    'Fibonacci': ply.Fibonacci,
+    'DAlembert': ply.DAlembert,
+}
+BASES = (1, 2, 5, 10, 20, 50)
+MAX_BETS = 6
+MAX_UNITS = 5
+OBJECTIVES = ('endurance', 'target', 'duration', 'final')
+
+
+def familyTables(family):
+    """Level tables ``(units, onWin, onLose)`` of a family of :data:`FAMILIES`.
+
+    Raises:
+        ValueError: if the family is unknown.
+    """
+    if family not in FAMILIES:
+        raise ValueError('unknown family %r' % family)
+    cls = FAMILIES[family]
+    if cls is None:
+        return (1,), (0,), (0,)
+    if '_tables' not in cls.__dict__:
+        cls._tables = cls.tables()
+    return cls._tables
+
+
+class Genome:
+    """One candidate strategy.
+
+    Args:
+        family (str): a key of :data:`FAMILIES`.
+        base (int): chips per unit at the first level.
+        bets (iterable of tuple): ``(outcome name, units)`` pairs.
+        levels (int, default None): levels of the progression kept, every level when
+            ``None``.
+
+    Raises:
+        ValueError: if the family is unknown or a bet has no units.
+    """
+
+    def __init__(self, family, base, bets, levels=None):
+        top = len(familyTables(family)[0])
+        self.family = family
+        self.base = base
+        self.bets = tuple(sorted(bets))
+        self.levels = top if levels is None else max(1, min(levels, top))
+        if not self.bets or any(units < 1 for _, units in self.bets):
+            raise ValueError('a genome needs bets of at least one unit')
+
+    @property
+    def size(self):
+        """Units bet each round at the first level."""
+        return sum(units for _, units in self.bets)
+
+    def key(self):
+        return self.family, self.base, self.bets, self.levels
+
+    def tables(self, tables):
+        """The arguments of :func:`.playSpins` which describe this genome.
+
+        Args:
+            tables (:obj:`.WheelTables`): the wheel's payouts.
+
+        Return:
+            tuple: ``(payouts, kinds, units, moves, width)``.
+        """
+        names = {outcome.name: outcome for outcome in tables.outcomes}
+        payouts = [0] * tables.bins
+        for name, units in self.bets:
+            for bin, payout in enumerate(tables.row(names[name])):
+                payouts[bin] += units * payout
+        kinds = [1 if payout > self.size else 0 for payout in payouts]
+        units, onWin, onLose = familyTables(self.family)
+        last = self.levels - 1
+        moves = []
+        for level in range(self.levels):
+            moves.extend((min(onLose[level], last), 0 if onWin[level] > last else onWin[level]))
+        return payouts, kinds, list(units[:self.levels]), moves, 2
+
+    def __eq__(self, other):
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return '{0:s}({1!r}, {2!r}, {3!r}, {4!r})'.format(
+            type(self).__name__, self.family, self.base, list(self.bets), self.levels)
+
+
+def spinStreams(seed, samples, duration, bins=38):
+    """Spins of sessions ``0`` to ``samples``, as :obj:`.CompiledExecutor` draws them.
+
+    Return:
+        list of :obj:`array.array`: one sequence of ``duration`` bin numbers per session.
+    """
+    rng = random.Random()
+    streams = []
+    for index in range(samples):
+        rng.seed(sim.sessionSeed(seed, index))
+        streams.append(array('B', [rng.randrange(bins) for _ in range(duration)]))
+    return streams
+
+
+class Evaluator:
+    """Scores genomes on common random numbers.
+
+    Args:
+        objective (str, default 'endurance'): one of :data:`OBJECTIVES`.
+        stake (int, default 100): stake at the start of a session.
+        duration (int, default 250): most rounds of a session.
+        samples (int, default 200): sessions per genome.
+        seed (int, default None): seed of the sessions; drawn at random when ``None``.
+        limit (int, default 1000): table limit.
+        minimum (int, default 5): table minimum.
+        target (int, default None): stake the ``target`` objective aims for, twice the
+            initial stake when ``None``.
+
+    Raises:
+        ValueError: if the objective is unknown.
+    """
+
+    def __init__(self, objective='endurance', stake=100, duration=250, samples=200,
+                 seed=None, limit=1000, minimum=5, target=None):
+        if objective not in OBJECTIVES:
+            raise ValueError('unknown objective %r' % objective)
+        self.objective = objective
+        self.stake = stake
+        self.duration = duration
+        self.samples = samples
+        self.seed = random.getrandbits(31) if seed is None else seed
+        self.limit = limit
+        self.minimum = minimum
+        self.target = 2 * stake if target is None else target
+        self._spins = None
+        self._tables = None
+
+    def settings(self):
+        """Arguments which rebuild this evaluator in a worker."""
+        return {name: getattr(self, name) for name in (
+            'objective', 'stake', 'duration', 'samples', 'seed', 'limit', 'minimum', 'target')}
+
+    @property
+    def tables(self):
+        if self._tables is None:
+            self._tables = en.wheelTables(bb.sharedWheel())
+        return self._tables
+
+    @property
+    def spins(self):
+        """Spin sequence of every session, drawn on first use."""
+        if self._spins is None:
+            self._spins = spinStreams(self.seed, self.samples, self.duration,
+                                      self.tables.bins)
+            if en.numba is not None:
+                self._spins = [en.numpy.array(spins) for spins in self._spins]
+        return self._spins
+
+    def records(self, genome):
+        """Play every session of ``genome``.
+
+        Return:
+            list of tuple: ``(session, duration, maximum, final)`` records, or ``None``
+            if a bet broke the table limits.
+        """
+        arguments = genome.tables(self.tables)
+        if en.numba is not None:
+            arguments = tuple(en.numpy.array(table) for table in arguments[:4]) + arguments[4:]
+        records = []
+        for index, spins in enumerate(self.spins):
+            played, maximum, final = en.playSpins(
+                spins, *arguments, self.stake, self.duration, genome.base, genome.size,
+                True, self.minimum, self.limit)
+            if played == en.INVALID:
+                return None
+            if not played:
+                maximum = final = self.stake
+            records.append((index, played, maximum, final))
+        return records
+
+    def score(self, genome):
+        """Objective of ``genome``, higher is better; ``-inf`` if it breaks the limits."""
+        records = self.records(genome)
+        if records is None:
+            return -math.inf
+        count = len(records)
+        if self.objective == 'target':
+            return sum(1 for record in records if record[2] >= self.target) / count
+        duration = sum(record[1] for record in records) / count
+        final = sum(record[3] for record in records) / count
+        if self.objective == 'duration':
+            return duration
+        if self.objective == 'final':
+            return final
+        return duration / max(self.stake - final, 1.0)
+
+
+_worker = {}
+
+
+def _scoreBatch(settings, genomes):
+    key = tuple(sorted(settings.items()))
+    if _worker.get('key') != key:
+        _worker['key'], _worker['evaluator'] = key, Evaluator(**settings)
+    return [_worker['evaluator'].score(genome) for genome in genomes]
+
+
+class Search:
+    """Genetic algorithm over :obj:`Genome`\\s.
+
+    Each generation keeps the best ``elite`` genomes and breeds the rest of the
+    population from parents chosen by tournaments of three: a child takes each bet of
+    its parents with even chance and its family, base and levels from either, then
+    mutates.
+
+    Args:
+        evaluator (:obj:`Evaluator`): scores the genomes.
+        population (int, default 64): genomes per generation.
+        generations (int, default 20): generations bred after the first.
+        elite (int, default 4): best genomes carried over unchanged.
+        mutation (float, default 0.5): chance of each mutation after the first.
+        families (list of str, default None): families to search, every one of
+            :data:`FAMILIES` when ``None``.
+        outcomes (list of str, default None): names of the outcomes to bet on, every
+            outcome of the wheel when ``None``.
+        seed (int, default None): seed of the search itself.
+        workers (int, default None): size of the process pool; ``0`` scores in this
+            process.
+        batchSize (int, default 16): genomes per task.
+        cacheSize (int, default 100000): scores kept; the least recently used goes first.
+        progress (callable, default None): called as ``progress(generation, best)``
+            after each generation, ``best`` being the best ``(score, genome)``.
+
+    Attributes:
+        cache (:obj:`collections.OrderedDict`): genome to score.
+        hits (int): scores found in the cache.
+        misses (int): genomes evaluated.
+        ranking (list of tuple): best ``(score, genome)`` pairs found, best first.
+
+    Raises:
+        ValueError: if a family or outcome is unknown.
+    """
+
+    def __init__(self, evaluator, population=64, generations=20, elite=4, mutation=0.5,
+                 families=None, outcomes=None, seed=None, workers=None, batchSize=16,
+                 cacheSize=100000, progress=None):
+        self.evaluator = evaluator
+        self.population = population
+        self.generations = generations
+        self.elite = elite
+        self.mutation = mutation
+        self.families = list(FAMILIES) if families is None else list(families)
+        names = sorted(outcome.name for outcome in evaluator.tables.outcomes)
+        self.outcomes = names if outcomes is None else list(outcomes)
+        for family in self.families:
+            familyTables(family)
+        unknown = set(self.outcomes) - set(names)
+        if unknown:
+            raise ValueError('unknown outcomes %r' % sorted(unknown))
+        self.rng = random.Random(seed)
+        self.workers = workers
+        self.batchSize = batchSize
+        self.cacheSize = cacheSize
+        self.progress = progress
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.ranking = []
+
+    def _repair(self, family, base, bets, levels):
+        """Genome with at most :data:`MAX_BETS` bets and the cheapest base in the limits."""
+        bets = dict(bets)
+        while len(bets) > MAX_BETS:
+            del bets[self.rng.choice(sorted(bets))]
+        size = sum(bets.values())
+        bases = [b for b in BASES if self.evaluator.minimum <= b * size <= self.evaluator.limit]
+        if bases and base not in bases:
+            base = min(bases, key=lambda b: abs(b - base))
+        return Genome(family, base, bets.items(), levels)
+
+    def randomGenome(self):
+        """A genome of one to three bets of one unit."""
+        outcomes = self.rng.sample(self.outcomes, min(self.rng.randint(1, 3),
+                                                      len(self.outcomes)))
+        family = self.rng.choice(self.families)
+        levels = self.rng.randint(1, len(familyTables(family)[0]))
+        return self._repair(family, self.rng.choice(BASES), [(name, 1) for name in outcomes],
+                            levels)
+
+    def mutate(self, genome):
+        """Copy of ``genome`` with one or more random changes."""
+        family, base, bets, levels = genome.family, genome.base, dict(genome.bets), genome.levels
+        while True:
+            change = self.rng.randrange(6)
+            if change == 0 and len(bets) < MAX_BETS:
+                bets.setdefault(self.rng.choice(self.outcomes), 1)
+            elif change == 1 and len(bets) > 1:
+                del bets[self.rng.choice(sorted(bets))]
+            elif change == 2:
+                name = self.rng.choice(sorted(bets))
+                bets[name] = max(1, min(bets[name] + self.rng.choice((-1, 1)), MAX_UNITS))
+            elif change == 3:
+                family = self.rng.choice(self.families)
+            elif change == 4:
+                base = self.rng.choice(BASES)
+            else:
+                levels = max(1, levels + self.rng.choice((-2, -1, 1, 2)))
+            if self.rng.random() >= self.mutation:
+                return self._repair(family, base, bets.items(), levels)
+
+    def crossover(self, first, second):
+        """Child taking each bet of either parent with even chance."""
+        bets = dict(second.bets)
+        bets.update(first.bets)
+        kept = [(name, units) for name, units in sorted(bets.items())
+                if self.rng.random() < 0.5]
+        parents = (first, second)
+        family = self.rng.choice(parents).family
+        return self._repair(family, self.rng.choice(parents).base,
+                            kept or [self.rng.choice(sorted(bets.items()))],
+                            self.rng.choice(parents).levels)
+
+    def _tournament(self, scored):
+        return max(self.rng.sample(scored, min(3, len(scored))), key=lambda pair: pair[0])[1]
+
+    def score(self, genomes, pool=None):
+        """Scores of ``genomes``, evaluating only those not in :attr:`cache`.
+
+        Args:
+            pool (:obj:`concurrent.futures.Executor`, default None): evaluates batches;
+                in this process when ``None``.
+        """
+        known, todo = {}, []
+        for genome in genomes:
+            if genome in known:
+                continue
+            if genome in self.cache:
+                self.cache.move_to_end(genome)
+                known[genome] = self.cache[genome]
+                self.hits += 1
+            else:
+                known[genome] = None
+                todo.append(genome)
+        batches = [todo[low:low + self.batchSize] for low in range(0, len(todo), self.batchSize)]
+        if pool is None:
+            scores = [[self.evaluator.score(genome) for genome in batch] for batch in batches]
+        else:
+            settings = self.evaluator.settings()
+            scores = pool.map(_scoreBatch, [settings] * len(batches), batches)
+        for batch, values in zip(batches, scores):
+            for genome, value in zip(batch, values):
+                known[genome] = self.cache[genome] = value
+                self.misses += 1
+        while len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
+        return [known[genome] for genome in genomes]
+
+    def _rank(self, scored):
+        ranking = dict((genome, value) for value, genome in self.ranking)
+        ranking.update((genome, value) for value, genome in scored)
+        self.ranking = sorted(((value, genome) for genome, value in ranking.items()),
+                              key=lambda pair: pair[0], reverse=True)[:max(self.elite, 10)]
+
+    def _generations(self, pool):
+        genomes = [self.randomGenome() for _ in range(self.population)]
+        for generation in range(self.generations + 1):
+            scored = sorted(zip(self.score(genomes, pool), genomes),
+                            key=lambda pair: pair[0], reverse=True)
+            self._rank(scored)
+            LOGGER.info('generation %d: best %g, %d evaluated, %d cached', generation,
+                        self.ranking[0][0], self.misses, self.hits)
+            if self.progress is not None:
+                self.progress(generation, self.ranking[0])
+            if generation == self.generations:
+                break
+            genomes = [genome for _, genome in scored[:self.elite]]
+            while len(genomes) < self.population:
+                child = self.crossover(self._tournament(scored), self._tournament(scored))
+                genomes.append(self.mutate(child))
+
+    def run(self):
+        """Breed :attr:`generations` generations.
+
+        Return:
+            list of tuple: :attr:`ranking`.
+        """
+        if self.workers == 0:
+            self._generations(None)
+        else:
+            with sh.sharedPool(self.workers) as pool:
+                self._generations(pool)
+        return self.ranking
+
+
+def get_args():
+    '''This function parses and return arguments passed in'''
+    parser = argparse.ArgumentParser(description="Search for roulette betting strategies.")
+    parser.add_argument("--objective", choices=OBJECTIVES, default='endurance',
+                        help="what to maximize")
+    parser.add_argument("--target", type=int, help="stake the target objective aims for")
+    parser.add_argument("--stake", type=int, default=100, help="initial stake")
+    parser.add_argument("--duration", type=int, default=250, help="most rounds a session")
+    parser.add_argument("--limit", type=int, default=1000, help="table limit")
+    parser.add_argument("--minimum", type=int, default=5, help="table minimum")
+    parser.add_argument("--samples", type=int, default=200, help="sessions per genome")
+    parser.add_argument("--population", type=int, default=64, help="genomes per generation")
+    parser.add_argument("--generations", type=int, default=20, help="generations bred")
+    parser.add_argument("--family", nargs='+', choices=sorted(FAMILIES),
+                        help="progression families to search")
+    parser.add_argument("--seed", type=int, help="seed of the sessions and the search")
+    parser.add_argument("--workers", type=int, help="size of the process pool, 0 for none")
+    parser.add_argument("-v", "--verbose", help="increase output verbosity",
+                        action="store_true")
+    return parser.parse_args()
+
+
+def main(args=None):
+    """enters function"""
+    if args is None:
+        args = get_args()
+    loglevel = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    evaluator = Evaluator(args.objective, args.stake, args.duration, args.samples, args.seed,
+                          args.limit, args.minimum, args.target)
+    search = Search(evaluator, args.population, args.generations, families=args.family,
+                    seed=args.seed, workers=args.workers)
+    for value, genome in search.run():
+        print('{0:12.4f}  {1!r}'.format(value, genome))
+
+
+if __name__ == '__main__':
+    main()
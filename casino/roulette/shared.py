@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""Flat, array backed wheel tables which worker processes share without copying.
+
+A :obj:`.Wheel` is 38 :obj:`.Bin` sets of :obj:`.Outcome` objects, which every worker of
+a pool would otherwise unpickle or build for itself. :meth:`WheelArrays.pack` flattens
+it into one buffer of native ``int32`` arrays followed by the outcome names:
+
+    ======================  =============================================================
+    header                  magic, version, outcomes ``n``, bins ``b``, bin entries
+                            ``e``, name bytes ``m``
+    ``odds[n]``             odds of each outcome, outcomes sorted by name
+    ``binStart[b + 1]``     where each bin's row starts in ``binOutcome`` (CSR)
+    ``binOutcome[e]``       outcome ids of every bin, row after row
+    ``nameStart[n + 1]``    where each name starts in ``names``
+    ``names[m]``            UTF-8 names, back to back
+    ======================  =============================================================
+
+:obj:`SharedWheel` puts the buffer in :mod:`multiprocessing.shared_memory`. Workers
+:meth:`~SharedWheel.attach` to it by name and read the arrays through memoryviews, so
+attaching costs the same and adds no memory whatever the number of workers.
+
+The process pools of :mod:`casino.sweep`, :mod:`casino.tournament`,
+:mod:`casino.service` and :mod:`casino.roulette.search` are started with
+:func:`sharedPool` or :meth:`SharedWheel.pool`: the parent packs
+:func:`.sharedWheel` once and each worker, through :func:`attachWheel`, rebuilds its
+wheel from the arrays instead of with :obj:`.BinBuilder`, while
+:obj:`.CompiledExecutor` reads the payouts of the outcomes it plays straight from them.
+Compiled sessions need no :obj:`.Outcome` objects beyond those of their programs.
+
+Examples:
+    >>> with sharedPool(4) as pool:  # doctest: +SKIP
+    ...     pool.submit(work)
+"""
+
+import atexit
+import contextlib
+import logging
+import multiprocessing
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from . import bin_builder as bb
+from . import board as bd
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = 0x57484c31  # 'WHL1'
+VERSION = 1
+HEADER = struct.Struct('=6i')
+ITEM = struct.calcsize('i')
+
+_attached = {}
+
+
+class WheelArrays:
+    """Read only view of packed wheel tables.
+
+    Args:
+        buffer: a buffer holding :meth:`pack`\\'s output; it is not copied.
+
+    Attributes:
+        odds (memoryview): odds of each outcome id.
+        binStart (memoryview): CSR row offsets of the bins.
+        binOutcome (memoryview): outcome ids of the bins, row after row.
+
+    Raises:
+        ValueError: if the buffer does not hold wheel tables.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer)
+        magic, version, outcomes, bins, entries, size = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a packed wheel')
+        self.views = []
+        offset = HEADER.size
+        self.odds, offset = self._ints(offset, outcomes)
+        self.binStart, offset = self._ints(offset, bins + 1)
+        self.binOutcome, offset = self._ints(offset, entries)
+        self.nameStart, offset = self._ints(offset, outcomes + 1)
+        self.names = self.buffer[offset:offset + size]
+        self.views.append(self.names)
+
+    def _ints(self, offset, count):
+        view = self.buffer[offset:offset + count * ITEM].cast('i')
+        self.views.append(view)
+        return view, offset + count * ITEM
+
+    @staticmethod
+    def pack(wheel):
+        """Flatten ``wheel`` into the layout described in the module.
+
+        Return:
+            bytes
+        """
+        outcomes = sorted(wheel.all_outcomes, key=lambda outcome: outcome.name)
+        ids = {outcome: number for number, outcome in enumerate(outcomes)}
+        binStart, binOutcome = [0], []
+        for bin in wheel.bins:
+            binOutcome.extend(sorted(ids[outcome] for outcome in bin))
+            binStart.append(len(binOutcome))
+        names = [outcome.name.encode() for outcome in outcomes]
+        nameStart = [0]
+        for name in names:
+            nameStart.append(nameStart[-1] + len(name))
+        blob = b''.join(names)
+        arrays = [outcome.odds for outcome in outcomes] + binStart + binOutcome + nameStart
+        return (HEADER.pack(MAGIC, VERSION, len(outcomes), len(wheel.bins), len(binOutcome),
+                            len(blob))
+                + struct.pack('=%di' % len(arrays), *arrays) + blob)
+
+    def __len__(self):
+        """Number of outcomes"""
+        return len(self.odds)
+
+    @property
+    def bins(self):
+        """Number of bins"""
+        return len(self.binStart) - 1
+
+    def outcomeName(self, outcome):
+        """Name of outcome id ``outcome``."""
+        return bytes(self.names[self.nameStart[outcome]:self.nameStart[outcome + 1]]).decode()
+
+    def find(self, name):
+        """Id of the outcome ``name``, by bisection of the sorted names.
+
+        Raises:
+            KeyError: if there is no such outcome.
+        """
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.outcomeName(middle) < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(self) or self.outcomeName(low) != name:
+            raise KeyError(name)
+        return low
+
+    def binOutcomes(self, bin):
+        """Outcome ids of ``bin``, as a memoryview into the tables."""
+        return self.binOutcome[self.binStart[bin]:self.binStart[bin + 1]]
+
+    def payouts(self, outcome):
+        """What a unit bet on outcome id ``outcome`` pays back from each bin, stake included.
+
+        Return:
+            list of int
+        """
+        row = [0] * self.bins
+        for bin in range(self.bins):
+            if outcome in self.binOutcomes(bin):
+                row[bin] = self.odds[outcome] + 1
+        return row
+
+    def wheel(self):
+        """Rebuild a :obj:`.Wheel` of :obj:`.Outcome` objects from the tables."""
+        wheel = bd.Wheel()
+        outcomes = [bd.Outcome(self.outcomeName(number), self.odds[number])
+                    for number in range(len(self))]
+        for bin in range(self.bins):
+            for number in self.binOutcomes(bin):
+                wheel.addOutcome(bin, outcomes[number])
+        return wheel
+
+    def release(self):
+        """Let go of the memoryviews, so the buffer underneath can be closed."""
+        for view in self.views:
+            view.release()
+        self.buffer.release()
+
+
+class SharedWheel(WheelArrays):
+    """:obj:`WheelArrays` in a :class:`multiprocessing.shared_memory.SharedMemory` block.
+
+    Use :meth:`create` in the parent and :meth:`attach` in the workers.
+
+    Attributes:
+        name (str): name of the shared memory block, to pass to the workers.
+    """
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.name = memory.name
+        super(SharedWheel, self).__init__(memory.buf)
+
+    @classmethod
+    def create(cls, wheel):
+        """Pack ``wheel`` into a new shared memory block, owned by the caller."""
+        data = cls.pack(wheel)
+        memory = shared_memory.SharedMemory(create=True, size=len(data))
+        memory.buf[:len(data)] = data
+        return cls(memory)
+
+    @classmethod
+    def attach(cls, name):
+        """Map the block ``name`` created by another process, without copying it."""
+        if sys.version_info >= (3, 13):
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # workers started by the creator report to its resource tracker, which
+            # frees the block once, when the creator unlinks it
+            memory = shared_memory.SharedMemory(name=name)
+        return cls(memory)
+
+    def pool(self, workers=None):
+        """Spawned process pool whose workers attach to this block with :func:`attachWheel`.
+
+        Return:
+            :obj:`concurrent.futures.ProcessPoolExecutor`
+        """
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=attachWheel, initargs=(self.name,))
+
+    def close(self):
+        """Detach from the block."""
+        self.release()
+        self.memory.close()
+
+    def unlink(self):
+        """Detach and free the block; only its creator should call this."""
+        self.close()
+        self.memory.unlink()
+
+
+def attachWheel(name):
+    """Process pool initializer: attach to the shared wheel ``name`` once per worker.
+
+    The worker's :func:`.sharedWheel` is rebuilt from it, see :func:`.useArrays`, and
+    the worker detaches when it exits.
+
+    Return:
+        :obj:`SharedWheel`
+    """
+    shared = _attached.get(name)
+    if shared is None:
+        shared = _attached[name] = SharedWheel.attach(name)
+        atexit.register(shared.close)
+        bb.useArrays(shared)
+    return shared
+
+
+@contextlib.contextmanager
+def sharedPool(workers=None):
+    """Pack this process's :func:`.sharedWheel` and start a :meth:`SharedWheel.pool` on it.
+
+    The block is freed once the pool has shut down.
+
+    Yield:
+        :obj:`concurrent.futures.ProcessPoolExecutor`
+    """
+    shared = SharedWheel.create(bb.sharedWheel())
+    try:
+        with shared.pool(workers) as pool:
+            yield pool
+    finally:
+        shared.unlink()
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""Growth optimal bet sizing from the payout matrix of a :obj:`.Wheel`.
+
+The result of a round of unit bets on a set of outcomes is a row of the *payout matrix*:
+one row per bin, one column per outcome, the outcome's odds when it is in the bin and
+``-1`` otherwise. Betting the fractions ``f`` of the stake on the outcomes multiplies the
+stake by ``1 + r·f`` when the ball lands in a bin with row ``r``. :func:`solve` finds
+the fractions which maximize the expected logarithm of that factor, the long run growth
+rate of the stake (the Kelly criterion), for any chances of the bins:
+
+    * on a fair wheel every bet loses on average and the answer is to bet nothing,
+    * on a biased wheel, e.g. weighted by spin counts, the outcomes covering the
+      favoured bins get a share of the stake.
+
+Full Kelly stakes are volatile. A ``drawdown`` of ``(alpha, beta)`` adds the constraint
+of Busseti, Ryu and Boyd's *risk constrained Kelly gambling*: the chance that the stake
+ever falls to ``alpha`` times its value is at most ``beta``. It is enforced through the
+convex bound ``E[(1 + r·f) ** -lambda] <= 1`` with ``lambda = log(beta) / log(alpha)``.
+
+:func:`sizing` caches the solved :obj:`Sizing` by wheel layout, outcome set, table limits
+and rules, bin weights and drawdown, so a player asks for it once and then only scales its
+fractions by the stake each round.
+
+Examples:
+    >>> matrix = [[1, -1], [-1, 1], [-1, -1]]  # red, black and a zero
+    >>> [round(f, 3) for f in solve(matrix, [0.6, 0.3, 0.1])]
+    [0.2, 0.0]
+"""
+
+import logging
+import math
+from collections import OrderedDict
+
+from . import board as bd
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+CAP = 1.0 - 1e-9  # most of the stake bet in one round
+TOLERANCE = 1e-12
+ITERATIONS = 2000
+CACHE_SIZE = 256
+
+_solutions = OrderedDict()
+
+
+def payoutMatrix(wheel, outcomes):
+    """Net result of a unit bet on each of ``outcomes`` for each bin of ``wheel``.
+
+    Args:
+        outcomes (list of :obj:`.Outcome`): the columns.
+
+    Return:
+        list of list of int: ``matrix[bin][column]``.
+    """
+    return [[outcome.odds if outcome in bin else -1 for outcome in outcomes]
+            for bin in wheel.bins]
+
+
+def _project(point, cap):
+    """Closest point of ``{f >= 0, sum(f) <= cap}`` to ``point``."""
+    clipped = [max(value, 0.0) for value in point]
+    if sum(clipped) <= cap:
+        return clipped
+    ordered = sorted(point, reverse=True)
+    total, shift = 0.0, 0.0
+    for count, value in enumerate(ordered, 1):
+        total += value
+        if value - (total - cap) / count > 0:
+            shift = (total - cap) / count
+    return [max(value - shift, 0.0) for value in point]
+
+
+def _objective(matrix, probabilities, fractions, penalty, power):
+    """Growth less ``penalty`` times the drawdown bound, and its gradient."""
+    value = 0.0
+    gradient = [0.0] * len(fractions)
+    for row, p in zip(matrix, probabilities):
+        if not p:
+            continue
+        wealth = 1.0 + sum(r * f for r, f in zip(row, fractions))
+        if wealth <= 0.0:
+            return -math.inf, gradient
+        slope = 1.0 / wealth
+        value += p * math.log(wealth)
+        if penalty:
+            bound = wealth ** -power
+            value -= penalty * p * bound
+            slope += penalty * power * bound / wealth
+        for column, r in enumerate(row):
+            gradient[column] += p * slope * r
+    return value, gradient
+
+
+def _ascend(matrix, probabilities, fractions, penalty=0.0, power=0.0):
+    """Projected gradient ascent with backtracking, from ``fractions``."""
+    value, gradient = _objective(matrix, probabilities, fractions, penalty, power)
+    step = 1.0
+    for _ in range(ITERATIONS):
+        while True:
+            trial = _project([f + step * g for f, g in zip(fractions, gradient)], CAP)
+            moved = sum((t - f) * g for t, f, g in zip(trial, fractions, gradient))
+            trialValue, trialGradient = _objective(matrix, probabilities, trial, penalty, power)
+            if trialValue >= value + 1e-4 * moved or step < 1e-12:
+                break
+            step /= 2
+        if trialValue < value or max(abs(t - f) for t, f in zip(trial, fractions)) < TOLERANCE:
+            break
+        fractions, value, gradient = trial, trialValue, trialGradient
+        step *= 2
+    return fractions
+
+
+def _bound(matrix, probabilities, fractions, power):
+    """``E[(1 + r·f) ** -power]``"""
+    return sum(p * (1.0 + sum(r * f for r, f in zip(row, fractions))) ** -power
+               for row, p in zip(matrix, probabilities) if p)
+
+
+def solve(matrix, probabilities, drawdown=None):
+    """Growth optimal fractions of the stake to bet on each column of ``matrix``.
+
+    Args:
+        matrix (list of list of float): net result of a unit bet, per row and column.
+        probabilities (list of float): chance of each row.
+        drawdown (tuple, default None): ``(alpha, beta)``: the stake falls to ``alpha``
+            of its value with a chance of at most ``beta``.
+
+    Return:
+        list of float: fraction of the stake on each column.
+
+    Raises:
+        ValueError: if the drawdown is not two numbers between 0 and 1.
+    """
+    fractions = _ascend(matrix, probabilities, [0.0] * len(matrix[0]))
+    if drawdown is None or not any(fractions):
+        return fractions
+    alpha, beta = drawdown
+    if not (0 < alpha < 1 and 0 < beta < 1):
+        raise ValueError('a drawdown is two numbers between 0 and 1')
+    power = math.log(beta) / math.log(alpha)
+    if _bound(matrix, probabilities, fractions, power) <= 1.0:
+        return fractions
+    low, high = 0.0, 1.0
+    while True:  # a penalty which is enough
+        trial = _ascend(matrix, probabilities, fractions, high, power)
+        if _bound(matrix, probabilities, trial, power) <= 1.0:
+            break
+        low, high = high, high * 4
+    best = trial
+    for _ in range(40):
+        middle = (low + high) / 2
+        trial = _ascend(matrix, probabilities, best, middle, power)
+        if _bound(matrix, probabilities, trial, power) <= 1.0:
+            best, high = trial, middle
+        else:
+            low = middle
+    return best
+
+
+class Sizing:
+    """Solved fractions of the stake for bets on some outcomes at a table.
+
+    Args:
+        outcomes (list of :obj:`.Outcome`): outcomes bet on.
+        fractions (list of float): fraction of the stake on each.
+        growth (float): expected logarithm of the stake's growth per round.
+        minimum (int): table minimum.
+        limit (int): table limit.
+        spots (list of tuple, default None): least and most on each outcome, from the
+            :obj:`.TableRules` of the table; no limits of their own when ``None``.
+        caps (list of tuple, default ()): ``(maximum, positions)`` of each family or
+            group total the outcomes at ``positions`` count towards.
+    """
+
+    def __init__(self, outcomes, fractions, growth, minimum, limit, spots=None, caps=()):
+        self.outcomes = list(outcomes)
+        self.fractions = list(fractions)
+        self.growth = growth
+        self.minimum = minimum
+        self.limit = limit
+        self.total = sum(fractions)
+        self.spots = [(0, limit)] * len(self.outcomes) if spots is None else list(spots)
+        self.caps = [(cap, sum(self.fractions[position] for position in positions))
+                     for cap, positions in caps]
+
+    def amounts(self, stake):
+        """Whole bets on each outcome for ``stake``, scaled down to the table limit and to
+        the limits of each spot and family.
+
+        Return:
+            list of int: all zero if the bets would come to less than the table minimum;
+            a bet under its spot's minimum is left out.
+        """
+        scale = stake if self.total * stake <= self.limit else self.limit / self.total
+        for fraction, (_, high) in zip(self.fractions, self.spots):
+            if fraction * scale > high:
+                scale = high / fraction
+        for cap, share in self.caps:
+            if share * scale > cap:
+                scale = cap / share
+        amounts = [int(f * scale) for f in self.fractions]
+        amounts = [amount if amount >= low else 0
+                   for amount, (low, _) in zip(amounts, self.spots)]
+        if sum(amounts) < self.minimum:
+            return [0] * len(amounts)
+        return amounts
+
+    def bets(self, stake):
+        """:obj:`.Bet`\\s of :meth:`amounts`, leaving out the empty ones."""
+        return [bd.Bet(amount, outcome)
+                for amount, outcome in zip(self.amounts(stake), self.outcomes) if amount]
+
+    def __repr__(self):
+        return '{0:s}({1!r}, growth={2!r})'.format(
+            type(self).__name__,
+            {outcome.name: f for outcome, f in zip(self.outcomes, self.fractions)},
+            self.growth)
+
+
+def _limits(table, outcomes):
+    """Spot limits and family caps of ``outcomes`` at ``table``, for :obj:`Sizing`."""
+    rules = table.rules
+    if rules is None:
+        return None, ()
+    numbers = [rules.ids[outcome.name] for outcome in outcomes]
+    spots = [(rules.low[number], table.bounds(outcome)[1])
+             for number, outcome in zip(numbers, outcomes)]
+    totals = sorted({total for number in numbers for total in rules.capped[number]})
+    caps = [(rules.caps[total], [position for position, number in enumerate(numbers)
+                                 if total in rules.capped[number]])
+            for total in totals]
+    return spots, caps
+
+
+def sizing(wheel, table, names, weights=None, drawdown=None):
+    """Cached :obj:`Sizing` of bets on the outcomes ``names`` of ``wheel`` at ``table``.
+
+    Args:
+        names (list of str): names of the outcomes.
+        weights (list of float, default None): relative chance of each bin, e.g. spin
+            counts; every bin is as likely when ``None``.
+        drawdown (tuple, default None): see :func:`solve`.
+
+    Raises:
+        ValueError: if an outcome is unknown or the weights do not fit the wheel.
+    """
+    known = {outcome.name: outcome for outcome in wheel.all_outcomes}
+    missing = [name for name in names if name not in known]
+    if missing:
+        raise ValueError('unknown outcomes %r' % missing)
+    outcomes = [known[name] for name in names]
+    matrix = payoutMatrix(wheel, outcomes)
+    if weights is None:
+        weights = [1.0] * len(matrix)
+    if len(weights) != len(matrix) or min(weights) < 0 or not sum(weights):
+        raise ValueError('weights need a non-negative value for each of %d bins' % len(matrix))
+    key = (tuple(names), tuple(map(tuple, matrix)), table.minimum, table.limit,
+           repr(table.rules), tuple(weights), drawdown)
+    solution = _solutions.get(key)
+    if solution is None:
+        probabilities = [weight / sum(weights) for weight in weights]
+        fractions = solve(matrix, probabilities, drawdown)
+        growth = sum(p * math.log(1.0 + sum(r * f for r, f in zip(row, fractions)))
+                     for row, p in zip(matrix, probabilities) if p)
+        solution = _solutions[key] = Sizing(outcomes, fractions, growth, table.minimum,
+                                            table.limit, *_limits(table, outcomes))
+        LOGGER.debug('solved %r', solution)
+        while len(_solutions) > CACHE_SIZE:
+            _solutions.popitem(last=False)
+    else:
+        _solutions.move_to_end(key)
+    return solution
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Local asyncio simulation service with a bounded job queue.
+
+Starting ``python -m casino`` for every analyst request rebuilds the :obj:`.Wheel`
+and a fresh interpreter each time. The service instead keeps a warm process pool whose
+workers hold a prebuilt wheel, and accepts roulette :obj:`.Simulator` jobs over a small
+HTTP/1.1 JSON interface:
+
+    ``POST /jobs``
+        submit ``{"player": "Martingale", "stake": 100, "duration": 250,
+        "samples": 50, "seed": 1, "limit": 1000, "minimum": 5}``. Answers ``202`` with
+        the job id, ``503`` when the queue is full and ``400`` or ``413`` when the job is
+        malformed or exceeds the per-job :obj:`Limits`.
+    ``GET /jobs/<id>``
+        status, progress and, once done, the result.
+    ``GET /jobs/<id>/events``
+        newline delimited JSON progress events, streamed until the job finishes.
+    ``DELETE /jobs/<id>``
+        cancel a queued or running job.
+
+Sessions are played in batches on the pool, so progress is reported, cancellation
+takes effect and the time limit is checked between batches. A job keeps at most one
+batch per worker in flight; when it is cancelled or runs out of time the batches which
+have already started cannot be interrupted and run to the end, so the pool may stay
+busy for up to one batch after the job has stopped.
+
+Finished jobs are kept for :attr:`SimulationService.ttl` seconds, and at most
+:attr:`SimulationService.history` of them, so the job table does not grow without
+bound. Their ids then answer ``404``.
+
+Example:
+    python -m casino.service --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import time
+
+from . import simulation as sim
+from .roulette import bin_builder as bb
+from .roulette import board as bd
+from .roulette import players as ply
+from .roulette import shared as sh
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = 'queued', 'running', 'done', 'cancelled', 'failed'
+FINISHED = (DONE, CANCELLED, FAILED)
+REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large',
+           503: 'Service Unavailable'}
+
+
+def _warm():
+    bb.sharedWheel()
+    return os.getpid()
+
+
+def _runBatch(spec, start, stop):
+    """Play sessions ``start`` to ``stop`` of the job described by ``spec``."""
+    wheel = bb.sharedWheel()
+    table = bd.Table(spec['limit'], spec['minimum'])
+    game = ply.Game(table, wheel)
+    player = ply.playerClasses()[spec['player']](table, wheel)
+    simulator = ply.Simulator(game, player, spec['duration'], spec['stake'],
+                              spec['samples'], seed=spec['seed'])
+    return simulator.records(start, stop)
+
+
+def _isInteger(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class JobError(Exception):
+    """JobError is raised when a submitted job is malformed or exceeds the :obj:`Limits`.
+
+    Attributes:
+        status (int): HTTP status to answer with.
+    """
+
+    def __init__(self, message, status=400):
+        super(JobError, self).__init__(message)
+        self.status = status
+
+
+class Limits:
+    """Per-job resource limits.
+
+    Attributes:
+        samples (int): most sessions a job may ask for.
+        duration (int): most rounds per session.
+        seconds (float): wall clock budget of a running job; it fails once exceeded.
+    """
+
+    def __init__(self, samples=100000, duration=100000, seconds=600.0):
+        self.samples = samples
+        self.duration = duration
+        self.seconds = seconds
+
+
+class Job:
+    """A submitted simulation and its progress.
+
+    Attributes:
+        id (int): job number.
+        spec (dict): validated job parameters.
+        status (str): one of queued, running, done, cancelled or failed.
+        completed (int): sessions finished so far.
+        result (:obj:`.SimulationResult`): statistics of the finished sessions.
+        error (str): why the job failed.
+        finished (float): :func:`time.monotonic` when the job finished, else ``None``.
+    """
+
+    def __init__(self, id, spec):
+        self.id = id
+        self.spec = spec
+        self.status = QUEUED
+        self.completed = 0
+        self.result = sim.SimulationResult()
+        self.error = None
+        self.finished = None
+        self.changed = asyncio.Event()
+
+    def update(self, status=None):
+        if status is not None:
+            self.status = status
+            if status in FINISHED:
+                self.finished = time.monotonic()
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def summary(self):
+        result = self.result
+        summary = {'id': self.id, 'status': self.status, 'completed': self.completed,
+                   'samples': self.spec['samples']}
+        if result.samples:
+            summary['result'] = {
+                'duration': [result.durations.mean, result.durations.stdev],
+                'maximum': [result.maxima.mean, result.maxima.stdev],
+                'final': [result.finals.mean, result.finals.stdev]}
+        if self.error:
+            summary['error'] = self.error
+        return summary
+
+
+class SimulationService:
+    """Job queue, warm process pool and HTTP front end.
+
+    Args:
+        workers (int, default None): size of the process pool.
+        queueSize (int, default 16): jobs waiting beyond this are refused with ``503``.
+        concurrency (int, default 2): jobs running at the same time.
+        batchSize (int, default 100): sessions per pool task.
+        limits (:obj:`Limits`): per-job limits.
+        history (int, default 256): finished jobs kept for status queries.
+        ttl (float, default 3600): seconds a finished job is kept.
+    """
+
+    def __init__(self, workers=None, queueSize=16, concurrency=2, batchSize=100, limits=None,
+                 history=256, ttl=3600.0):
+        self.workers = workers or os.cpu_count()
+        self.queueSize = queueSize
+        self.concurrency = concurrency
+        self.batchSize = batchSize
+        self.limits = Limits() if limits is None else limits
+        self.history = history
+        self.ttl = ttl
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.pool = None
+        self.shared = None
+        self.server = None
+        self.runners = []
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """Warm the pool and listen on ``host:port``, or on the Unix socket ``path``.
+
+        Return:
+            tuple or str: the bound address.
+        """
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queueSize)
+        # spawned workers do not inherit the event loop's threads and locks; they
+        # attach to one packed copy of the wheel
+        self.shared = sh.SharedWheel.create(bb.sharedWheel())
+        self.pool = self.shared.pool(self.workers)
+        pids = await asyncio.gather(*[loop.run_in_executor(self.pool, _warm)
+                                      for _ in range(self.workers)])
+        LOGGER.info('warmed %d worker processes', len(set(pids)))
+        self.runners = [asyncio.ensure_future(self._runner()) for _ in range(self.concurrency)]
+        if path is None:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        else:
+            self.server = await asyncio.start_unix_server(self._handle, path)
+        return self.server.sockets[0].getsockname()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for runner in self.runners:
+            runner.cancel()
+        await asyncio.gather(*self.runners, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+        self.shared.unlink()
+
+    def validate(self, body):
+        """Check a submitted job against the player registry and :attr:`limits`.
+
+        Return:
+            dict: the job spec with defaults filled in.
+
+        Raises:
+            :obj:`JobError`
+        """
+        if not isinstance(body, dict):
+            raise JobError('job must be a JSON object')
+        spec = {'player': body.get('player', 'Passenger57'),
+                'stake': body.get('stake', 100), 'duration': body.get('duration', 250),
+                'samples': body.get('samples', 50), 'seed': body.get('seed'),
+                'limit': body.get('limit', 1000), 'minimum': body.get('minimum', 5)}
+        if spec['player'] not in ply.playerClasses():
+            raise JobError('unknown player %r' % spec['player'])
+        for key in ('stake', 'duration', 'samples', 'limit', 'minimum'):
+            if not _isInteger(spec[key]) or spec[key] < 0:
+                raise JobError('%s must be a non-negative integer' % key)
+        if spec['seed'] is not None and not _isInteger(spec['seed']):
+            raise JobError('seed must be an integer')
+        if spec['samples'] > self.limits.samples or spec['duration'] > self.limits.duration:
+            raise JobError('job exceeds the per-job limits', 413)
+        if spec['seed'] is None:
+            spec['seed'] = random.getrandbits(31)
+        return spec
+
+    def submit(self, body):
+        """Queue a job.
+
+        Return:
+            :obj:`Job`
+
+        Raises:
+            :obj:`JobError`: status ``503`` when the queue is full.
+        """
+        spec = self.validate(body)
+        if self.queue.full():
+            raise JobError('queue is full', 503)
+        self.prune()
+        job = Job(next(self.ids), spec)
+        self.jobs[job.id] = job
+        self.queue.put_nowait(job)
+        return job
+
+    def prune(self):
+        """Forget finished jobs older than :attr:`ttl`, then all but the last :attr:`history`."""
+        expiry = time.monotonic() - self.ttl
+        finished = [job for job in self.jobs.values() if job.finished is not None]
+        for position, job in enumerate(finished):
+            if job.finished < expiry or position < len(finished) - self.history:
+                del self.jobs[job.id]
+
+    def cancel(self, job):
+        if job.status not in FINISHED:
+            job.update(CANCELLED)
+
+    async def _runner(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.status == QUEUED:
+                    await self._run(job)
+            except Exception as error:  # report, don't kill the runner
+                LOGGER.exception('job %d failed', job.id)
+                job.error = str(error)
+                job.update(FAILED)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job):
+        """Play the job's sessions, keeping at most one batch per worker in flight."""
+        loop = asyncio.get_running_loop()
+        job.update(RUNNING)
+        deadline = time.monotonic() + self.limits.seconds
+        samples, size = job.spec['samples'], self.batchSize
+        batches = iter(range(0, samples, size))
+        pending = []
+        try:
+            while True:
+                while len(pending) < self.workers:
+                    low = next(batches, None)
+                    if low is None:
+                        break
+                    pending.append(loop.run_in_executor(
+                        self.pool, _runBatch, job.spec, low, min(low + size, samples)))
+                if not pending:
+                    break
+                # asyncio.wait, unlike wait_for, never swallows a cancellation which
+                # arrives as the batch completes
+                timeout = max(deadline - time.monotonic(), 0)
+                done, _ = await asyncio.wait(pending[:1], timeout=timeout)
+                if not done:
+                    raise asyncio.TimeoutError
+                records = pending.pop(0).result()
+                if job.status == CANCELLED:
+                    return
+                for record in records:
+                    job.result.add(record)
+                job.completed += len(records)
+                job.update()
+        except asyncio.TimeoutError:
+            job.error = 'exceeded %g seconds' % self.limits.seconds
+            job.update(FAILED)
+            return
+        finally:
+            for future in pending:
+                future.cancel()
+        job.update(DONE)
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            method, target, _ = request.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            body = await reader.readexactly(length) if length else b''
+            await self._route(method, target.rstrip('/').split('/')[1:], body, writer)
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError) as error:
+            LOGGER.debug('bad request: %s', error)
+        finally:
+            writer.close()
+
+    def _respond(self, writer, status, payload):
+        body = json.dumps(payload).encode()
+        writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n'
+                     b'Content-Length: %d\r\nConnection: close\r\n\r\n'
+                     % (status, REASONS[status].encode(), len(body)) + body)
+
+    async def _route(self, method, parts, body, writer):
+        if parts == ['jobs'] and method == 'POST':
+            try:
+                job = self.submit(json.loads(body or b'{}'))
+            except ValueError:
+                return self._respond(writer, 400, {'error': 'body must be JSON'})
+            except JobError as error:
+                return self._respond(writer, error.status, {'error': str(error)})
+            return self._respond(writer, 202, job.summary())
+        if len(parts) < 2 or parts[0] != 'jobs' or not parts[1].isdigit() \
+                or int(parts[1]) not in self.jobs:
+            return self._respond(writer, 404, {'error': 'no such job'})
+        job = self.jobs[int(parts[1])]
+        if parts[2:] == ['events'] and method == 'GET':
+            return await self._stream(job, writer)
+        if len(parts) > 2:
+            return self._respond(writer, 404, {'error': 'no such resource'})
+        if method == 'GET':
+            return self._respond(writer, 200, job.summary())
+        if method == 'DELETE':
+            self.cancel(job)
+            return self._respond(writer, 200, job.summary())
+        return self._respond(writer, 405, {'error': 'method not allowed'})
+
+    async def _stream(self, job, writer):
+        """Write a progress event whenever the job changes, until it finishes."""
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n'
+                     b'Connection: close\r\n\r\n')
+        while True:
+            changed = job.changed
+            writer.write(json.dumps(job.summary()).encode() + b'\n')
+            await writer.drain()
+            if job.status in FINISHED:
+                return
+            await changed.wait()
+
+
+def get_args():
+    '''This function parses and return arguments passed in'''
+    parser = argparse.ArgumentParser(description="Serve roulette simulations over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind")
+    parser.add_argument("--port", type=int, default=8765, help="port to bind")
+    parser.add_argument("--unix", help="serve on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, help="size of the process pool")
+    parser.add_argument("--queue", type=int, default=16, help="most jobs waiting")
+    parser.add_argument("-v", "--verbose", help="increase output verbosity",
+                        action="store_true")
+    return parser.parse_args()
+
+
+async def serve(args):
+    service = SimulationService(args.workers, args.queue)
+    address = await service.start(args.host, args.port, args.unix)
+    LOGGER.info('listening on %s', address)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+
+
+def main(args=None):
+    """enters function"""
+    if args is None:
+        args = get_args()
+    loglevel = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
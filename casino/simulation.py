@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+"""Game agnostic simulation kernel shared by roulette, craps and blackjack.
+
+The :obj:`Simulator` runs sessions of any game which follows a small protocol:
+
+    game:
+        ``cycle(player)`` plays one round and ``seed(value)`` reseeds its randomness.
+        ``fingerprint()`` returns a string identifying the layout and table limits; it
+        is only needed with a result cache or a checkpoint. ``reset()``, if the game has
+        one, clears state kept within a session, such as a history of spins.
+    player:
+        ``playing()`` is the terminal check, ``stake`` is the current stake,
+        ``setStake(stake)`` and ``setRounds(rounds)`` prepare a session and ``reset()``
+        clears any strategy state left over from the previous session.
+        ``parameters()`` returns a dict of the settings which change how it bets; it is
+        only needed with a result cache or a checkpoint.
+
+    An unseeded run in this process can only be checkpointed if the game also has
+    ``getstate()`` and ``setstate(state)`` for its random state.
+
+Sessions are run by an executor. :obj:`ScalarExecutor` plays them one after another in
+this process; :obj:`BatchExecutor` hands out batches of sessions to a process pool. Each
+session is reseeded from the simulator's seed and its index, so both executors produce
+the same numbers. Results are folded into mergeable :obj:`RunningStats` as they arrive
+and written to any number of result sinks, so nothing grows with the sample count.
+Rather than a fixed number of sessions, :meth:`Simulator.runUntil` plays until the
+confidence interval of a statistic is as narrow as asked.
+
+Examples:
+    >>> stats = RunningStats()
+    >>> for value in (2, 4, 4, 4, 5, 5, 7, 9):
+    ...     stats.add(value)
+    >>> stats.mean, stats.stdev
+    (5.0, 2.138089935299395)
+"""
+
+import csv
+import logging
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+FIELDS = ('session', 'duration', 'maximum', 'final')
+STATISTICS = {'duration': 'durations', 'maximum': 'maxima', 'final': 'finals'}
+
+
+def sessionSeed(seed, index):
+    """Seed of session ``index``, independent of which executor or worker runs it."""
+    return (seed << 32) + index
+
+
+def zScore(confidence):
+    """Two sided normal quantile for a ``confidence`` level.
+
+    Examples:
+        >>> round(zScore(0.95), 4)
+        1.96
+    """
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+class RunningStats:
+    """Streaming mean and variance (Welford), mergeable across batches and workers.
+
+    Attributes:
+        count (int): number of values added.
+        mean (float): running mean.
+        minimum (float): smallest value added.
+        maximum (float): largest value added.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value):
+        """Fold one value into the statistics."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other):
+        """Fold another :obj:`RunningStats` into this one (Chan et al.).
+
+        Return:
+            :obj:`RunningStats`: ``self``.
+        """
+        if other.count:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self.count = count
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance, like :func:`statistics.variance`"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        """Sample standard deviation, like :func:`statistics.stdev`"""
+        return math.sqrt(self.variance)
+
+    @property
+    def stderr(self):
+        """Standard error of the mean"""
+        return self.stdev / math.sqrt(self.count) if self.count else math.inf
+
+    def toDict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def fromDict(cls, data):
+        stats = cls()
+        stats.__dict__.update(data)
+        return stats
+
+    def __repr__(self):
+        return '{class_:s}(count={count!r}, mean={mean!r}, stdev={stdev!r})'.format(
+            class_=type(self).__name__, count=self.count, mean=self.mean, stdev=self.stdev)
+
+
+class ListSink:
+    """Result sink which keeps every session record in memory.
+
+    Attributes:
+        records (list of tuple): ``(session, duration, maximum, final)`` records.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+
+class CSVSink:
+    """Result sink which streams session records to a CSV file.
+
+    Args:
+        path (str): file to write, with a header row.
+        fields (tuple of str, default :data:`FIELDS`): the header, for records of
+            another shape.
+    """
+
+    def __init__(self, path, fields=FIELDS):
+        self.handle = open(path, 'w', newline='')
+        self.writer = csv.writer(self.handle)
+        self.writer.writerow(fields)
+
+    def write(self, record):
+        self.writer.writerow(record)
+
+    def close(self):
+        self.handle.close()
+
+
+class SimulationResult:
+    """Statistics of a set of sessions.
+
+    Attributes:
+        durations (:obj:`RunningStats`): rounds played per session.
+        maxima (:obj:`RunningStats`): highest stake reached per session.
+        finals (:obj:`RunningStats`): stake at the end of each session.
+    """
+
+    def __init__(self):
+        self.durations = RunningStats()
+        self.maxima = RunningStats()
+        self.finals = RunningStats()
+
+    def add(self, record):
+        """Fold one ``(session, duration, maximum, final)`` record in."""
+        _, duration, maximum, final = record
+        self.durations.add(duration)
+        self.maxima.add(maximum)
+        self.finals.add(final)
+
+    def merge(self, other):
+        self.durations.merge(other.durations)
+        self.maxima.merge(other.maxima)
+        self.finals.merge(other.finals)
+        return self
+
+    @property
+    def samples(self):
+        return self.durations.count
+
+    def statistic(self, name):
+        """The :obj:`RunningStats` of ``name``: 'duration', 'maximum' or 'final'."""
+        return getattr(self, STATISTICS[name])
+
+    def halfWidth(self, statistic='maximum', confidence=0.95):
+        """Half width of the normal confidence interval of the mean of ``statistic``."""
+        return zScore(confidence) * self.statistic(statistic).stderr
+
+    def interval(self, statistic='maximum', confidence=0.95):
+        """Normal confidence interval of the mean of ``statistic``.
+
+        Return:
+            tuple: ``(low, high)``
+        """
+        mean = self.statistic(statistic).mean
+        half = self.halfWidth(statistic, confidence)
+        return mean - half, mean + half
+
+    def toDict(self):
+        return {name: stats.toDict() for name, stats in vars(self).items()}
+
+    @classmethod
+    def fromDict(cls, data):
+        result = cls()
+        for name, stats in data.items():
+            setattr(result, name, RunningStats.fromDict(stats))
+        return result
+
+
+class ScalarExecutor:
+    """Plays sessions one at a time in the calling process."""
+
+    batchSize = 64
+
+    def run(self, simulator, start, stop):
+        """Yield lists of session records in session order."""
+        for low in range(start, stop, self.batchSize):
+            yield simulator.records(low, min(low + self.batchSize, stop))
+
+
+_worker = {}
+
+
+def _initWorker(simulator):
+    _worker['simulator'] = simulator
+
+
+def _runWorkerBatch(start, stop):
+    return _worker['simulator'].records(start, stop)
+
+
+class BatchExecutor:
+    """Hands out batches of sessions to a pool of worker processes.
+
+    The simulator is sent to each worker once, when the pool starts, so the game and
+    player are built a single time per worker rather than once per batch.
+
+    Args:
+        workers (int, default None): pool size, :func:`os.cpu_count` when ``None``.
+        batchSize (int, default 64): sessions per task.
+    """
+
+    def __init__(self, workers=None, batchSize=64):
+        self.workers = workers
+        self.batchSize = batchSize
+
+    def run(self, simulator, start, stop):
+        """Yield lists of session records in session order."""
+        with ProcessPoolExecutor(self.workers, initializer=_initWorker,
+                                 initargs=(simulator,)) as pool:
+            futures = [pool.submit(_runWorkerBatch, low, min(low + self.batchSize, stop))
+                       for low in range(start, stop, self.batchSize)]
+            for future in futures:
+                yield future.result()
+
+
+class Simulator:
+    """Simulate any game which follows the protocol of this module.
+
+    Notes:
+        cycle:
+            A single cycle of betting and bet resolution.
+        session:
+            One or more cycles in which a player starts with a full stakes.
+            Player may decide to leave or may run out of money.
+        game:
+            Some games may have intermediate events between cycles and sessions.
+
+    Args:
+        game: The game to simulate.
+        player: The player and thus betting strategy.
+        initDuration (int, default 250): Length of simulation.
+        initStake (int, default 100): Initial money amount.
+        samples (int, default 50): Number of sessions.
+        seed (int, default None): Seed for the sessions. Session ``i`` is always played
+            with the same spins whichever executor runs it. Without a seed the game's
+            randomness simply carries on from session to session, except that a run on
+            worker processes draws a fresh seed for that run alone.
+        executor (default :obj:`ScalarExecutor`): runs the sessions.
+        sinks (list): result sinks which receive every session record.
+        cache (:obj:`.ResultCache`, default None): cache of seeded results. Sessions
+            already in the cache are not played again and not sent to the sinks.
+        checkpoint (:obj:`.Checkpoint`, default None): periodic snapshots of
+            :meth:`run`, from which a run killed part way through resumes.
+
+    Attributes:
+        result (:obj:`SimulationResult`): statistics of the last :meth:`run`.
+        See args.
+    """
+
+    def __init__(self, game, player, initDuration=250, initStake=100, samples=50,
+                 seed=None, executor=None, sinks=(), cache=None, checkpoint=None):
+        self.game = game
+        self.player = player
+        self.initDuration = initDuration
+        self.initStake = initStake
+        self.samples = samples
+        self.seed = seed
+        self.executor = ScalarExecutor() if executor is None else executor
+        self.sinks = list(sinks)
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.result = None
+
+    def __getstate__(self):
+        state = vars(self).copy()
+        state['executor'] = None  # workers only ever play sessions
+        state['sinks'] = []
+        state['cache'] = None
+        state['checkpoint'] = None
+        return state
+
+    def session(self, index=None):
+        """Execute a single game session.
+
+        Args:
+            index (int, default None): session number, used to reseed the game.
+
+        Return:
+            `list` of stake values.
+        """
+        if index is not None and self.seed is not None:
+            self.game.seed(sessionSeed(self.seed, index))
+        reset = getattr(self.game, 'reset', None)
+        if reset is not None:
+            reset()
+        stakes = []
+        self.player.setStake(self.initStake)
+        self.player.setRounds(self.initDuration)
+        self.player.reset()
+        while self.player.playing():
+            self.game.cycle(self.player)
+            stakes.append(self.player.stake)
+        return stakes
+
+    def records(self, start, stop):
+        """Play sessions ``start`` to ``stop`` and summarize each one.
+
+        Return:
+            list of tuple: ``(session, duration, maximum, final)`` records.
+        """
+        records = []
+        for index in range(start, stop):
+            stakes = self.session(index)
+            records.append((index, len(stakes), max(stakes, default=self.initStake),
+                            stakes[-1] if stakes else self.initStake))
+        return records
+
+    def run(self, start=0, stop=None):
+        """Execute sessions ``start`` to ``stop`` and collect streaming statistics.
+
+        With a :attr:`cache` and a seed, a run from session zero starts from the cached
+        statistics of the same configuration and only plays the sessions they lack. When
+        the cache holds exactly the sessions asked for nothing is played. When it holds
+        more, the accumulators cannot be cut back, so every session is played again.
+
+        Return:
+            :obj:`SimulationResult`
+        """
+        if stop is None:
+            stop = self.samples
+        result = SimulationResult()
+        cached = self.cache is not None and self.seed is not None and start == 0
+        if cached:
+            hit = self.cache.lookup(self)
+            if hit is not None and hit.samples <= stop:
+                result, start = hit, hit.samples
+        if start < stop:
+            seed = None
+            if self.checkpoint is not None:
+                resumed = self.checkpoint.begin(self, start, stop)
+                if resumed is not None:
+                    result, start, seed = resumed
+            self._play(result, start, stop, seed)
+            if self.checkpoint is not None:
+                self.checkpoint.finish()
+            if cached:
+                self.cache.store(self, result)
+        self.result = result
+        return result
+
+    def runUntil(self, precision, statistic='maximum', confidence=0.95, relative=True,
+                 minSamples=30, maxSamples=10 ** 6):
+        """Play sessions until the mean of ``statistic`` is known to ``precision``.
+
+        Sessions are played in rounds. After each round the number of sessions still
+        needed is projected from the current standard deviation. The next round plays
+        them all at once, so a parallel executor gets large batches. Play stops as
+        soon as the confidence interval is narrow enough, or at ``maxSamples``.
+
+        Args:
+            precision (float): largest half width of the interval, as a fraction of the
+                mean when ``relative``, e.g. ``0.001`` for ±0.1%.
+            statistic (str, default 'maximum'): 'duration', 'maximum' or 'final'.
+            confidence (float, default 0.95): confidence level of the interval.
+            relative (bool, default True): ``precision`` is relative to the mean.
+            minSamples (int, default 30): sessions of the first round, at least two
+                so that the first interval has a standard deviation.
+            maxSamples (int, default 1000000): sessions after which play stops anyway.
+
+        Return:
+            :obj:`SimulationResult`: its ``samples`` are the sessions used and
+            :meth:`~SimulationResult.interval` gives the final interval.
+        """
+        z = zScore(confidence)
+        result = SimulationResult()
+        stop = min(max(minSamples, 2), maxSamples)
+        while True:
+            self._play(result, result.samples, stop)
+            stats = result.statistic(statistic)
+            target = precision * abs(stats.mean) if relative else precision
+            if z * stats.stderr <= target or result.samples >= maxSamples:
+                break
+            needed = math.ceil((z * stats.stdev / target) ** 2) if target else maxSamples
+            # at least grow by half, so a poor early estimate costs few rounds
+            stop = min(max(needed, result.samples * 3 // 2, result.samples + 1), maxSamples)
+        if z * stats.stderr > target:
+            LOGGER.warning('stopped at %d sessions with a half width of %g',
+                           result.samples, z * stats.stderr)
+        LOGGER.info('%s known to ±%g after %d sessions', statistic, z * stats.stderr,
+                    result.samples)
+        self.result = result
+        return result
+
+    def _play(self, result, start, stop, seed=None):
+        """Play sessions ``start`` to ``stop`` on the executor, into ``result`` and the sinks.
+
+        ``seed`` replaces a missing :attr:`seed` for this call, when resuming.
+        """
+        own = self.seed
+        if own is None and not isinstance(self.executor, ScalarExecutor):
+            # workers must not share one stream; the seed only lasts for this call
+            self.seed = random.getrandbits(31) if seed is None else seed
+        try:
+            for records in self.executor.run(self, start, stop):
+                for record in records:
+                    result.add(record)
+                    for sink in self.sinks:
+                        sink.write(record)
+                start += len(records)
+                if self.checkpoint is not None:
+                    self.checkpoint.update(self, result, start)
+        finally:
+            self.seed = own
+
+    def gather(self):
+        """Execute a number of sessions and collect statistics
+
+        Return:
+            tuple: ``((mean, stdev) of durations, (mean, stdev) of maxima)``.
+        """
+        result = self.run()
+        return ((result.durations.mean, result.durations.stdev),
+                (result.maxima.mean, result.maxima.stdev))
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Parameter sweeps of roulette simulations.
+
+A sweep runs a :obj:`.Simulator` at every point of a grid, the Cartesian product of a
+few axes:
+
+    ``player``
+        name of a roulette :obj:`.Player` class.
+    ``stake`` and ``duration``
+        the simulator's initial stake and session length.
+    ``limit`` and ``minimum``
+        the :obj:`.Table` limits.
+    anything else
+        an attribute of the player, such as the :obj:`.Martingale` ``base`` bet.
+
+Points are handed to a process pool whose workers are reused for the whole sweep and
+keep a single prebuilt :obj:`.Wheel`. Every point is run with the same seed, so session
+``i`` of every point sees the same spins. These common random numbers make the
+differences between points far less noisy than their separate estimates.
+
+Each finished point is written to an optional checkpoint file, atomically, so an
+interrupted sweep started again with the same grid only runs the missing points. The
+results come out as one tidy table, a row per point.
+
+Example:
+    python -m casino.sweep --stake 100 200 --limit 500 1000 --base 5 10 --samples 500
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+from concurrent.futures import as_completed
+
+from . import simulation as sim
+from .roulette import bin_builder as bb
+from .roulette import board as bd
+from .roulette import players as ply
+from .roulette import shared as sh
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+DEFAULTS = {'player': 'Martingale', 'stake': 100, 'duration': 250, 'limit': 1000,
+            'minimum': 5}
+STATISTICS = ('duration', 'maximum', 'final')
+
+
+def grid(axes):
+    """Every point of the grid spanned by ``axes``, in a stable order.
+
+    Args:
+        axes (dict): axis name to the list of its values.
+
+    Return:
+        list of dict: one dict of settings per point.
+
+    Examples:
+        >>> grid({'stake': [100, 200], 'limit': [500]})
+        [{'limit': 500, 'stake': 100}, {'limit': 500, 'stake': 200}]
+    """
+    names = sorted(axes)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(axes[name] for name in names))]
+
+
+def buildSimulator(point, samples, seed):
+    """Roulette :obj:`.Simulator` for one grid point, on this process's shared wheel.
+
+    Raises:
+        ValueError: if the point names an unknown player or player setting.
+    """
+    settings = dict(DEFAULTS, **point)
+    classes = ply.playerClasses()
+    if settings['player'] not in classes:
+        raise ValueError('unknown player %r' % settings['player'])
+    wheel = bb.sharedWheel()
+    table = bd.Table(settings.pop('limit'), settings.pop('minimum'))
+    player = classes[settings.pop('player')](table, wheel)
+    stake, duration = settings.pop('stake'), settings.pop('duration')
+    for name, value in settings.items():
+        if not hasattr(player, name):
+            raise ValueError('%s has no setting %r' % (type(player).__name__, name))
+        setattr(player, name, value)
+    return ply.Simulator(ply.Game(table, wheel), player, duration, stake, samples, seed=seed)
+
+
+def _runPoint(index, point, samples, seed):
+    return index, buildSimulator(point, samples, seed).run().toDict()
+
+
+class Sweep:
+    """Run a simulation at every point of a parameter grid.
+
+    Args:
+        axes (dict): axis name to the list of its values, see :func:`grid`.
+        samples (int, default 50): sessions per point.
+        seed (int, default None): seed shared by every point; drawn at random when
+            ``None`` so that the points still share their spins.
+        workers (int, default None): size of the process pool.
+        checkpoint (str, default None): file recording the finished points.
+        progress (callable, default None): called as ``progress(done, total, point)``
+            after each point.
+
+    Attributes:
+        points (list of dict): the grid.
+        results (dict): point index to its :obj:`.SimulationResult`.
+    """
+
+    def __init__(self, axes, samples=50, seed=None, workers=None, checkpoint=None,
+                 progress=None):
+        self.axes = {name: list(values) for name, values in axes.items()}
+        self.points = grid(self.axes)
+        self.samples = samples
+        self.seed = random.getrandbits(31) if seed is None else seed
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.progress = progress
+        self.results = {}
+        for point in self.points:  # fail before starting any worker
+            buildSimulator(point, samples, self.seed)
+
+    def _description(self):
+        return {'axes': self.axes, 'samples': self.samples, 'seed': self.seed}
+
+    def load(self):
+        """Pick up the points finished by an earlier run of the same sweep.
+
+        Raises:
+            ValueError: if the checkpoint belongs to a different sweep.
+        """
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return
+        with open(self.checkpoint) as handle:
+            data = json.load(handle)
+        if data['sweep'] != json.loads(json.dumps(self._description())):
+            raise ValueError('%s is the checkpoint of another sweep' % self.checkpoint)
+        self.results = {int(index): sim.SimulationResult.fromDict(result)
+                        for index, result in data['results'].items()}
+        LOGGER.info('resuming with %d of %d points done', len(self.results), len(self.points))
+
+    def save(self):
+        """Write the finished points to :attr:`checkpoint`, atomically."""
+        data = {'sweep': self._description(),
+                'results': {index: result.toDict() for index, result in self.results.items()}}
+        temporary = self.checkpoint + '.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(data, handle)
+        os.replace(temporary, self.checkpoint)
+
+    def run(self):
+        """Run every point not finished yet.
+
+        Return:
+            list of dict: :meth:`rows`.
+        """
+        self.load()
+        todo = [index for index in range(len(self.points)) if index not in self.results]
+        if todo:
+            with sh.sharedPool(self.workers) as pool:
+                futures = [pool.submit(_runPoint, index, self.points[index], self.samples,
+                                       self.seed) for index in todo]
+                for future in as_completed(futures):
+                    index, data = future.result()
+                    self.results[index] = sim.SimulationResult.fromDict(data)
+                    if self.checkpoint is not None:
+                        self.save()
+                    LOGGER.info('point %d of %d done: %r', len(self.results),
+                                len(self.points), self.points[index])
+                    if self.progress is not None:
+                        self.progress(len(self.results), len(self.points), self.points[index])
+        return self.rows()
+
+    def columns(self):
+        """Column names of :meth:`rows`."""
+        names = ['%s_%s' % (name, moment) for name in STATISTICS
+                 for moment in ('mean', 'stdev', 'stderr')]
+        return sorted(self.axes) + ['samples'] + names
+
+    def rows(self):
+        """Tidy table of the finished points: the point's settings, then its statistics.
+
+        Return:
+            list of dict: one row per point, in grid order.
+        """
+        rows = []
+        for index, point in enumerate(self.points):
+            result = self.results.get(index)
+            if result is None:
+                continue
+            row = dict(point, samples=result.samples)
+            for name, stats in zip(STATISTICS, (result.durations, result.maxima,
+                                                result.finals)):
+                row[name + '_mean'] = stats.mean
+                row[name + '_stdev'] = stats.stdev
+                row[name + '_stderr'] = stats.stderr
+            rows.append(row)
+        return rows
+
+    def write(self, handle):
+        """Write :meth:`rows` as CSV to an open file."""
+        writer = csv.DictWriter(handle, self.columns())
+        writer.writeheader()
+        writer.writerows(self.rows())
+
+
+def get_args():
+    '''This function parses and return arguments passed in'''
+    parser = argparse.ArgumentParser(description="Sweep roulette simulations over a grid.")
+    parser.add_argument("--player", nargs='+', default=[DEFAULTS['player']],
+                        help="player classes")
+    for name in ('stake', 'duration', 'limit', 'minimum'):
+        parser.add_argument("--" + name, nargs='+', type=int, default=[DEFAULTS[name]],
+                            help="values of %s" % name)
+    parser.add_argument("--base", nargs='+', type=int, help="base bets of progression players")
+    parser.add_argument("--samples", type=int, default=50, help="sessions per point")
+    parser.add_argument("--seed", type=int, help="seed shared by every point")
+    parser.add_argument("--workers", type=int, help="size of the process pool")
+    parser.add_argument("--checkpoint", help="file to resume from and record progress in")
+    parser.add_argument("--output", help="CSV file for the results, standard output if unset")
+    parser.add_argument("-v", "--verbose", help="increase output verbosity",
+                        action="store_true")
+    return parser.parse_args()
+
+
+def main(args=None):
+    """enters function"""
+    if args is None:
+        args = get_args()
+    loglevel = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    axes = {name: getattr(args, name)
+            for name in ('player', 'stake', 'duration', 'limit', 'minimum', 'base')
+            if getattr(args, name) is not None}
+    sweep = Sweep(axes, args.samples, args.seed, args.workers, args.checkpoint)
+    sweep.run()
+    if args.output is None:
+        sweep.write(sys.stdout)
+    else:
+        with open(args.output, 'w', newline='') as handle:
+            sweep.write(handle)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,64 @@
 import doctest
 import unittest
 
+from .. import checkpoint
 from .. import roulette
+from .. import simulation
+from .. import sweep
+from .. import trajectory
+from .. import variance
+from ..blackjack import board as blackjack_board
+from ..blackjack import counting as blackjack_counting
+from ..blackjack import strategy as blackjack_strategy
+from ..craps import board as craps_board
+from ..roulette import bias as roulette_bias
+from ..roulette import board as roulette_board
+from ..roulette import sizing as roulette_sizing
+from . import test_blackjack
+from . import test_cache
+from . import test_checkpoint
+from . import test_craps
+from . import test_distributed
+from . import test_floor
+from . import test_fork
 from . import test_roulette
+from . import test_service
+from . import test_simulation
+from . import test_sweep
+from . import test_tournament
+from . import test_trajectory
+from . import test_variance
 
 suite = unittest.TestSuite()
 
 # Mix unittests and doctests into the same suite
 suite.addTest(doctest.DocTestSuite(roulette))
+suite.addTest(doctest.DocTestSuite(roulette_bias))
+suite.addTest(doctest.DocTestSuite(roulette_board))
+suite.addTest(doctest.DocTestSuite(roulette_sizing))
+suite.addTest(doctest.DocTestSuite(blackjack_board))
+suite.addTest(doctest.DocTestSuite(blackjack_strategy))
+suite.addTest(doctest.DocTestSuite(blackjack_counting))
+suite.addTest(doctest.DocTestSuite(craps_board))
+suite.addTest(doctest.DocTestSuite(simulation))
+suite.addTest(doctest.DocTestSuite(checkpoint))
+suite.addTest(doctest.DocTestSuite(sweep))
+suite.addTest(doctest.DocTestSuite(variance))
+suite.addTest(doctest.DocTestSuite(trajectory))
 suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_roulette))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_blackjack))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_cache))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_checkpoint))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_craps))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_distributed))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_floor))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_fork))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_service))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_simulation))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_sweep))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_tournament))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_trajectory))
+suite.addTest(unittest.defaultTestLoader.loadTestsFromModule(test_variance))
 
 runner = unittest.TextTestRunner(verbosity=2)
 runner.run(suite)
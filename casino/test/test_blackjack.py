@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..blackjack import board as bd
+from ..blackjack import counting as ct
+from ..blackjack import players as ply
+from ..blackjack import strategy as st
+
+
+class test_Hand(unittest.TestCase):
+
+    def test_totals(self):
+        hand = bd.Hand(10, [1, 6])
+        self.assertEqual((hand.total, hand.soft), (17, True))
+        hand.add(10)
+        self.assertEqual((hand.total, hand.soft), (17, False))
+        hand.add(9)
+        self.assertTrue(hand.isBust())
+
+    def test_blackjack(self):
+        self.assertTrue(bd.Hand(10, [1, 10]).isBlackjack())
+        self.assertFalse(bd.Hand(10, [1, 10], fromSplit=True).isBlackjack())
+        self.assertTrue(bd.Hand(10, [8, 8]).isPair())
+
+
+class test_Shoe(unittest.TestCase):
+
+    def test_deal_updates_composition(self):
+        shoe = bd.Shoe(decks=2, rng=None)
+        shoe.seed(1)
+        card = shoe.deal()
+        expected = list(bd.deckComposition(2))
+        expected[card - 1] -= 1
+        self.assertEqual(shoe.composition(), tuple(expected))
+        self.assertEqual(shoe.remaining, 103)
+
+    def test_reshuffles_when_empty(self):
+        shoe = bd.Shoe(decks=1, penetration=1.0)
+        cards = [shoe.deal() for _ in range(60)]
+        self.assertEqual(sorted(cards[:52]), sorted(shoe.cards))
+        self.assertEqual(shoe.remaining, 44)
+
+    def test_rejects_bad_penetration(self):
+        for penetration in (0, -0.5, 1.5):
+            with self.assertRaises(ValueError):
+                bd.Shoe(decks=1, penetration=penetration)
+            with self.assertRaises(ValueError):
+                bd.Rules(penetration=penetration)
+
+    def test_cut_card(self):
+        shoe = bd.Shoe(decks=1, penetration=0.5)
+        for _ in range(25):
+            shoe.deal()
+        self.assertFalse(shoe.needsShuffle())
+        shoe.deal()
+        self.assertTrue(shoe.needsShuffle())
+
+
+class test_Rules(unittest.TestCase):
+
+    def test_key(self):
+        self.assertEqual(bd.Rules().key(), '6d-s17-das-nosurr-bj1.5')
+        self.assertEqual(bd.Rules(surrender=True), bd.Rules(surrender=True))
+        self.assertNotEqual(bd.Rules(), bd.Rules(hitSoft17=True))
+
+
+class test_Strategy(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.rules = bd.Rules(decks=1, surrender=True)
+        cls.table = st.StrategyTable.fromRules(cls.rules, cls.directory)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_dealer_probabilities(self):
+        counts = bd.deckComposition(2)
+        for upcard in bd.RANKS:
+            probs = st.dealerProbabilities(upcard, counts)
+            self.assertAlmostEqual(sum(probs), 1.0)
+
+    def test_basic_decisions(self):
+        best = self.table.bestAction
+        self.assertEqual(best(bd.Hand(10, [10, 6]), 7), st.HIT)
+        self.assertEqual(best(bd.Hand(10, [10, 3]), 6), st.STAND)
+        self.assertEqual(best(bd.Hand(10, [8, 8]), 6), st.SPLIT)
+        self.assertEqual(best(bd.Hand(10, [6, 5]), 6), st.DOUBLE)
+        self.assertEqual(best(bd.Hand(10, [10, 6]), 1), st.SURRENDER)
+        self.assertEqual(best(bd.Hand(10, [10, 6]), 1, (st.STAND, st.HIT)), st.HIT)
+        self.assertEqual(best(bd.Hand(10, [2, 3, 10]), 10), st.HIT)
+
+    def test_persistence(self):
+        path = st.StrategyTable.path(self.rules, self.directory)
+        self.assertTrue(os.path.exists(path))
+        loaded = st.StrategyTable.load(path)
+        self.assertEqual(loaded.rules, self.rules)
+        self.assertEqual(loaded.entries, self.table.entries)
+
+    def test_player_loads_table(self):
+        player = ply.BasicStrategy(self.rules, self.directory)
+        self.assertIs(player.strategy, self.table)
+
+    def test_game_cycle(self):
+        game = ply.Game(self.rules)
+        game.seed(1)
+        player = ply.BasicStrategy(self.rules, self.directory)
+        player.setRounds(200)
+        while player.playing():
+            game.cycle(player)
+        self.assertEqual(player.roundsToGo, 0)
+        self.assertNotEqual(player.stake, 1000)
+
+    def test_deep_penetration(self):
+        for penetration in (0.9, 0.95, 1.0):
+            rules = bd.Rules(decks=1, surrender=True, penetration=penetration)
+            game = ply.Game(rules)
+            game.seed(2)
+            player = ply.BasicStrategy(rules, self.directory)
+            player.setStake(10 ** 6)
+            player.setRounds(500)
+            while player.playing():
+                game.cycle(player)
+            self.assertEqual(player.roundsToGo, 0)
+
+
+class test_Counting(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.rules = bd.Rules(decks=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_systems_balance(self):
+        deck = bd.deckComposition(1)
+        for system in (ct.HI_LO, ct.OMEGA_II):
+            self.assertEqual(sum(t * n for t, n in zip(system.tags, deck)), 0)
+        self.assertEqual(sum(t * n for t, n in zip(ct.KO.tags, deck)), 4)
+
+    def test_true_count(self):
+        player = ct.CountingPlayer(self.rules, directory=self.directory)
+        for card in (2, 3, 4, 5, 6, 10):
+            player.observe(card)
+        self.assertEqual((player.running, player.unseen), (4, 46))
+        self.assertEqual(player.trueCount(), 4)
+        self.assertEqual(player.placeBets(), 60)
+        player.shuffled()
+        self.assertEqual((player.running, player.unseen), (0, 52))
+
+    def test_ramp_by_system(self):
+        bets = {}
+        for system in (ct.HI_LO, ct.KO, ct.OMEGA_II):
+            player = ct.CountingPlayer(self.rules, system, directory=self.directory)
+            self.assertEqual(player.ramp, ct.compileRamp(ct.RAMPS[system.name], -10, 10))
+            player.running = 6
+            player.unseen = 52
+            bets[system.name] = player.placeBets()
+        # an index of 6 is worth less to KO, whose true count is only 4 or so with a deck
+        # to go, and to Omega II, which bets like Hi-Lo at 3
+        self.assertEqual(bets, {'Hi-Lo': 80, 'KO': 60, 'Omega II': 40})
+        ramp = ((-100, 2),)
+        player = ct.CountingPlayer(self.rules, ct.KO, ramp, directory=self.directory)
+        self.assertEqual(set(player.ramp), {2})
+
+    def test_deviation(self):
+        player = ct.CountingPlayer(self.rules, directory=self.directory)
+        hand = bd.Hand(10, [10, 6])
+        allowed = (st.STAND, st.HIT)
+        player.running = -1
+        self.assertEqual(player.decide(hand, 10, allowed), st.HIT)
+        player.running = 1
+        self.assertEqual(player.decide(hand, 10, allowed), st.STAND)
+
+    def test_pair_uses_total_deviation(self):
+        player = ct.CountingPlayer(self.rules, directory=self.directory)
+        hand = bd.Hand(10, [6, 6])
+        player.running = 10
+        self.assertEqual(player.decide(hand, 2, (st.STAND, st.HIT)), st.STAND)
+        player.running = -10
+        self.assertEqual(player.decide(hand, 2, (st.STAND, st.HIT)), st.HIT)
+
+    def test_incremental_count_matches_shoe(self):
+        game = ply.Game(self.rules)
+        game.seed(3)
+        player = ct.CountingPlayer(self.rules, ct.OMEGA_II, directory=self.directory)
+        player.setStake(10 ** 6)
+        for _ in range(50):
+            game.cycle(player)
+            shoe = game.shoe
+            seen = shoe.cards[:shoe.position]
+            self.assertEqual(player.running, sum(player.system.tag(c) for c in seen))
+            self.assertEqual(player.unseen, shoe.remaining)
+
+
+if __name__ == '__main__':
+    unittest.main()
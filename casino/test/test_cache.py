@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import cache as ch
+from .. import simulation as sim
+from .test_simulation import roulette_simulator
+
+
+class test_ResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_identical_run_is_not_replayed(self):
+        cache = ch.ResultCache()
+        first = roulette_simulator(seed=1, samples=20, cache=cache).run()
+        sink = sim.ListSink()
+        second = roulette_simulator(seed=1, samples=20, cache=cache, sinks=[sink]).run()
+        self.assertEqual(sink.records, [])
+        self.assertEqual(second.toDict(), first.toDict())
+        self.assertEqual(cache.hits, 1)
+
+    def test_more_samples_only_plays_missing_sessions(self):
+        cache = ch.ResultCache()
+        roulette_simulator(seed=2, samples=20, cache=cache).run()
+        sink = sim.ListSink()
+        extended = roulette_simulator(seed=2, samples=30, cache=cache, sinks=[sink]).run()
+        self.assertEqual([record[0] for record in sink.records], list(range(20, 30)))
+        fresh = roulette_simulator(seed=2, samples=30).run()
+        self.assertEqual(extended.samples, 30)
+        self.assertAlmostEqual(extended.maxima.mean, fresh.maxima.mean)
+        self.assertAlmostEqual(extended.durations.variance, fresh.durations.variance)
+
+    def test_key_covers_configuration(self):
+        base = ch.cacheKey(roulette_simulator(seed=1))
+        self.assertEqual(base, ch.cacheKey(roulette_simulator(seed=1, samples=99)))
+        self.assertNotEqual(base, ch.cacheKey(roulette_simulator(seed=2)))
+        self.assertNotEqual(base, ch.cacheKey(roulette_simulator(seed=1, initStake=50)))
+        limited = roulette_simulator(seed=1)
+        limited.game.table.limit = 500
+        self.assertNotEqual(base, ch.cacheKey(limited))
+
+    def test_disk_tier(self):
+        result = roulette_simulator(seed=3, samples=10,
+                                    cache=ch.ResultCache(directory=self.directory)).run()
+        cache = ch.ResultCache(directory=self.directory)
+        self.assertEqual(cache.lookup(roulette_simulator(seed=3)).toDict(), result.toDict())
+
+    def test_short_run_keeps_longer_disk_entry(self):
+        roulette_simulator(seed=5, samples=12,
+                           cache=ch.ResultCache(directory=self.directory)).run()
+        short = roulette_simulator(seed=5, samples=4)
+        ch.ResultCache(directory=self.directory).store(short, short.run())
+        fresh = ch.ResultCache(directory=self.directory)
+        self.assertEqual(fresh.lookup(roulette_simulator(seed=5)).samples, 12)
+
+    def test_size_eviction(self):
+        cache = ch.ResultCache(entries=1, directory=self.directory, maxBytes=1000)
+        for seed in range(5):
+            roulette_simulator(seed=seed, samples=2, cache=cache).run()
+        size = sum(os.path.getsize(os.path.join(self.directory, name))
+                   for name in os.listdir(self.directory))
+        self.assertLessEqual(size, 1000)
+        self.assertIsNotNone(cache.lookup(roulette_simulator(seed=4)))
+        self.assertIsNone(cache.lookup(roulette_simulator(seed=0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
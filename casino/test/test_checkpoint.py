@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import checkpoint as cp
+from .. import simulation as sim
+from .test_simulation import roulette_simulator
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingSink(sim.ListSink):
+
+    def __init__(self, after):
+        super(CrashingSink, self).__init__()
+        self.after = after
+
+    def write(self, record):
+        if len(self.records) == self.after:
+            raise Crash
+        super(CrashingSink, self).write(record)
+
+
+class test_Checkpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'run.ckpt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def interrupted(self, **kwargs):
+        """Records of a run killed after 100 sessions and resumed, and the result."""
+        crashing = CrashingSink(100)
+        first = roulette_simulator(samples=150, sinks=[crashing],
+                                   checkpoint=cp.Checkpoint(self.path, interval=0), **kwargs)
+        first.game.wheel.rng.seed(7)
+        with self.assertRaises(Crash):
+            first.run()
+        self.assertTrue(os.path.exists(self.path))
+        sink = sim.ListSink()
+        second = roulette_simulator(samples=150, sinks=[sink],
+                                    checkpoint=cp.Checkpoint(self.path, interval=0), **kwargs)
+        result = second.run()
+        self.assertFalse(os.path.exists(self.path))
+        return crashing.records[:sink.records[0][0]] + sink.records, result
+
+    def uninterrupted(self, **kwargs):
+        sink = sim.ListSink()
+        simulator = roulette_simulator(samples=150, sinks=[sink], **kwargs)
+        simulator.game.wheel.rng.seed(7)
+        return sink.records, simulator.run()
+
+    def test_unseeded_resume_is_bit_identical(self):
+        records, result = self.interrupted()
+        expected, reference = self.uninterrupted()
+        self.assertEqual(records, expected)
+        self.assertEqual(result.toDict(), reference.toDict())
+
+    def test_seeded_resume_is_bit_identical(self):
+        records, result = self.interrupted(seed=3)
+        expected, reference = self.uninterrupted(seed=3)
+        self.assertEqual(records, expected)
+        self.assertEqual(result.toDict(), reference.toDict())
+
+    def test_other_run_is_refused(self):
+        with self.assertRaises(Crash):
+            roulette_simulator(seed=1, samples=150, sinks=[CrashingSink(70)],
+                               checkpoint=cp.Checkpoint(self.path, interval=0)).run()
+        with self.assertRaises(ValueError):
+            roulette_simulator(seed=2, samples=150,
+                               checkpoint=cp.Checkpoint(self.path)).run()
+
+    def test_interval_bounds_writes(self):
+        checkpoint = cp.Checkpoint(self.path, interval=3600)
+        roulette_simulator(seed=1, samples=300, checkpoint=checkpoint).run()
+        self.assertEqual(checkpoint.writes, 0)
+        checkpoint = cp.Checkpoint(self.path, interval=0)
+        roulette_simulator(seed=1, samples=300, checkpoint=checkpoint).run()
+        self.assertEqual(checkpoint.writes, 5)  # one per batch of 64
+        self.assertGreater(checkpoint.seconds, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+from fractions import Fraction
+
+from .. import simulation as sim
+from ..craps import board as bd
+from ..craps import players as ply
+
+
+class ScriptedDice(bd.Dice):
+    """Dice which roll the pairs they are given, in order."""
+
+    def __init__(self, pairs):
+        super(ScriptedDice, self).__init__()
+        self.kinds = [bd.rollKind(*pair) for pair in pairs]
+
+    def roll(self):
+        return self.kinds.pop(0)
+
+
+def chances():
+    """Chance of each kind of roll."""
+    counts = [0] * len(bd.ROLLS)
+    for kind in bd.Dice.KINDS:
+        counts[kind] += 1
+    return [Fraction(count, 36) for count in counts]
+
+
+class test_Resolution(unittest.TestCase):
+
+    def test_disjoint(self):
+        for phase in bd.RESOLUTIONS:
+            for resolution in phase:
+                masks = (resolution.wins, resolution.loses, resolution.pushes,
+                         resolution.travels)
+                self.assertEqual(sum(masks), resolution.wins | resolution.loses
+                                 | resolution.pushes | resolution.travels)
+                self.assertEqual(set(resolution.pays), set(bd.bits(resolution.wins)))
+
+    def test_pass_line(self):
+        """The pass line wins 244 times in 495, and odds are paid at true odds."""
+        p = chances()
+        bet = bd.ID['Pass']
+        wins = sum(p[kind] for kind, resolution in enumerate(bd.RESOLUTIONS[0])
+                   if resolution.wins >> bet & 1)
+        for point in bd.POINTS:
+            decided = [(kind, resolution)
+                       for kind, resolution in enumerate(bd.RESOLUTIONS[bd.phaseOf(point)])
+                       if resolution.point == 0]
+            set_ = sum(p[kind] for kind, resolution in enumerate(bd.RESOLUTIONS[0])
+                       if resolution.point == point)
+            won = sum(p[kind] for kind, resolution in decided if resolution.wins >> bet & 1)
+            wins += set_ * won / sum(p[kind] for kind, _ in decided)
+            odds = bd.ID['Pass odds']
+            ev = sum(p[kind] * (resolution.payout(odds, 30) - 30 if resolution.wins >> odds & 1
+                                else -30) for kind, resolution in decided)
+            self.assertEqual(ev, 0)
+        self.assertEqual(wins, Fraction(244, 495))
+
+    def test_place_and_hardways(self):
+        p = chances()
+        resolutions = bd.RESOLUTIONS[bd.phaseOf(6)]
+        for name, amount, edge in (('Place 6', 6, Fraction(-1, 66)),
+                                   ('Hard 8', 1, Fraction(-1, 11))):
+            bet = bd.ID[name]
+            decided = [(p[kind], resolution) for kind, resolution in enumerate(resolutions)
+                       if (resolution.wins | resolution.loses) >> bet & 1]
+            total = sum(chance for chance, _ in decided)
+            ev = sum(chance * (resolution.payout(bet, amount) if resolution.wins >> bet & 1
+                               else 0) for chance, resolution in decided) / total - amount
+            self.assertEqual(ev / amount, edge)
+        self.assertFalse(bd.RESOLUTIONS[0][bd.rollKind(4, 4)].wins >> bd.ID['Hard 8'] & 1)
+
+    def test_table(self):
+        table = bd.Table(500, 5, odds=2)
+        amounts = [0] * len(bd.BETS)
+        self.assertRaises(bd.InvalidBet, table.isValid, bd.ID['Pass'], 4, amounts)
+        self.assertRaises(bd.InvalidBet, table.isValid, bd.ID['Pass odds'], 10, amounts)
+        amounts[bd.ID['Come 9']] = 10
+        table.isValid(bd.ID['Come odds 9'], 20, amounts)
+        self.assertRaises(bd.InvalidBet, table.isValid, bd.ID['Come odds 9'], 21, amounts)
+
+
+class test_Game(unittest.TestCase):
+
+    def play(self, player, pairs):
+        game = ply.Game(bd.Table(1000, 5), ScriptedDice(pairs))
+        for _ in pairs:
+            game.cycle(player)
+        return game
+
+    def test_come_bets_travel(self):
+        player = ply.ComePlayer(bd.Table(1000, 5))
+        player.setStake(1000)
+        # point 6, come bet to 5, come bet to 9, the 5 wins, then seven out
+        game = self.play(player, [(3, 3), (2, 3), (4, 5), (1, 4), (3, 4)])
+        self.assertEqual(game.point, 0)
+        self.assertEqual(player.bets, 0)
+        # line and odds on the 6 lose, come 5 and its odds win 3 to 2, come 9 and its
+        # odds lose and the last come bet wins on the 7
+        self.assertEqual(player.stake, 1000 - 20 + 10 + 15 - 20 + 10)
+
+    def test_one_roll_and_hardways(self):
+        class Bettor(ply.Player):
+            def placeBets(self, point):
+                if point and not self.has('Hard 8'):
+                    self.place('Hard 8', 5)
+                    self.place('Field', 5)
+
+        player = Bettor(bd.Table(1000, 5))
+        player.setStake(100)
+        self.play(player, [(2, 2), (6, 6), (3, 5), (4, 4)])
+        # the field wins double, then loses; the easy 8 takes the hardway down, then
+        # the hard 8 pays 9 to 1
+        self.assertEqual(player.stake, 100 - 10 + 15 - 10 + 50)
+
+    def test_round_shares_the_roll(self):
+        players = [ply.PassLine(bd.Table(1000, 5)), ply.DontPass(bd.Table(1000, 5))]
+        game = ply.Game(bd.Table(1000, 5), ScriptedDice([(1, 1), (5, 6)]))
+        game.round(players)
+        game.round(players)
+        self.assertEqual([player.stake for player in players], [1000 - 10 + 10, 1000])
+
+    def test_sessions(self):
+        for player_class in (ply.PassLine, ply.DontPass, ply.ComePlayer, ply.IronCross):
+            player = player_class(bd.Table(1000, 5))
+            simulator = sim.Simulator(ply.Game(bd.Table(1000, 5)), player, initDuration=100,
+                                      initStake=200, samples=50, seed=3)
+            records = simulator.records(0, 50)
+            self.assertEqual(simulator.records(20, 21), records[20:21])
+            self.assertEqual(player.bets, 0)
+            self.assertTrue(any(record[3] != 200 for record in records))
+            self.assertTrue(all(record[1] >= 100 or record[3] < 10 for record in records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import unittest
+from multiprocessing.connection import Client
+
+from .. import distributed as dt
+from .. import simulation as sim
+from ..roulette import board as bd
+from .test_simulation import roulette_simulator
+
+
+class test_DistributedExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = dt.DistributedExecutor(batchSize=16, lease=2.0)
+        self.processes = []
+
+    def tearDown(self):
+        self.executor.close()
+        for process in self.processes:
+            process.join(10)
+
+    def records(self, executor=None):
+        sink = sim.ListSink()
+        roulette_simulator(seed=2, samples=100, executor=executor, sinks=[sink]).run()
+        return sink.records
+
+    def test_matches_scalar(self):
+        self.processes = dt.startWorkers(self.executor.address, 2)
+        self.assertEqual(self.records(self.executor), self.records())
+        self.assertEqual(sum(stats.sessions for stats in self.executor.workers), 100)
+
+    def test_reissues_work_of_lost_workers(self):
+        def deserter(answer):
+            connection = Client(self.executor.address, authkey=dt.AUTHKEY)
+            connection.send('deserter')
+            connection.recv()  # the job
+            connection.recv()  # a range, never played
+            if not answer:
+                connection.close()
+            self.processes += dt.startWorkers(self.executor.address, 1)
+            if answer:
+                threading.Event().wait(3)  # hold the range past its lease
+                connection.close()
+
+        for answer in (False, True):
+            thread = threading.Thread(target=deserter, args=(answer,))
+            thread.start()
+            self.assertEqual(self.records(self.executor), self.records())
+            thread.join()
+        failed = [stats for stats in self.executor.workers if stats.failed]
+        self.assertEqual([stats.name for stats in failed], ['deserter', 'deserter'])
+
+    def test_errors_reach_the_caller(self):
+        self.processes = dt.startWorkers(self.executor.address, 2)
+        simulator = roulette_simulator(seed=2, samples=100, executor=self.executor)
+        simulator.player.base = 1  # under the table minimum
+        self.assertRaises(bd.InvalidBet, simulator.run)
+        self.assertFalse(any(stats.failed for stats in self.executor.workers))
+        self.assertEqual(self.records(self.executor), self.records())
+
+    def test_no_workers_left(self):
+        def deserter():
+            connection = Client(self.executor.address, authkey=dt.AUTHKEY)
+            connection.send('deserter')
+            connection.recv()  # the job
+            connection.recv()  # a range, never played
+            connection.close()
+
+        thread = threading.Thread(target=deserter)
+        thread.start()
+        self.assertRaises(RuntimeError, self.records, self.executor)
+        thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
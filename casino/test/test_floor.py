@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+
+from .. import floor as fl
+from .. import simulation as sim
+from ..roulette import players as ply
+
+
+class CoinGame:
+    """Even money coin flips, a game with only :meth:`cycle`."""
+
+    def __init__(self):
+        self.rng = random.Random()
+
+    def seed(self, value):
+        self.rng.seed(value)
+
+    def cycle(self, player):
+        if player.playing():
+            player.stake += 1 if self.rng.random() < 0.5 else -1
+            player.roundsToGo -= 1
+
+
+class CoinPlayer:
+
+    def setStake(self, stake):
+        self.stake = stake
+
+    def setRounds(self, rounds):
+        self.roundsToGo = rounds
+
+    def reset(self):
+        pass
+
+    def playing(self):
+        return self.roundsToGo > 0 and self.stake > 0
+
+
+def roulette(tables, player_class=ply.Passenger57, seats=7):
+    return [fl.rouletteTable('roulette %d' % number, player_class, seats=seats)
+            for number in range(tables)]
+
+
+class test_Floor(unittest.TestCase):
+
+    def test_repeatable(self):
+        results = []
+        for _ in range(2):
+            sink = sim.ListSink()
+            result = fl.Floor(roulette(5, ply.Martingale), 100, seed=3, sinks=[sink]).run(3)
+            results.append((result.house, result.events, result.switches, sink.records))
+        self.assertEqual(results[0], results[1])
+        self.assertGreater(results[0][1], 0)
+
+    def test_statistics(self):
+        sink = sim.ListSink()
+        floor = fl.Floor(roulette(4), 60, rounds=100, seed=1, sinks=[sink])
+        result = floor.run(5)
+        self.assertEqual(sum(record[4] for record in sink.records), result.house)
+        self.assertEqual([record[0] for record in sink.records],
+                         sorted(record[0] for record in sink.records))
+        self.assertEqual({record[0] for record in sink.records}, set(range(5)))
+        for table in floor.tables:
+            stats = result.tables[table.name]
+            self.assertEqual(sum(record[2] for record in sink.records
+                                 if record[1] == table.name), stats.rounds)
+            self.assertLessEqual(stats.seatRounds, stats.rounds * table.seats)
+            self.assertAlmostEqual(stats.busy, stats.rounds * table.interval)
+            self.assertLessEqual(result.utilization(table.name), 1.0)
+            self.assertEqual(stats.house.count, stats.rounds)
+        self.assertEqual(result.events, result.arrivals + sum(
+            stats.rounds for stats in result.tables.values()))
+
+    def test_full_floor_turns_patrons_away(self):
+        floor = fl.Floor(roulette(2, seats=1), 600, rounds=1000, switch=0.5, seed=2)
+        result = floor.run(1)
+        self.assertGreater(result.turnedAway, 0)
+        self.assertEqual(result.switches, 0)  # never a free seat to move to
+        self.assertTrue(all(len(table.seated) <= 1 for table in floor.tables))
+        self.assertEqual(floor.open, [table for table in floor.tables if table.free])
+
+    def test_patrons_move_with_their_stake(self):
+        tables = [fl.FloorTable('coin %d' % number, CoinGame(), CoinPlayer, 3600)
+                  for number in range(3)]
+        floor = fl.Floor(tables, 10, stake=50, rounds=10 ** 6, switch=0.2, seed=5)
+        result = floor.run(2)
+        self.assertGreater(result.switches, 0)
+        seated = [player.stake for table in tables for _, player in table.seated]
+        self.assertEqual(len(seated) + result.departures, result.arrivals - result.turnedAway)
+        # only the ruined leave, so the house holds whatever is not still on the tables
+        self.assertEqual(result.house, 50 * (result.arrivals - result.turnedAway) - sum(seated))
+
+    def test_no_arrivals(self):
+        result = fl.Floor(roulette(2), 0, seed=1).run(10)
+        self.assertEqual((result.events, result.house), (0, 0))
+        self.assertRaises(ValueError, fl.Floor, roulette(1) * 2, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
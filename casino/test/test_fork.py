@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from .. import fork as fk
+from .. import simulation as sim
+from ..roulette import engine as en
+from ..roulette import players as ply
+from .test_simulation import roulette_simulator
+
+
+def continuations(simulator, snapshot, **kwargs):
+    sink = sim.ListSink()
+    fk.Fork(simulator.game, simulator.player, snapshot, sinks=[sink], **kwargs).run()
+    return sink.records
+
+
+class test_Fork(unittest.TestCase):
+
+    def test_replays_the_original_session(self):
+        simulator = roulette_simulator(ply.Martingale, initStake=1000, initDuration=250, seed=4)
+        stakes = simulator.session(4)
+        snapshot = fk.playTo(simulator, 4, rounds=120)
+        self.assertEqual((snapshot.played, snapshot.stake, snapshot.rounds),
+                         (120, stakes[119], 130))
+        simulator.player.setStake(0)
+        fork = fk.Fork(simulator.game, simulator.player, snapshot, samples=3, seed=None)
+        for index in range(3):
+            self.assertEqual(fork.session(index), stakes[120:])
+
+    def test_until(self):
+        simulator = roulette_simulator(ply.Martingale, initStake=10 ** 6, initDuration=10 ** 4,
+                                       seed=1)
+        snapshot = fk.playTo(simulator, 0, until=lambda player: player.lossCount == 6)
+        self.assertEqual(simulator.player.lossCount, 6)
+        simulator.player.reset()
+        records = continuations(simulator, snapshot, samples=200, seed=9)
+        self.assertEqual(len(records), 200)
+        self.assertGreater(len(set(records)), 100)
+        fork = fk.Fork(simulator.game, simulator.player, snapshot, seed=9)
+        # the next bet is 640
+        self.assertEqual({fork.session(index)[0] - snapshot.stake for index in range(50)},
+                         {-640, 640})
+        self.assertIsNone(fk.playTo(simulator, 0, until=lambda player: player.stake < 0))
+
+    def test_state_is_not_shared(self):
+        simulator = roulette_simulator(ply.Labouchere, initStake=1000, seed=2)
+        snapshot = fk.playTo(simulator, 0, rounds=15)
+        sequence = list(simulator.player.sequence)
+        first = continuations(simulator, snapshot, samples=50, seed=3)
+        self.assertEqual(snapshot.player[0]['sequence'], sequence)
+        self.assertEqual(continuations(simulator, snapshot, samples=50, seed=3), first)
+
+    def test_history(self):
+        simulator = roulette_simulator(ply.SleepingDozen, initStake=1000, seed=5)
+        snapshot = fk.playTo(simulator, 3, rounds=40)
+        history = simulator.game.wheel.history
+        recent, spins = history.recent(), history.spins
+        first = continuations(simulator, snapshot, samples=20)
+        self.assertEqual(continuations(simulator, snapshot, samples=20), first)
+        simulator.game.restore(snapshot.game)
+        self.assertEqual((history.recent(), history.spins), (recent, spins))
+
+    def test_compiled(self):
+        for player_class in (ply.Martingale, ply.Fibonacci, ply.SevenReds, ply.Passenger57):
+            simulator = roulette_simulator(player_class, initStake=500, seed=6)
+            snapshot = fk.playTo(simulator, 2, rounds=30)
+            self.assertEqual(continuations(simulator, snapshot, samples=100, seed=8,
+                                           executor=en.CompiledExecutor()),
+                             continuations(simulator, snapshot, samples=100, seed=8))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,26 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import collections
+import io
+import math
+import multiprocessing
+import os
+import random
+import tempfile
 import unittest
+from concurrent.futures import ProcessPoolExecutor
 
+from .. import simulation as sim
+from ..roulette import bias as bi
 from ..roulette import bin_builder as bb
 from ..roulette import board as bd
+from ..roulette import engine as en
+from ..roulette import exact as ex
 from ..roulette import players as ply
+from ..roulette import search as se
+from ..roulette import shared as sh
+from ..roulette import sizing as sz
 
 
 class test_Outcome_Class(unittest.TestCase):
@@ -250,6 +265,12 @@ class test_BinBuilder(unittest.TestCase):
         self.assertTrue(self.wheel[29] == ans)
         self.assertEqual(len(self.wheel[37]), 0)
 
+    def test_even_money_bets_cover_eighteen_bins(self):
+        bb.BinBuilder.buildBins(self.wheel)
+        for name in ('Red', 'Black', 'Even', 'Odd', 'Low', 'High'):
+            outcome = bd.Outcome(name, 1)
+            self.assertEqual(sum(outcome in bin for bin in self.wheel.bins), 18, name)
+
     def test_five_bet(self):
         bin_nums = (0, 1, 15, 16, 30, 37)
         bet = "_five_bet"
@@ -315,6 +336,33 @@ class test_Table(unittest.TestCase):
         self.table.clear()
         self.assertFalse(self.table.bets)
 
+    def test_rules(self):
+        wheel = bb.sharedWheel()
+        rules = bd.TableRules(wheel, spots={'inside': (1, 100), 'Straight': (1, 50),
+                                            'outside': (5, 500)},
+                              totals={'inside': 300, 'Dozen': 600})
+        straight, split = wheel.getOutcome('Straight 7').pop(), wheel.getOutcome('Split 7-8').pop()
+        black, dozen = wheel.getOutcome('Black').pop(), wheel.getOutcome('Dozen 1').pop()
+        self.assertTrue(rules.isValid([bd.Bet(50, straight), bd.Bet(100, split)]))
+        self.assertFalse(rules.isValid([bd.Bet(51, straight)]))
+        self.assertFalse(rules.isValid([bd.Bet(30, straight), bd.Bet(30, straight)]))
+        self.assertFalse(rules.isValid([bd.Bet(100, split)] * 2 + [bd.Bet(1, straight)]))
+        self.assertFalse(rules.isValid([bd.Bet(4, black)]))
+        self.assertFalse(rules.isValid([bd.Bet(5, bd.Outcome('foo', 10))]))
+        self.assertEqual(rules.bounds(straight), (1, 50))
+        self.assertEqual(rules.bounds(dozen), (5, 500))
+        self.assertEqual(rules.bounds(split), (1, 100))
+        self.assertEqual(bd.TableRules(wheel, totals={'inside': 80}).bounds(split), (0, 80))
+        self.assertEqual(bd.family(wheel.getOutcome('00-0-1-2-3').pop()), 'Five')
+        self.assertRaises(ValueError, bd.TableRules, wheel, {'Neighbours': (1, 10)})
+
+        table = bd.Table(1000, 5, rules=rules)
+        table.placeBet([bd.Bet(400, black), bd.Bet(10, straight)])
+        with self.assertRaises(bd.InvalidBet):
+            table.placeBet(bd.Bet(45, straight))
+        self.assertEqual(table.bounds(straight), (5, 50))
+        self.assertEqual(bd.Table(300, 5).bounds(straight), (5, 300))
+
     def tearDown(self):
         del self.bets, self.table
 
@@ -338,6 +386,28 @@ class test_Game(unittest.TestCase):
         for _ in range(10):
             self.game.cycle(self.player)
 
+    def test_round_shares_the_spin(self):
+        players = [ply.Passenger57(bd.Table(200, 5), self.wheel) for _ in range(3)]
+        players[2].setStake(0)  # sits the spin out
+        self.game.round(players)
+        self.assertEqual([player.stake for player in players], [1010, 1010, 0])
+        self.game.round(players)
+        self.assertEqual([player.stake for player in players], [1000, 1000, 0])
+
+    def test_outcomes_added_later(self):
+        lucky = bd.Outcome('Lucky', 35)
+
+        class Lucky(ply.Player):
+            def placeBets(self):
+                self._placeBets_helper([bd.Bet(10, lucky)])
+
+        player = Lucky(self.table, self.wheel)
+        self.game.cycle(player)  # lands on 8; the outcome is on no bin
+        self.assertEqual(player.stake, 990)
+        self.wheel.addOutcome(36, lucky)
+        self.game.cycle(player)  # lands on 36
+        self.assertEqual(player.stake, 990 + 350)
+
     def test_Passenger57(self):
         """integration test for :class:`Passenger57`"""
         self.player = ply.Passenger57(self.table, self.wheel)
@@ -357,5 +427,604 @@ class test_Game(unittest.TestCase):
             self.assertEqual(self.player.stake, expected_stake[i])
 
 
+class test_Progressions(unittest.TestCase):
+
+    def setUp(self):
+        self.wheel = bb.sharedWheel()
+        self.table = bd.Table(1000, 5)
+        self.black = self.wheel.getOutcome('Black').pop()
+
+    def bets(self, player_class, results):
+        """Bets of a player along a run of wins (True) and losses (False)."""
+        player = player_class(self.table, self.wheel)
+        player.setStake(10 ** 6)
+        bets = []
+        for won in results:
+            bets.append(player.amount() // player.base)
+            player.placeBets()
+            if won:
+                player.win(player.table.bets[0])
+            else:
+                player.lose()
+        return bets
+
+    def test_level_progressions(self):
+        W, L = True, False
+        run = [L, L, W, W, W, W, L, W]
+        self.assertEqual(self.bets(ply.Martingale, run), [1, 2, 4, 1, 1, 1, 1, 2])
+        self.assertEqual(self.bets(ply.Paroli, run), [1, 1, 1, 2, 4, 1, 2, 1])
+        self.assertEqual(self.bets(ply.Player1326, run), [1, 1, 1, 3, 2, 6, 1, 1])
+        self.assertEqual(self.bets(ply.Fibonacci, run), [1, 1, 2, 1, 1, 1, 1, 1])
+        self.assertEqual(self.bets(ply.DAlembert, run), [1, 2, 3, 2, 1, 1, 1, 2])
+        self.assertEqual(self.bets(ply.Labouchere, run), [5, 6, 7, 7, 7, 5, 5, 7])
+
+    def test_tables_are_shared(self):
+        first = ply.Fibonacci(self.table, self.wheel)
+        second = ply.Fibonacci(self.table, self.wheel)
+        self.assertIs(first.units, second.units)
+        self.assertEqual(first.units[:8], (1, 1, 2, 3, 5, 8, 13, 21))
+        martingale = ply.Martingale(self.table, self.wheel)
+        martingale.lossCount = 5
+        self.assertEqual(martingale.betMultiple, 32)
+        self.assertEqual(martingale.onLose[-1], len(martingale.units) - 1)
+
+    def test_stops_when_bet_is_too_big(self):
+        player = ply.DAlembert(self.table, self.wheel)
+        player.setStake(25)
+        self.assertTrue(player.playing())
+        player.level = 2
+        self.assertFalse(player.playing())
+
+    def test_seven_reds_waits(self):
+        player = ply.SevenReds(self.table, self.wheel)
+        game = ply.Game(self.table, self.wheel)
+        red = next(bin for bin in self.wheel.bins if player.red in bin)
+        green = self.wheel.bins[0]
+        stake = player.stake
+        for _ in range(7):
+            self.assertEqual(player.amount(), 0)
+            player.placeBets()
+            game.resolve(player, red)
+        self.assertEqual(player.stake, stake)
+        self.assertEqual(player.amount(), 10)
+        player.placeBets()
+        game.resolve(player, green)  # lost, and the count starts over
+        self.assertEqual((player.stake, player.redCount, player.lossCount), (stake - 10, 7, 1))
+
+    def test_registered(self):
+        self.assertTrue({'Paroli', 'Fibonacci', 'Labouchere', 'DAlembert', 'Player1326',
+                         'SevenReds', 'Martingale'} <= set(ply.playerClasses()))
+        self.assertNotIn('Progression', ply.playerClasses())
+
+
+class test_Layout(unittest.TestCase):
+
+    def setUp(self):
+        self.wheel = bb.sharedWheel()
+        self.cache = bd.LayoutCache(self.wheel, size=2)
+
+    def outcome(self, name):
+        return next(oc for oc in self.wheel.all_outcomes if oc.name == name)
+
+    def test_single_bet(self):
+        layout = self.cache.compile([bd.Bet(10, self.outcome('Black'))])
+        self.assertEqual(sorted(set(layout.net)), [-10, 10])
+        self.assertAlmostEqual(layout.mean, -10 * 2 / 38)
+        self.assertAlmostEqual(layout.variance, 100 - (10 * 2 / 38) ** 2)
+        self.assertEqual(list(self.cache.row(self.outcome('Black'))),
+                         [int(hit) for hit, in layout.hits])
+
+    def test_matches_settling_each_bet(self):
+        rng = random.Random(2)
+        outcomes = sorted(self.wheel.all_outcomes, key=lambda oc: oc.name)
+        for _ in range(20):
+            bets = [bd.Bet(rng.randrange(5, 50), rng.choice(outcomes)) for _ in range(4)]
+            layout = bd.Table(1000, 5, bets).layout(self.cache)
+            for number, bin in enumerate(self.wheel.bins):
+                won = sum(bet.winAmount() for bet in bets if bet.outcome in bin)
+                self.assertEqual(layout.net[number], won - sum(bet.amount for bet in bets))
+            expected = sum(bet.amount * (len([b for b in self.wheel.bins if bet.outcome in b])
+                                         * (bet.outcome.odds + 1) / 38 - 1) for bet in bets)
+            self.assertAlmostEqual(layout.mean, expected)
+
+    def test_cache(self):
+        black, red, even = (self.outcome(name) for name in ('Black', 'Red', 'Even'))
+        first = self.cache.compile([bd.Bet(10, black)])
+        self.assertIs(self.cache.compile([bd.Bet(10, black)]), first)
+        self.assertIsNot(self.cache.compile([bd.Bet(20, black)]), first)
+        self.cache.compile([bd.Bet(10, red)])
+        self.cache.compile([bd.Bet(10, even)])  # evicts the oldest
+        self.assertIsNot(self.cache.compile([bd.Bet(10, black)]), first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 5))
+
+    def test_spin_matches_next(self):
+        self.wheel.rng.seed(8)
+        bins = [self.wheel.next() for _ in range(50)]
+        self.wheel.rng.seed(8)
+        self.assertEqual([self.wheel.bins[self.wheel.spin()] for _ in range(50)], bins)
+
+
+class test_ExactSessions(unittest.TestCase):
+
+    def simulator(self, player_class=ply.Passenger57, minimum=5, **kwargs):
+        wheel = bb.sharedWheel()
+        table = bd.Table(1000, minimum)
+        return ply.Simulator(ply.Game(table, wheel), player_class(table, wheel), **kwargs)
+
+    def test_one_round(self):
+        exact = ex.ExactSessions.fromSimulator(self.simulator(initStake=10, initDuration=1))
+        self.assertEqual(exact.maxima.values, [0, 20])
+        self.assertAlmostEqual(exact.maxima.probabilities[0], 20 / 38)
+        self.assertAlmostEqual(exact.ruin[1], 20 / 38)
+        self.assertEqual(exact.durations.values, [1])
+        self.assertEqual(exact.maxima.quantile(0.5), 0)
+        self.assertAlmostEqual(exact.maxima.atLeast(20), 18 / 38)
+        self.assertEqual(exact.maxima.atLeast(21), 0.0)
+
+    def test_matches_simulation(self):
+        simulator = self.simulator(initStake=50, initDuration=40, samples=4000, seed=6)
+        exact = ex.ExactSessions.fromSimulator(simulator)
+        for distribution in (exact.durations, exact.maxima, exact.finals):
+            self.assertAlmostEqual(sum(distribution.probabilities), 1.0)
+        result = simulator.run()
+        for name in ('duration', 'maximum', 'final'):
+            low, high = result.interval(name, confidence=0.999)
+            distribution = {'duration': exact.durations, 'maximum': exact.maxima,
+                            'final': exact.finals}[name]
+            self.assertTrue(low <= distribution.mean <= high, name)
+        ruined = sum(1 for record in simulator.records(0, 4000) if record[3] <= 0) / 4000
+        self.assertAlmostEqual(ruined, exact.ruin[-1], delta=0.03)
+        self.assertEqual(exact.ruin, sorted(exact.ruin))
+
+    def test_nothing_to_play(self):
+        exact = ex.ExactSessions.fromSimulator(self.simulator(initStake=0))
+        self.assertEqual((exact.durations.mean, exact.maxima.mean), (0, 0))
+        self.assertEqual(exact.ruin, [1.0] * 251)
+
+    def test_not_flat(self):
+        self.assertRaises(ValueError, ex.ExactSessions.fromSimulator,
+                          self.simulator(ply.Martingale))
+        self.assertRaises(ValueError, ex.ExactSessions.fromSimulator,
+                          self.simulator(minimum=20))
+
+
+class test_SpinHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.wheel = bd.Wheel()
+        bb.BinBuilder.buildBins(self.wheel)
+
+    def test_matches_rescan(self):
+        size = 10
+        history = bd.SpinHistory(self.wheel, size=size)
+        rng = random.Random(4)
+        spins = []
+        outcomes = sorted(self.wheel.all_outcomes, key=lambda oc: oc.name)
+        for _ in range(120):
+            number = rng.choice([0, 1, 3, 5, rng.randrange(38)])  # some long streaks
+            history.record(number)
+            spins.append(number)
+            window = spins[-size:]
+            self.assertEqual(history.recent(), window)
+            for outcome in outcomes:
+                hits = [outcome in self.wheel.bins[spin] for spin in spins]
+                self.assertEqual(history.count(outcome), sum(hits[-size:]))
+                streak = len(hits) - max((i + 1 for i, hit in enumerate(hits) if not hit),
+                                         default=0)
+                self.assertEqual(history.streak(outcome), streak)
+                absence = len(hits) - max((i + 1 for i, hit in enumerate(hits) if hit),
+                                          default=0)
+                self.assertEqual(history.absence(outcome), absence)
+
+    def test_tracking_keeps_spins(self):
+        self.wheel.rng.seed(5)
+        plain = [self.wheel.next() for _ in range(50)]
+        history = self.wheel.track(size=20)
+        self.assertIs(self.wheel.track(size=10), history)
+        self.wheel.rng.seed(5)
+        tracked = [self.wheel.next() for _ in range(50)]
+        self.assertEqual(plain, tracked)
+        self.assertEqual([self.wheel.bins[number] for number in history.recent()], tracked[-20:])
+        self.assertRaises(ValueError, bd.SpinHistory, self.wheel, 0)
+
+    def test_players_asking_for_more_spins(self):
+        class LongMemory(ply.SleepingDozen):
+            def __init__(self, table, wheel):
+                super(LongMemory, self).__init__(table, wheel)
+                self.history = wheel.track(size=100)
+
+        table = bd.Table(1000, 5)
+        self.wheel.rng.seed(8)
+        dozen = ply.SleepingDozen(table, self.wheel)
+        spins = [self.wheel.spin() for _ in range(80)]
+        longer = LongMemory(table, self.wheel)
+        self.assertIs(dozen.history, longer.history)
+        self.assertIs(dozen.history, self.wheel.history)
+        history = self.wheel.history
+        self.assertEqual((history.size, history.recent()), (100, spins[-64:]))
+        spins += [self.wheel.spin() for _ in range(50)]
+        self.assertEqual(history.recent(), spins[-100:])
+        for outcome in self.wheel.all_outcomes:
+            self.assertEqual(history.count(outcome),
+                             sum(outcome in self.wheel.bins[spin] for spin in spins[-100:]))
+            self.assertEqual(history.absence(outcome), len(spins) - max(
+                (i + 1 for i, spin in enumerate(spins) if outcome in self.wheel.bins[spin]),
+                default=0))
+        state = history.getstate()
+        history.clear()
+        history.setstate(state)
+        self.assertEqual(history.recent(), spins[-100:])
+
+    def test_history_player_sessions(self):
+        table = bd.Table(1000, 5)
+        player = ply.SleepingDozen(table, self.wheel)
+        simulator = ply.Simulator(ply.Game(table, self.wheel), player, samples=20, seed=3)
+        whole = simulator.records(0, 20)
+        self.assertEqual(simulator.records(7, 8), whole[7:8])  # reset between sessions
+        self.assertTrue(any(record[3] != 100 for record in whole))
+        self.assertEqual(len(self.simulate_compiled(simulator)), 20)
+
+    def simulate_compiled(self, simulator):
+        sink = sim.ListSink()
+        simulator.executor, simulator.sinks = en.CompiledExecutor(), [sink]
+        simulator.run()
+        return sink.records
+
+
+class test_Engine(unittest.TestCase):
+
+    def simulate(self, player_class, executor=None, limit=1000, minimum=5, **kwargs):
+        wheel = bb.sharedWheel()
+        table = bd.Table(limit, minimum)
+        sink = sim.ListSink()
+        ply.Simulator(ply.Game(table, wheel), player_class(table, wheel), samples=200,
+                      executor=executor, sinks=[sink], **kwargs).run()
+        return sink.records
+
+    def test_matches_reference(self):
+        for player_class in (ply.Passenger57, ply.Martingale, ply.Paroli, ply.Player1326,
+                             ply.Fibonacci, ply.DAlembert, ply.SevenReds):
+            for stake in (5, 100, 1000):
+                self.assertEqual(
+                    self.simulate(player_class, en.CompiledExecutor(), seed=2, initStake=stake),
+                    self.simulate(player_class, seed=2, initStake=stake))
+
+    def test_spins_drawn_up_front(self):
+        wheel = bb.sharedWheel()
+        payouts = en.WheelTables(wheel).row(wheel.getOutcome('Black').pop())
+        program = en.compilePlayer(ply.Martingale(bd.Table(1000, 5), wheel))
+        kinds = [1 if payout else 0 for payout in payouts]
+        for seed in range(20):
+            rng = random.Random(seed)
+            spins = [rng.randrange(38) for _ in range(250)]
+            rng.seed(seed)
+            arguments = (payouts, kinds, program.units, program.moves, program.width,
+                         1000, 250, 10, 1, True, 5, 1000)
+            self.assertEqual(en.playSpins(spins, *arguments),
+                             en.playSession(lambda: rng.randrange(38), *arguments))
+
+    def test_falls_back_to_reference(self):
+        class Doubler(ply.Martingale):
+            pass
+
+        self.assertIsNone(en.compilePlayer(Doubler(bd.Table(1000, 5), bb.sharedWheel())))
+        self.assertEqual(len(self.simulate(Doubler, en.CompiledExecutor())), 200)
+        self.assertEqual(len(self.simulate(ply.Martingale, en.CompiledExecutor())), 200)
+
+    def test_labouchere_is_not_compiled(self):
+        self.assertIsNone(en.compilePlayer(ply.Labouchere(bd.Table(1000, 5), bb.sharedWheel())))
+        self.assertEqual(self.simulate(ply.Labouchere, en.CompiledExecutor(), seed=2),
+                         self.simulate(ply.Labouchere, seed=2))
+
+    def test_invalid_bet(self):
+        with self.assertRaises(bd.InvalidBet):
+            self.simulate(ply.Passenger57, en.CompiledExecutor(), minimum=20, seed=1)
+
+    def test_table_rules(self):
+        wheel = bb.sharedWheel()
+        rules = bd.TableRules(wheel, spots={'outside': (10, 160)})
+        for executor in (None, en.CompiledExecutor()):
+            table = bd.Table(1000, 5, rules=rules)
+            game = ply.Game(table, wheel)
+            sink = sim.ListSink()
+            simulator = ply.Simulator(game, ply.Martingale(table, wheel), samples=200,
+                                      initStake=1000, seed=2, executor=executor, sinks=[sink])
+            simulator.run()
+            records = sink.records
+            if executor is None:
+                reference = records
+            self.assertIn(repr(rules), game.fingerprint())
+        self.assertEqual(records, reference)
+        # as if the whole table had the outside limits
+        self.assertEqual(records, self.simulate(ply.Martingale, limit=160, minimum=10, seed=2,
+                                                initStake=1000))
+        with self.assertRaises(bd.InvalidBet):
+            self.simulate(ply.Passenger57, en.CompiledExecutor(), minimum=20, seed=1)
+
+
+def _sharedOdds(name):
+    arrays = sh.attachWheel(name)
+    return [(arrays.outcomeName(number), arrays.odds[number]) for number in arrays.binOutcomes(1)]
+
+
+def _workerTables(outcome):
+    wheel = bb.sharedWheel()
+    tables = en.CompiledExecutor()._tables(wheel)
+    return (type(tables).__name__, bb.sharedArrays(wheel) is not None,
+            tables.row(bd.Outcome(outcome, 1)))
+
+
+class test_SharedWheel(unittest.TestCase):
+
+    def test_round_trip(self):
+        wheel = bb.sharedWheel()
+        arrays = sh.WheelArrays(sh.WheelArrays.pack(wheel))
+        self.assertEqual(len(arrays), len(wheel.all_outcomes))
+        rebuilt = arrays.wheel()
+        self.assertEqual([set(bin) for bin in rebuilt.bins], [set(bin) for bin in wheel.bins])
+        self.assertEqual({(o.name, o.odds) for o in rebuilt.all_outcomes},
+                         {(o.name, o.odds) for o in wheel.all_outcomes})
+        arrays.release()
+
+    def test_engine_tables(self):
+        wheel = bb.sharedWheel()
+        tables = en.WheelTables(wheel)
+        shared = en.WheelTables.fromArrays(sh.WheelArrays(sh.WheelArrays.pack(wheel)))
+        self.assertEqual(shared.outcomes, tables.outcomes)
+        self.assertEqual(shared.payouts, tables.payouts)
+
+    def test_find(self):
+        arrays = sh.WheelArrays(sh.WheelArrays.pack(bb.sharedWheel()))
+        for number in range(len(arrays)):
+            self.assertEqual(arrays.find(arrays.outcomeName(number)), number)
+        self.assertRaises(KeyError, arrays.find, 'Green')
+        arrays.release()
+
+    def test_pools_read_the_shared_wheel(self):
+        black = bb.sharedWheel().getOutcome('Black').pop()
+        expected = en.WheelTables(bb.sharedWheel()).row(black)
+        with sh.sharedPool(1) as pool:
+            name, attached, row = pool.submit(_workerTables, black.name).result()
+        self.assertEqual((name, attached, row), ('ArrayTables', True, expected))
+        self.assertIsNone(bb.sharedArrays(bb.sharedWheel()))
+
+    def test_not_a_wheel(self):
+        self.assertRaises(ValueError, sh.WheelArrays, bytes(64))
+
+    def test_workers_attach(self):
+        wheel = bb.sharedWheel()
+        shared = sh.SharedWheel.create(wheel)
+        try:
+            expected = sorted((o.name, o.odds) for o in wheel.bins[1])
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(2, mp_context=context, initializer=sh.attachWheel,
+                                     initargs=(shared.name,)) as pool:
+                for odds in pool.map(_sharedOdds, [shared.name] * 4):
+                    self.assertEqual(sorted(odds), expected)
+            attached = sh.SharedWheel.attach(shared.name)  # still there after the workers left
+            self.assertEqual(attached.outcomeName(attached.binOutcomes(1)[0]), expected[0][0])
+            attached.close()
+        finally:
+            shared.unlink()
+
+
+class test_Search(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = se.Evaluator('final', stake=1000, samples=100, seed=2)
+
+    def test_matches_compiled_player(self):
+        wheel = bb.sharedWheel()
+        table = bd.Table(1000, 5)
+        sink = sim.ListSink()
+        ply.Simulator(ply.Game(table, wheel), ply.Martingale(table, wheel), initStake=1000,
+                      samples=100, seed=2, executor=en.CompiledExecutor(), sinks=[sink]).run()
+        genome = se.Genome('Martingale', 10, [('Black', 1)])
+        self.assertEqual(self.evaluator.records(genome), sink.records)
+
+    def test_portfolio(self):
+        genome = se.Genome('Flat', 5, [('Red', 1), ('Black', 1)])
+        payouts, kinds, units, moves, width = genome.tables(self.evaluator.tables)
+        self.assertEqual(sorted(set(payouts)), [0, 2])
+        self.assertEqual(set(kinds), {0})  # getting the stake back is no win
+        for session, duration, maximum, final in self.evaluator.records(genome):
+            self.assertLessEqual(maximum, 1000)
+            self.assertEqual((1000 - final) % 10, 0)
+
+    def test_levels_capped(self):
+        genome = se.Genome('Martingale', 10, [('Black', 1)], levels=3)
+        _, _, units, moves, _ = genome.tables(self.evaluator.tables)
+        self.assertEqual(units, [1, 2, 4])
+        self.assertEqual(moves, [1, 0, 2, 0, 2, 0])  # a loss at the top stays there
+        paroli = se.Genome('Paroli', 10, [('Black', 1)], levels=2)
+        self.assertEqual(paroli.tables(self.evaluator.tables)[3], [0, 1, 0, 0])
+        self.assertEqual(se.Genome('Flat', 10, [('Black', 1)], levels=9).levels, 1)
+        self.assertEqual(self.evaluator.score(se.Genome('Flat', 1, [('Black', 1)])),
+                         float('-inf'))  # under the table minimum
+
+    def test_search(self):
+        search = se.Search(self.evaluator, population=16, generations=3, workers=0, seed=4)
+        ranking = search.run()
+        self.assertEqual([value for value, _ in ranking],
+                         sorted((value for value, _ in ranking), reverse=True))
+        self.assertGreater(search.hits, 0)  # the elite are not scored again
+        self.assertEqual(search.misses, len(search.cache))
+        for value, genome in ranking:
+            self.assertEqual(self.evaluator.score(genome), value)
+            self.assertLessEqual(len(genome.bets), se.MAX_BETS)
+            self.assertTrue(5 <= genome.base * genome.size <= 1000)
+        again = se.Search(self.evaluator, population=16, generations=3, workers=0, seed=4)
+        self.assertEqual(again.run(), ranking)
+
+    def test_bad_settings(self):
+        self.assertRaises(ValueError, se.Evaluator, 'luck')
+        self.assertRaises(ValueError, se.Genome, 'Doubler', 10, [('Black', 1)])
+        self.assertRaises(ValueError, se.Genome, 'Flat', 10, [])
+        self.assertRaises(ValueError, se.Search, self.evaluator, outcomes=['Purple'])
+
+
+class test_Sizing(unittest.TestCase):
+
+    def setUp(self):
+        self.wheel = bb.sharedWheel()
+        self.table = bd.Table(1000, 5)
+        self.weights = [3.0 if number == 17 else 1.0 for number in range(38)]
+
+    def test_fair_wheel_bets_nothing(self):
+        sizing = sz.sizing(self.wheel, self.table, ['Black', 'Straight 5', 'Dozen 12'])
+        self.assertEqual(sizing.fractions, [0.0, 0.0, 0.0])
+        self.assertEqual(sizing.bets(1000), [])
+        player = ply.KellyPlayer(self.table, self.wheel)
+        simulator = ply.Simulator(ply.Game(self.table, self.wheel), player, seed=1)
+        self.assertEqual(simulator.session(0), [])
+
+    def test_kelly_fraction(self):
+        sizing = sz.sizing(self.wheel, self.table, ['Straight 17', 'Red'], self.weights)
+        p = 3 / 40
+        self.assertAlmostEqual(sizing.fractions[0], (35 * p - (1 - p)) / 35, places=6)
+        self.assertEqual(sizing.fractions[1], 0.0)
+        self.assertIs(sz.sizing(self.wheel, self.table, ['Straight 17', 'Red'], self.weights),
+                      sizing)
+
+    def test_drawdown(self):
+        names = ['Straight 17', 'Split 17-20', 'Black']
+        kelly = sz.sizing(self.wheel, self.table, names, self.weights)
+        safe = sz.sizing(self.wheel, self.table, names, self.weights, drawdown=(0.7, 0.1))
+        power = math.log(0.1) / math.log(0.7)
+        matrix = sz.payoutMatrix(self.wheel, safe.outcomes)
+        probabilities = [weight / sum(self.weights) for weight in self.weights]
+        self.assertGreater(sz._bound(matrix, probabilities, kelly.fractions, power), 1.0)
+        self.assertLessEqual(sz._bound(matrix, probabilities, safe.fractions, power), 1.0)
+        self.assertLess(safe.total, kelly.total)
+        self.assertLess(safe.growth, kelly.growth)
+        self.assertGreater(safe.growth, 0.0)
+
+    def test_amounts(self):
+        sizing = sz.Sizing(['a', 'b'], [0.2, 0.05], 0.0, 5, 1000)
+        self.assertEqual(sizing.amounts(100), [20, 5])
+        self.assertEqual(sizing.amounts(10000), [800, 200])  # scaled to the limit
+        self.assertEqual(sizing.amounts(10), [0, 0])  # under the minimum
+
+    def test_table_rules(self):
+        names = ['Straight 17', 'Straight 20', 'Black']
+        weights = [3.0 if number in (17, 20) else 1.0 for number in range(38)]
+        rules = bd.TableRules(self.wheel, spots={'inside': (6, 50)}, totals={'inside': 60})
+        table = bd.Table(1000, 5, rules=rules)
+        plain = sz.sizing(self.wheel, self.table, names, weights)
+        sizing = sz.sizing(self.wheel, table, names, weights)
+        self.assertIsNot(sizing, plain)
+        self.assertEqual(sizing.fractions, plain.fractions)
+        for stake in (300, 3000):
+            table.bets = sizing.bets(stake)
+            table.isValid()
+        self.assertEqual(sizing.amounts(300), [13, 13, 0])
+        self.assertEqual(sum(sizing.amounts(3000)), 59)  # the inside total, rounded down
+        self.assertEqual(sizing.amounts(100), [0, 0, 0])  # spots of 4 are under 6
+        self.assertRaises(bd.InvalidBet, table.placeBet, plain.bets(3000))
+
+    def test_player(self):
+        class Biased(ply.KellyPlayer):
+            outcomes = ('Straight 17',)
+            weights = tuple(self.weights)
+
+        player = Biased(self.table, self.wheel)
+        player.setStake(1000)
+        player.placeBets()
+        self.assertEqual([(bet.amount, bet.outcome.name) for bet in player.table.bets],
+                         [(48, 'Straight 17')])
+        self.assertEqual(player.stake, 952)
+        simulator = ply.Simulator(ply.Game(self.table, self.wheel), player, seed=1)
+        self.assertEqual(simulator.session(0), [])  # 4.8% of 100 is under the minimum
+        simulator.initStake = 1000
+        self.assertTrue(simulator.session(0))
+
+    def test_bad_settings(self):
+        self.assertRaises(ValueError, sz.sizing, self.wheel, self.table, ['Purple'])
+        self.assertRaises(ValueError, sz.sizing, self.wheel, self.table, ['Black'], [1.0] * 37)
+        self.assertRaises(ValueError, sz.sizing, self.wheel, self.table, ['Straight 17'],
+                          self.weights, (1.5, 0.1))
+
+
+class test_BiasMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.wheel = bb.sharedWheel()
+        rng = random.Random(1)
+        self.fair = bytes(rng.randrange(38) for _ in range(50000))
+        weights = [1.3 if number == 17 else 1.0 for number in range(38)]
+        self.biased = bytes(rng.choices(range(38), weights, k=50000))
+
+    def chunks(self, spins, size):
+        return (spins[low:low + size] for low in range(0, len(spins), size))
+
+    def test_readers(self):
+        text = 'spin,table\n5,a\n00,a\n0,b\n36,b\n'
+        self.assertEqual(b''.join(bi.readCSV(io.StringIO(text), chunkSize=3)),
+                         bytes([5, 37, 0, 36]))
+        self.assertEqual([len(chunk) for chunk in bi.readCSV(io.StringIO(text), chunkSize=3)],
+                         [3, 1])
+        self.assertRaises(ValueError, list, bi.readCSV(io.StringIO('5\n37\n')))
+        self.assertEqual(b''.join(bi.readCSV(io.StringIO('t,00\n'), column=1)), bytes([37]))
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'spins.bin')
+            with open(path, 'wb') as handle:
+                handle.write(self.fair)
+            self.assertEqual(b''.join(bi.readSpins(path, 4096)), self.fair)
+            with open(path, 'ab') as handle:
+                handle.write(bytes([38]))
+            self.assertRaises(ValueError, list, bi.readSpins(path))
+        finally:
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
+    def test_counts(self):
+        for size in (1, 999, 1000, 4096, 60000):
+            monitor = bi.BiasMonitor(self.wheel, window=1000).ingest(self.chunks(self.fair, size))
+            self.assertEqual(monitor.spins, len(self.fair))
+            tally = collections.Counter(self.fair)
+            self.assertEqual(monitor.counts, [tally[number] for number in range(38)])
+            tally = collections.Counter(self.fair[-1000:])
+            self.assertEqual(monitor.recent, [tally[number] for number in range(38)])
+        for outcome in self.wheel.all_outcomes:
+            self.assertEqual(monitor.outcomeCounts[outcome.name],
+                             sum(monitor.counts[number] for number in range(38)
+                                 if outcome in self.wheel.bins[number]))
+
+    def test_sectors(self):
+        monitor = bi.BiasMonitor(self.wheel, sector=3).ingest([bytes([0, 28, 9, 9, 2])])
+        sectors = monitor.sectors()
+        self.assertEqual(len(sectors), 38)
+        self.assertEqual(sectors[0], ((0, 28, 9), 4))
+        self.assertIn(((2, 0, 28), 3), sectors)
+        self.assertEqual(sorted(bi.WHEEL_ORDER), list(range(38)))
+
+    def test_tests(self):
+        self.assertAlmostEqual(bi.chiSquareSurvival(37, 37), 0.4691, places=4)
+        self.assertAlmostEqual(bi.chiSquareSurvival(60, 37), 0.00976, places=5)
+        fair = bi.BiasMonitor(self.wheel, window=10000).ingest(self.chunks(self.fair, 4096))
+        self.assertGreater(fair.chiSquare()[1], 0.01)
+        self.assertEqual(fair.alarms, {})
+        biased = bi.BiasMonitor(self.wheel, window=10000).ingest(self.chunks(self.biased, 4096))
+        self.assertLess(biased.chiSquare()[1], 1e-6)
+        self.assertEqual(list(biased.alarms), [17])
+        self.assertIn(17, biased.sectors()[0][0])
+        self.assertTrue(any('bin 17 biased' in line for line in biased.report()))
+
+    def test_biased_wheel(self):
+        monitor = bi.BiasMonitor(self.wheel).ingest([self.biased])
+        wheel = monitor.biasedWheel(seed=3)
+        spins = [wheel.spin() for _ in range(20000)]
+        wheel.rng.seed(3)
+        self.assertEqual([wheel.spin() for _ in range(100)], spins[:100])
+        self.assertGreater(spins.count(17), 1.15 * 20000 / 38)
+        self.assertRaises(ValueError, bi.BiasMonitor(self.wheel).biasedWheel, 0)
+
+    def test_bad_settings(self):
+        self.assertRaises(ValueError, bi.BiasMonitor, self.wheel, window=0)
+        self.assertRaises(ValueError, bi.BiasMonitor, self.wheel, alpha=1.5)
+
+
 if __name__ == '__main__':
     unittest.main()
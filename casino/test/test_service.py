@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import unittest
+
+from .. import service as svc
+
+
+async def request(address, method, path, payload=None):
+    reader, writer = await asyncio.open_connection(*address)
+    body = b'' if payload is None else json.dumps(payload).encode()
+    writer.write(b'%s %s HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n'
+                 % (method.encode(), path.encode(), len(body)) + body)
+    status = int((await reader.readline()).split()[1])
+    while (await reader.readline()).strip():
+        pass
+    lines = [json.loads(line) for line in (await reader.read()).splitlines()]
+    writer.close()
+    if path.endswith('/events'):
+        return status, lines
+    return status, lines[0]
+
+
+class test_SimulationService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.service = svc.SimulationService(workers=1, queueSize=1, concurrency=1,
+                                             batchSize=10, limits=svc.Limits(samples=10 ** 6))
+        self.address = await self.service.start()
+
+    async def asyncTearDown(self):
+        await self.service.stop()
+
+    async def test_job_streams_progress(self):
+        status, job = await request(self.address, 'POST', '/jobs',
+                                    {'player': 'Martingale', 'samples': 30, 'seed': 1})
+        self.assertEqual(status, 202)
+        status, events = await request(self.address, 'GET', '/jobs/%d/events' % job['id'])
+        self.assertEqual(status, 200)
+        self.assertEqual(events[-1]['status'], svc.DONE)
+        self.assertEqual(events[-1]['completed'], 30)
+        completed = [event['completed'] for event in events]
+        self.assertEqual(completed, sorted(completed))
+        status, final = await request(self.address, 'GET', '/jobs/%d' % job['id'])
+        self.assertEqual(final['result'], events[-1]['result'])
+
+    async def test_backpressure_and_cancel(self):
+        big = {'player': 'Passenger57', 'samples': 10 ** 6, 'duration': 250}
+        status, running = await request(self.address, 'POST', '/jobs', big)
+        self.assertEqual(status, 202)
+        await asyncio.sleep(0.1)  # let the runner take the first job off the queue
+        status, queued = await request(self.address, 'POST', '/jobs', big)
+        self.assertEqual(status, 202)
+        status, refused = await request(self.address, 'POST', '/jobs', big)
+        self.assertEqual(status, 503)
+        for job in (queued, running):
+            status, cancelled = await request(self.address, 'DELETE', '/jobs/%d' % job['id'])
+            self.assertEqual(cancelled['status'], svc.CANCELLED)
+
+    async def test_rejects_bad_jobs(self):
+        status, _ = await request(self.address, 'POST', '/jobs', {'player': 'Nobody'})
+        self.assertEqual(status, 400)
+        status, _ = await request(self.address, 'POST', '/jobs', {'samples': 10 ** 7})
+        self.assertEqual(status, 413)
+        status, _ = await request(self.address, 'GET', '/jobs/99')
+        self.assertEqual(status, 404)
+        for bad in ({'seed': 'x'}, {'seed': 1.5}, {'seed': True}, {'samples': True},
+                    {'stake': False}, {'duration': 2.5}):
+            status, _ = await request(self.address, 'POST', '/jobs', bad)
+            self.assertEqual(status, 400, bad)
+
+    async def test_finished_jobs_expire(self):
+        self.service.history = 1
+        ids = []
+        for seed in (1, 2):
+            status, job = await request(self.address, 'POST', '/jobs',
+                                        {'samples': 5, 'duration': 10, 'seed': seed})
+            ids.append(job['id'])
+            await request(self.address, 'GET', '/jobs/%d/events' % job['id'])
+        self.service.prune()
+        status, _ = await request(self.address, 'GET', '/jobs/%d' % ids[0])
+        self.assertEqual(status, 404)
+        status, _ = await request(self.address, 'GET', '/jobs/%d' % ids[1])
+        self.assertEqual(status, 200)
+        self.service.ttl = 0
+        self.service.prune()
+        self.assertEqual(self.service.jobs, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import unittest
+
+from .. import simulation as sim
+from ..blackjack import board as bj_bd
+from ..blackjack import players as bj_ply
+from ..roulette import bin_builder as bb
+from ..roulette import board as bd
+from ..roulette import players as ply
+
+
+def roulette_simulator(player_class=ply.Martingale, **kwargs):
+    wheel = bd.Wheel()
+    bb.BinBuilder.buildBins(wheel)
+    table = bd.Table(1000, 5)
+    game = ply.Game(table, wheel)
+    return ply.Simulator(game, player_class(table, wheel), **kwargs)
+
+
+class test_RunningStats(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1)
+        self.values = [rng.gauss(10, 3) for _ in range(500)]
+
+    def test_matches_statistics(self):
+        stats = sim.RunningStats()
+        for value in self.values:
+            stats.add(value)
+        self.assertAlmostEqual(stats.mean, statistics.mean(self.values))
+        self.assertAlmostEqual(stats.stdev, statistics.stdev(self.values))
+        self.assertEqual(stats.maximum, max(self.values))
+
+    def test_merge(self):
+        left, right, whole = sim.RunningStats(), sim.RunningStats(), sim.RunningStats()
+        for i, value in enumerate(self.values):
+            (left if i < 123 else right).add(value)
+            whole.add(value)
+        left.merge(right)
+        self.assertEqual(left.count, whole.count)
+        self.assertAlmostEqual(left.mean, whole.mean)
+        self.assertAlmostEqual(left.variance, whole.variance)
+
+
+class test_Simulator(unittest.TestCase):
+
+    def test_session_terminates(self):
+        simulator = roulette_simulator(initDuration=30, seed=5)
+        stakes = simulator.session(0)
+        self.assertLessEqual(len(stakes), 30)
+        self.assertEqual(simulator.player.roundsToGo, 30 - len(stakes))
+
+    def test_gather(self):
+        simulator = roulette_simulator(seed=1, samples=20)
+        (duration, duration_sd), (maximum, maximum_sd) = simulator.gather()
+        self.assertEqual(simulator.result.samples, 20)
+        self.assertGreater(duration, 0)
+        self.assertGreaterEqual(maximum, simulator.initStake)
+
+    def test_seeded_sessions_repeat(self):
+        simulator = roulette_simulator(seed=3)
+        self.assertEqual(simulator.session(7), simulator.session(7))
+        self.assertNotEqual(simulator.session(7), simulator.session(8))
+
+    def test_batch_executor_matches_scalar(self):
+        scalar = roulette_simulator(seed=2, samples=40)
+        scalar_sink = sim.ListSink()
+        scalar.sinks.append(scalar_sink)
+        scalar.run()
+        batch = roulette_simulator(seed=2, samples=40,
+                                   executor=sim.BatchExecutor(workers=2, batchSize=7))
+        batch_sink = sim.ListSink()
+        batch.sinks.append(batch_sink)
+        batch.run()
+        self.assertEqual(scalar_sink.records, batch_sink.records)
+        self.assertAlmostEqual(scalar.result.maxima.mean, batch.result.maxima.mean)
+
+    def test_unseeded_batch_runs_differ(self):
+        simulator = roulette_simulator(samples=20,
+                                       executor=sim.BatchExecutor(workers=2, batchSize=5))
+        sinks = [sim.ListSink(), sim.ListSink()]
+        for sink in sinks:
+            simulator.sinks = [sink]
+            simulator.run()
+            self.assertIsNone(simulator.seed)
+        self.assertNotEqual(sinks[0].records, sinks[1].records)
+
+    def test_run_until_precision(self):
+        sink = sim.ListSink()
+        simulator = roulette_simulator(seed=6, sinks=[sink])
+        result = simulator.runUntil(0.05, 'maximum', minSamples=20)
+        self.assertGreaterEqual(result.samples, 20)
+        self.assertEqual(len(sink.records), result.samples)
+        low, high = result.interval('maximum')
+        self.assertLessEqual((high - low) / 2, 0.05 * result.maxima.mean)
+        self.assertAlmostEqual(result.halfWidth('maximum'), (high - low) / 2)
+        capped = roulette_simulator(seed=6).runUntil(0.0, 'final', maxSamples=45)
+        self.assertEqual(capped.samples, 45)
+        for minSamples in (0, 1):
+            result = roulette_simulator(seed=6).runUntil(0.05, 'final', minSamples=minSamples)
+            self.assertGreater(result.samples, 2)
+            self.assertLessEqual(result.halfWidth('final'), 0.05 * abs(result.finals.mean))
+
+    def test_csv_sink(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'sessions.csv')
+            sink = sim.CSVSink(path)
+            roulette_simulator(seed=4, samples=5, sinks=[sink]).run()
+            sink.close()
+            with open(path) as handle:
+                rows = list(csv.reader(handle))
+            self.assertEqual(tuple(rows[0]), sim.FIELDS)
+            self.assertEqual(len(rows), 6)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_blackjack(self):
+        directory = tempfile.mkdtemp()
+        try:
+            rules = bj_bd.Rules(decks=1)
+            game = bj_ply.Game(rules)
+            player = bj_ply.BasicStrategy(rules, directory)
+            simulator = sim.Simulator(game, player, initDuration=20, samples=5, seed=1)
+            result = simulator.run()
+            self.assertEqual(result.samples, 5)
+            self.assertLessEqual(result.durations.maximum, 20)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
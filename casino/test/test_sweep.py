@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import sweep as sw
+
+
+class test_Sweep(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.axes = {'limit': [200, 1000], 'base': [5, 10]}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_grid(self):
+        points = sw.grid(self.axes)
+        self.assertEqual(len(points), 4)
+        self.assertEqual(points[0], {'base': 5, 'limit': 200})
+
+    def test_points_match_single_runs(self):
+        sweep = sw.Sweep(self.axes, samples=10, seed=4, workers=2)
+        rows = sweep.run()
+        self.assertEqual(len(rows), 4)
+        for row, point in zip(rows, sweep.points):
+            expected = sw.buildSimulator(point, 10, 4).run()
+            self.assertEqual(row['samples'], 10)
+            self.assertAlmostEqual(row['maximum_mean'], expected.maxima.mean)
+            self.assertAlmostEqual(row['final_stdev'], expected.finals.stdev)
+
+    def test_common_random_numbers(self):
+        # a limit no session reaches cannot change anything when the spins are shared
+        sweep = sw.Sweep({'limit': [10 ** 6, 10 ** 7]}, samples=10, seed=2, workers=1)
+        low, high = sweep.run()
+        self.assertEqual(low['final_mean'], high['final_mean'])
+
+    def test_resume_from_checkpoint(self):
+        checkpoint = os.path.join(self.directory, 'sweep.json')
+        first = sw.Sweep(self.axes, samples=5, seed=1, workers=1, checkpoint=checkpoint)
+        first.run()
+        done = []
+        second = sw.Sweep(self.axes, samples=5, seed=1, workers=1, checkpoint=checkpoint,
+                          progress=lambda *args: done.append(args))
+        self.assertEqual(second.run(), first.rows())
+        self.assertEqual(done, [])
+        with self.assertRaises(ValueError):
+            sw.Sweep(self.axes, samples=6, seed=1, checkpoint=checkpoint).run()
+
+    def test_tidy_csv(self):
+        sweep = sw.Sweep({'stake': [100]}, samples=3, seed=1, workers=1)
+        sweep.run()
+        handle = io.StringIO()
+        sweep.write(handle)
+        header, row = handle.getvalue().splitlines()
+        self.assertEqual(header.split(','), sweep.columns())
+        self.assertTrue(row.startswith('100,3,'))
+
+    def test_rejects_unknown_settings(self):
+        with self.assertRaises(ValueError):
+            sw.Sweep({'player': ['Passenger57'], 'base': [5]})
+        with self.assertRaises(ValueError):
+            sw.Sweep({'player': ['Nobody']})
+
+
+if __name__ == '__main__':
+    unittest.main()
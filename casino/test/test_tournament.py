@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from .. import simulation as sim
+from .. import sweep as sw
+from .. import tournament as tn
+
+ENTRANTS = {'martingale': {'player': 'Martingale'}, 'fibonacci': {'player': 'Fibonacci'},
+            'dozen': {'player': 'SleepingDozen'}, 'low': {'player': 'Martingale', 'base': 5}}
+
+
+class test_Tournament(unittest.TestCase):
+
+    def test_matches_single_runs(self):
+        """Compiled and reference entrants play the sessions a Simulator plays."""
+        tournament = tn.Tournament(ENTRANTS, samples=30, seed=5, chunkSize=7)
+        standings = tournament.run()
+        finals = {}
+        for name, point in ENTRANTS.items():
+            records = sw.buildSimulator(point, 30, 5).records(0, 30)
+            finals[name] = [record[3] for record in records]
+            stats = standings.values[standings.index[name]]
+            self.assertEqual(stats.count, 30)
+            self.assertAlmostEqual(stats.mean, sum(finals[name]) / 30)
+        field = [sum(values) / len(values) for values in zip(*finals.values())]
+        difference = standings.differences[standings.index['dozen']]
+        self.assertAlmostEqual(difference.mean,
+                               sum(a - b for a, b in zip(finals['dozen'], field)) / 30)
+
+    def test_baseline_and_pairs(self):
+        tournament = tn.Tournament(ENTRANTS, samples=40, seed=2, statistic='duration',
+                                   baseline='martingale', pairs=[('fibonacci', 'low')])
+        standings = tournament.run()
+        baseline = standings.differences[standings.index['martingale']]
+        self.assertEqual((baseline.mean, baseline.stdev), (0, 0))
+        mean, low, high = standings.compare('fibonacci', 'low')
+        fibonacci, other = (standings.values[standings.index[name]] for name in ('fibonacci', 'low'))
+        self.assertAlmostEqual(mean, fibonacci.mean - other.mean)
+        self.assertLess(low, mean)
+        self.assertRaises(ValueError, standings.compare, 'low', 'fibonacci')
+        self.assertRaises(ValueError, tn.Tournament, ENTRANTS, baseline='nobody')
+        self.assertRaises(ValueError, tn.Tournament, ENTRANTS, statistic='mean')
+
+    def test_ranking(self):
+        standings = tn.Standings(['a', 'b', 'c'])
+        for session in range(100):
+            standings.add([10 + session % 2, 10 + (session + 1) % 2, 100 + session % 5])
+        rows = standings.ranking()
+        self.assertEqual(rows[0]['entrant'], 'c')
+        self.assertEqual([(row['best'], row['worst']) for row in rows], [(1, 1), (2, 3), (2, 3)])
+        self.assertEqual(set(rows[0]), set(tn.COLUMNS))
+
+    def test_chunks_and_pool(self):
+        sink = sim.ListSink()
+        tournament = tn.Tournament(ENTRANTS, samples=20, seed=7, workers=1, chunkSize=8,
+                                   sinks=[sink])
+        pooled = tournament.run().ranking()
+        self.assertEqual([record[:3] for record in sink.records[:5]],
+                         [(0, 8, 'martingale'), (0, 8, 'fibonacci'), (0, 8, 'dozen'),
+                          (0, 8, 'low'), (8, 16, 'martingale')])
+        self.assertEqual(len(sink.records), 3 * len(ENTRANTS))
+        local = tn.Tournament(ENTRANTS, samples=20, seed=7, chunkSize=20).run().ranking()
+        for mine, theirs in zip(pooled, local):
+            self.assertEqual(mine['entrant'], theirs['entrant'])
+            self.assertAlmostEqual(mine['difference'], theirs['difference'])
+            self.assertAlmostEqual(mine['high'], theirs['high'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import trajectory as tj
+from .test_simulation import roulette_simulator
+
+
+class test_Trajectory(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'paths.trj')
+        self.simulator = roulette_simulator(samples=60, seed=3, initStake=1000)
+        self.paths = [self.simulator.session(index) for index in range(60)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_full_paths(self):
+        with tj.TrajectoryWriter(self.path) as writer:
+            result = writer.play(self.simulator)
+        self.assertEqual(result.toDict(), self.simulator.run().toDict())
+        with tj.TrajectoryReader(self.path) as reader:
+            self.assertEqual(len(reader), 60)
+            for index in (59, 0, 17):  # any order
+                trajectory = reader[index]
+                self.assertTrue(trajectory.complete)
+                self.assertEqual(list(trajectory.stakes), self.paths[index])
+                self.assertEqual(list(trajectory.rounds), list(range(len(self.paths[index]))))
+        self.assertLess(os.path.getsize(self.path), 3 * sum(map(len, self.paths)))
+
+    def test_downsampled_keeps_extremes(self):
+        with tj.TrajectoryWriter(self.path, every=25, ruin=900) as writer:
+            for index, stakes in enumerate(self.paths):
+                writer.write(index, stakes)
+        with tj.TrajectoryReader(self.path) as reader:
+            for trajectory, stakes in zip(reader, self.paths):
+                self.assertEqual(trajectory.length, len(stakes))
+                self.assertEqual(trajectory.maximum, max(stakes))
+                self.assertEqual(trajectory.minimum, min(stakes))
+                self.assertEqual(trajectory.final, stakes[-1])
+                ruin = next((r for r, stake in enumerate(stakes) if stake <= 900), None)
+                self.assertEqual(trajectory.ruin(900), ruin)
+                for round, stake in trajectory.points():
+                    self.assertEqual(stakes[round], stake)
+                self.assertLessEqual(len(trajectory.stakes), len(stakes) // 25 + 5)
+
+    def test_empty_and_large_paths(self):
+        paths = {4: [], 9: [5], 2: [0, 2 ** 40, -3, 2 ** 40]}
+        with tj.TrajectoryWriter(self.path) as writer:
+            for index, stakes in paths.items():
+                writer.write(index, stakes)
+            self.assertRaises(ValueError, writer.write, 4, [1])
+        with tj.TrajectoryReader(self.path) as reader:
+            self.assertEqual(reader.sessions(), [4, 9, 2])
+            for index, stakes in paths.items():
+                self.assertEqual(list(reader[index].stakes), stakes)
+            self.assertIsNone(reader[4].maximum)
+            self.assertRaises(KeyError, reader.__getitem__, 5)
+
+    def test_unclosed_file_is_scanned(self):
+        writer = tj.TrajectoryWriter(self.path, every=10)
+        for index, stakes in enumerate(self.paths[:10]):
+            writer.write(index, stakes)
+        writer.handle.flush()
+        with open(self.path, 'ab') as handle:
+            handle.write(b'\x01\x02')  # half a block
+        with tj.TrajectoryReader(self.path) as reader:
+            self.assertEqual(reader.sessions(), list(range(10)))
+            self.assertEqual(reader[9].final, self.paths[9][-1])
+        writer.handle.close()
+
+    def test_not_a_store(self):
+        with open(self.path, 'wb') as handle:
+            handle.write(b'nothing')
+        self.assertRaises(ValueError, tj.TrajectoryReader, self.path)
+        self.assertRaises(ValueError, tj.TrajectoryWriter, self.path, every=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
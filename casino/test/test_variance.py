@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+
+from .. import variance as vr
+from ..roulette import players as ply
+from .test_simulation import roulette_simulator
+
+
+class test_Variance(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = roulette_simulator(seed=1, samples=200)
+        self.wheel = self.simulator.game.wheel
+        self.black = self.simulator.player.black
+
+    def test_expected_returns(self):
+        returns = vr.expectedReturns(self.wheel)
+        self.assertAlmostEqual(returns[self.black], 36 / 38)
+        self.assertAlmostEqual(returns[self.wheel.getOutcome('00-0-1-2-3').pop()], 35 / 38)
+
+    def test_antithetic_pairing(self):
+        pairing = vr.antitheticPairing(self.wheel, self.black)
+        self.assertEqual(sorted(pairing), list(range(38)))
+        for index, partner in enumerate(pairing):
+            self.assertEqual(pairing[partner], index)
+            if self.black in self.wheel.bins[index]:
+                self.assertNotIn(self.black, self.wheel.bins[partner])
+
+    def test_mirror_replays_the_plain_stream(self):
+        mirror = vr.MirrorRandom(list(range(38)), seed=3)
+        plain = random.Random(3)
+        self.assertEqual([mirror.choice(self.wheel.bins) for _ in range(20)],
+                         [plain.choice(self.wheel.bins) for _ in range(20)])
+
+    def test_estimators_agree_with_plain_monte_carlo(self):
+        plain = self.simulator.run()
+        for estimate in (vr.antithetic(self.simulator, self.black, 'final'),
+                         vr.controlVariate(self.simulator, 'final')):
+            self.assertLess(abs(estimate.value - plain.finals.mean), 4 * plain.finals.stderr)
+            self.assertGreater(estimate.gain, 1)
+        self.assertIs(self.wheel.rng.__class__, random.Random)
+        self.assertIs(type(self.simulator.game), ply.Game)
+
+    def test_common_random_numbers(self):
+        same = vr.commonRandomNumbers(self.simulator, roulette_simulator(samples=200))
+        self.assertEqual((same.value, same.stderr), (0.0, 0.0))
+        other = roulette_simulator(ply.Passenger57, samples=200)
+        difference = vr.commonRandomNumbers(self.simulator, other, 'final')
+        self.assertGreater(difference.gain, 1)
+        self.assertIsNone(other.seed)
+
+    def test_unseeded_simulators_stay_unseeded(self):
+        simulator = roulette_simulator(samples=20)
+        other = roulette_simulator(ply.Passenger57, samples=20)
+        ruined = lambda record: record[3] < 50
+        vr.antithetic(simulator, self.black)
+        vr.controlVariate(simulator)
+        vr.commonRandomNumbers(simulator, other)
+        vr.importanceSampling(simulator, self.black, ruined)
+        self.assertIsNone(simulator.seed)
+        self.assertNotEqual(simulator.records(0, 20), simulator.records(0, 20))
+
+    def test_importance_sampling(self):
+        ruined = lambda record: record[3] < 50
+        fair = vr.importanceSampling(self.simulator, self.black, ruined, tilt=1.0)
+        self.assertAlmostEqual(fair.value * 200, round(fair.value * 200))  # weights of one
+        frequency = sum(map(ruined, self.simulator.records(0, 200))) / 200
+        self.assertLess(abs(fair.value - frequency), 4 * fair.stderr)
+        tilted = vr.importanceSampling(self.simulator, self.black, ruined, tilt=1.5)
+        self.assertLess(abs(tilted.value - fair.value), 4 * fair.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tournaments of roulette strategies on shared spins.
+
+Every entrant of a :obj:`Tournament` plays session ``i`` on the same spins, the spins a
+:obj:`.Simulator` with the same seed plays session ``i`` on. They are drawn once per
+session and played by every entrant :mod:`.engine` can compile; the others replay
+them by reseeding the wheel. Since every entrant sees the same luck, the difference
+between two entrants within a session is far less noisy than either result on its own
+(common random numbers), so a ranking settles in far fewer sessions than separate runs
+would need.
+
+For every session, :obj:`Standings` fold in, per entrant:
+
+    * its statistic: the ``'final'`` stake, the ``'maximum'`` stake or the ``'duration'``,
+    * its paired difference from the baseline, a named entrant or, by default, the mean
+      of the whole field in that session,
+
+and the paired difference of each pair of entrants asked for. Everything is kept in
+mergeable :obj:`.RunningStats`, so sessions are played in chunks on a process pool and
+nothing grows with the number of sessions. A finished chunk writes a record per entrant
+to any result sinks. :meth:`Standings.ranking` orders the entrants by their mean
+difference, with its confidence interval and the range of ranks the intervals allow.
+
+Example:
+    python -m casino.tournament --player Martingale Fibonacci Paroli --samples 100000
+"""
+
+import argparse
+import csv
+import logging
+import random
+import sys
+
+from . import simulation as sim
+from . import sweep as sw
+from .roulette import bin_builder as bb
+from .roulette import board as bd
+from .roulette import engine as en
+from .roulette import players as ply
+from .roulette import shared as sh
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+FIELDS = ('start', 'stop', 'entrant', 'sessions', 'mean', 'stdev', 'difference',
+          'differenceStdev')
+COLUMNS = ('rank', 'entrant', 'sessions', 'mean', 'stdev', 'difference', 'low', 'high',
+           'best', 'worst')
+
+
+class Standings:
+    """Running statistics of the entrants of a tournament.
+
+    Args:
+        names (list of str): the entrants.
+        baseline (str, default None): entrant the others are compared with; the mean
+            of the field when ``None``.
+        pairs (list of tuple, default ()): pairs of entrants to compare directly.
+
+    Attributes:
+        values (list of :obj:`.RunningStats`): statistic of each entrant.
+        differences (list of :obj:`.RunningStats`): paired difference of each entrant
+            from the baseline.
+        paired (list of :obj:`.RunningStats`): paired difference of each pair, the first
+            less the second.
+    """
+
+    def __init__(self, names, baseline=None, pairs=()):
+        self.names = list(names)
+        self.baseline = baseline
+        self.pairs = [tuple(pair) for pair in pairs]
+        self.index = {name: position for position, name in enumerate(self.names)}
+        self.values = [sim.RunningStats() for _ in self.names]
+        self.differences = [sim.RunningStats() for _ in self.names]
+        self.paired = [sim.RunningStats() for _ in self.pairs]
+
+    def add(self, values):
+        """Fold in one session: the statistic of each entrant, in the order of names."""
+        if self.baseline is None:
+            base = sum(values) / len(values)
+        else:
+            base = values[self.index[self.baseline]]
+        for stats, difference, value in zip(self.values, self.differences, values):
+            stats.add(value)
+            difference.add(value - base)
+        index = self.index
+        for (first, second), stats in zip(self.pairs, self.paired):
+            stats.add(values[index[first]] - values[index[second]])
+
+    def merge(self, other):
+        """Fold in the standings of other sessions of the same tournament.
+
+        Return:
+            :obj:`Standings`: ``self``.
+        """
+        for mine, theirs in zip(self.values + self.differences + self.paired,
+                                other.values + other.differences + other.paired):
+            mine.merge(theirs)
+        return self
+
+    @property
+    def samples(self):
+        return self.values[0].count if self.values else 0
+
+    def compare(self, first, second, confidence=0.95):
+        """Mean paired difference of ``first`` less ``second``, a pair given up front.
+
+        Return:
+            tuple: ``(mean, low, high)`` with the normal confidence interval.
+
+        Raises:
+            ValueError: if the pair was not asked for.
+        """
+        if (first, second) not in self.pairs:
+            raise ValueError('%s and %s were not compared' % (first, second))
+        stats = self.paired[self.pairs.index((first, second))]
+        half = sim.zScore(confidence) * stats.stderr
+        return stats.mean, stats.mean - half, stats.mean + half
+
+    def ranking(self, confidence=0.95):
+        """Entrants from best to worst by their mean difference from the baseline.
+
+        ``low`` and ``high`` bound that mean at the ``confidence`` level. ``best`` and
+        ``worst`` are the highest and lowest ranks the intervals allow: one plus the
+        entrants whose interval is entirely above, and the field less those entirely
+        below.
+
+        Return:
+            list of dict: a row of :data:`COLUMNS` per entrant.
+        """
+        z = sim.zScore(confidence)
+        bounds = [(stats.mean - z * stats.stderr, stats.mean + z * stats.stderr)
+                  for stats in self.differences]
+        order = sorted(range(len(self.names)), key=lambda k: -self.differences[k].mean)
+        rows = []
+        for rank, k in enumerate(order, 1):
+            low, high = bounds[k]
+            rows.append({
+                'rank': rank, 'entrant': self.names[k], 'sessions': self.values[k].count,
+                'mean': self.values[k].mean, 'stdev': self.values[k].stdev,
+                'difference': self.differences[k].mean, 'low': low, 'high': high,
+                'best': 1 + sum(other[0] > high for other in bounds),
+                'worst': len(bounds) - sum(other[1] < low for other in bounds)})
+        return rows
+
+    def records(self, start, stop):
+        """A record of :data:`FIELDS` per entrant, for sessions ``start`` to ``stop``."""
+        return [(start, stop, name, stats.count, stats.mean, stats.stdev, difference.mean,
+                 difference.stdev)
+                for name, stats, difference in zip(self.names, self.values, self.differences)]
+
+
+class Tournament:
+    """Play roulette strategies against each other on shared spins.
+
+    Args:
+        entrants (dict, default None): entrant name to its settings, as a point of a
+            :mod:`casino.sweep` grid: ``player``, ``stake``, ``duration``, ``limit``,
+            ``minimum`` and player attributes. Every :func:`.playerClasses` class with
+            the defaults when ``None``.
+        samples (int, default 1000): sessions.
+        seed (int, default None): seed of the sessions, drawn at random when ``None``.
+        statistic (str, default 'final'): 'duration', 'maximum' or 'final'.
+        baseline (str, default None): entrant the others are compared with; the mean
+            of the field when ``None``.
+        pairs (list of tuple, default ()): pairs of entrants to compare directly.
+        workers (int, default 0): size of the process pool; ``0`` plays in this
+            process and ``None`` uses every CPU.
+        chunkSize (int, default 1000): sessions per task.
+        sinks (list): result sinks which receive a record of :data:`FIELDS` per
+            entrant and chunk, in session order.
+        progress (callable, default None): called as ``progress(done, total)`` after
+            each chunk.
+
+    Attributes:
+        standings (:obj:`Standings`): of the last :meth:`run`.
+
+    Raises:
+        ValueError: for an unknown player, setting, statistic, baseline or pair.
+    """
+
+    def __init__(self, entrants=None, samples=1000, seed=None, statistic='final',
+                 baseline=None, pairs=(), workers=0, chunkSize=1000, sinks=(),
+                 progress=None):
+        if entrants is None:
+            entrants = {name: {'player': name} for name in sorted(ply.playerClasses())}
+        self.entrants = {name: dict(point) for name, point in entrants.items()}
+        self.samples = samples
+        self.seed = random.getrandbits(31) if seed is None else seed
+        if statistic not in sw.STATISTICS:
+            raise ValueError('unknown statistic %r' % statistic)
+        self.statistic = statistic
+        unknown = [name for name in [baseline] + [name for pair in pairs for name in pair]
+                   if name is not None and name not in self.entrants]
+        if unknown:
+            raise ValueError('unknown entrants %r' % unknown)
+        self.baseline = baseline
+        self.pairs = [tuple(pair) for pair in pairs]
+        self.workers = workers
+        self.chunkSize = chunkSize
+        self.sinks = list(sinks)
+        self.progress = progress
+        self.standings = None
+        self._players = None
+        self._build()  # fail before starting any worker
+
+    def __getstate__(self):
+        state = vars(self).copy()
+        state['sinks'] = []
+        state['progress'] = None
+        state['_players'] = None  # built again on this process's shared wheel
+        return state
+
+    def _build(self):
+        """Each entrant's simulator and, if it compiles, the arguments of its program."""
+        if self._players is None:
+            executor = en.CompiledExecutor()
+            self._players = []
+            for name, point in self.entrants.items():
+                simulator = sw.buildSimulator(point, self.samples, self.seed)
+                program = en.compilePlayer(simulator.player)
+                arguments = None
+                if program is not None and type(simulator.game.wheel.rng) is random.Random:
+                    arguments = executor.arguments(simulator, program)
+                    if en.numba is not None:
+                        arguments = tuple(en.numpy.array(table) for table in arguments[:4]) \
+                            + arguments[4:]
+                self._players.append((name, simulator, arguments))
+        return self._players
+
+    def play(self, start, stop):
+        """Play sessions ``start`` to ``stop`` with every entrant.
+
+        Return:
+            :obj:`Standings`: of these sessions.
+
+        Raises:
+            :obj:`.InvalidBet`: if a compiled entrant bets outside the table limits.
+        """
+        players = self._build()
+        standings = Standings(self.entrants, self.baseline, self.pairs)
+        column = 1 + sw.STATISTICS.index(self.statistic)  # position in a session record
+        size = len(bb.sharedWheel().bins)
+        rounds = max(simulator.initDuration for _, simulator, _ in players)
+        rng = random.Random()
+        draw = rng.randrange
+        for index in range(start, stop):
+            rng.seed(sim.sessionSeed(self.seed, index))
+            spins = [draw(size) for _ in range(rounds)]
+            if en.numba is not None:
+                spins = en.numpy.array(spins)
+            values = []
+            for _, simulator, arguments in players:
+                if arguments is None:
+                    record = simulator.records(index, index + 1)[0]
+                else:
+                    played, maximum, final = en.playSpins(spins, *arguments)
+                    if played == en.INVALID:
+                        raise bd.InvalidBet
+                    if not played:
+                        maximum = final = simulator.initStake
+                    record = (index, played, maximum, final)
+                values.append(record[column])
+            standings.add(values)
+        return standings
+
+    def _chunks(self, start, stop):
+        """Standings of each chunk of sessions, in session order."""
+        chunks = [(low, min(low + self.chunkSize, stop))
+                  for low in range(start, stop, self.chunkSize)]
+        if self.workers == 0:
+            for chunk in chunks:
+                yield chunk, self.play(*chunk)
+            return
+        with sh.sharedPool(self.workers) as pool:
+            futures = [pool.submit(_playChunk, self, *chunk) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                yield chunk, future.result()
+
+    def run(self, start=0, stop=None):
+        """Play sessions ``start`` to ``stop``, :attr:`samples` by default.
+
+        Return:
+            :obj:`Standings`
+        """
+        if stop is None:
+            stop = self.samples
+        standings = Standings(self.entrants, self.baseline, self.pairs)
+        for (low, high), part in self._chunks(start, stop):
+            standings.merge(part)
+            for record in part.records(low, high):
+                for sink in self.sinks:
+                    sink.write(record)
+            LOGGER.debug('sessions %d to %d played', low, high)
+            if self.progress is not None:
+                self.progress(high - start, stop - start)
+        self.standings = standings
+        return standings
+
+
+def _playChunk(tournament, start, stop):
+    return tournament.play(start, stop)
+
+
+def get_args():
+    '''This function parses and return arguments passed in'''
+    parser = argparse.ArgumentParser(description="Rank roulette strategies on shared spins.")
+    parser.add_argument("--player", nargs='+', help="player classes, every one if unset")
+    parser.add_argument("--stake", type=int, default=sw.DEFAULTS['stake'], help="initial stake")
+    parser.add_argument("--duration", type=int, default=sw.DEFAULTS['duration'],
+                        help="rounds per session")
+    parser.add_argument("--samples", type=int, default=1000, help="sessions")
+    parser.add_argument("--seed", type=int, help="seed of the sessions")
+    parser.add_argument("--statistic", default='final', choices=sw.STATISTICS,
+                        help="statistic ranked")
+    parser.add_argument("--baseline", help="entrant compared with, the field mean if unset")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="size of the process pool, 0 to play in this process")
+    parser.add_argument("--chunk", type=int, default=1000, help="sessions per task")
+    parser.add_argument("--records", help="CSV file for the records of each chunk")
+    parser.add_argument("--output", help="CSV file for the ranking, standard output if unset")
+    parser.add_argument("-v", "--verbose", help="increase output verbosity",
+                        action="store_true")
+    return parser.parse_args()
+
+
+def main(args=None):
+    """enters function"""
+    if args is None:
+        args = get_args()
+    loglevel = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    names = args.player or sorted(ply.playerClasses())
+    entrants = {name: {'player': name, 'stake': args.stake, 'duration': args.duration}
+                for name in names}
+    sinks = [] if args.records is None else [sim.CSVSink(args.records, FIELDS)]
+    tournament = Tournament(entrants, args.samples, args.seed, args.statistic,
+                            args.baseline, workers=args.workers, chunkSize=args.chunk,
+                            sinks=sinks)
+    try:
+        standings = tournament.run()
+    finally:
+        for sink in sinks:
+            sink.close()
+    handle = sys.stdout if args.output is None else open(args.output, 'w', newline='')
+    try:
+        writer = csv.DictWriter(handle, COLUMNS)
+        writer.writeheader()
+        writer.writerows(standings.ranking(args.confidence))
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+
+
+if __name__ == '__main__':
+    main()
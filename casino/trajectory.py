@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""Compact on-disk store of the stake paths of many sessions.
+
+:meth:`.Simulator.session` returns a list of every stake of a session, which is far too
+big to keep for a million sessions. A :obj:`TrajectoryWriter` streams paths to a file
+instead, one block per session:
+
+    * stakes are stored as the difference from the previous stake kept, in the smallest
+      :mod:`array` type which holds them, so a roulette session of 250 rounds usually
+      takes one or two bytes a round,
+    * with ``every`` set, only some rounds are kept: the first and last, those of the
+      highest and lowest stake, the ruin point, where the stake first fell to ``ruin``
+      or below, and every ``every``-th round. The kept rounds are stored as differences
+      too. Extremes are exact whatever is dropped.
+
+The blocks are followed by an index, so a :obj:`TrajectoryReader` fetches any session
+with one seek. A file whose writer died before writing the index is read by scanning
+its blocks.
+
+Examples:
+    >>> with TrajectoryWriter('paths.trj', every=10) as writer:  # doctest: +SKIP
+    ...     writer.play(simulator, 0, 10 ** 6)
+    >>> with TrajectoryReader('paths.trj') as reader:  # doctest: +SKIP
+    ...     reader[123456].maximum
+"""
+
+import logging
+import os
+import struct
+import sys
+from array import array
+
+from . import simulation as sim
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b'TRJ1'
+BLOCK = struct.Struct('<qiiqcc')  # session, rounds, points kept, first stake, type codes
+TRAILER = struct.Struct('<q4s')  # offset of the index, end marker
+END = b'TRJX'
+TYPECODES = 'bhiq'
+
+
+def _typecode(values):
+    """Smallest :mod:`array` type code holding every value of ``values``."""
+    low, high = min(values, default=0), max(values, default=0)
+    for code in TYPECODES:
+        bits = array(code).itemsize * 8 - 1
+        if -(1 << bits) <= low and high < (1 << bits):
+            return code
+    raise OverflowError('stake change does not fit in 64 bits')
+
+
+def _encode(values):
+    """Differences between consecutive ``values``, as a little-endian array."""
+    deltas = [b - a for a, b in zip(values, values[1:])]
+    code = _typecode(deltas)
+    packed = array(code, deltas)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return code, packed.tobytes()
+
+
+def _decode(code, data, first):
+    packed = array(code.decode())
+    packed.frombytes(data)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    values = array('q', [first])
+    for delta in packed:
+        values.append(values[-1] + delta)
+    return values
+
+
+class Trajectory:
+    """Stake path of one session, in full or downsampled.
+
+    Attributes:
+        session (int): session index.
+        length (int): rounds played in the session.
+        rounds (array): round of each point kept, zero based.
+        stakes (array): stake after each round kept.
+    """
+
+    def __init__(self, session, length, rounds, stakes):
+        self.session = session
+        self.length = length
+        self.rounds = rounds
+        self.stakes = stakes
+
+    @property
+    def complete(self):
+        """Every round is kept."""
+        return len(self.stakes) == self.length
+
+    @property
+    def maximum(self):
+        return max(self.stakes) if self.stakes else None
+
+    @property
+    def minimum(self):
+        return min(self.stakes) if self.stakes else None
+
+    @property
+    def final(self):
+        return self.stakes[-1] if self.stakes else None
+
+    def ruin(self, level=0):
+        """First round whose stake is ``level`` or less, or ``None``.
+
+        Exact for a complete path and for the ``ruin`` level the writer was given.
+        """
+        for round, stake in zip(self.rounds, self.stakes):
+            if stake <= level:
+                return round
+        return None
+
+    def points(self):
+        """``(round, stake)`` pairs of the rounds kept."""
+        return list(zip(self.rounds, self.stakes))
+
+    def __repr__(self):
+        return '{0:s}(session={1!r}, length={2!r}, points={3!r})'.format(
+            type(self).__name__, self.session, self.length, len(self.stakes))
+
+
+def keep(stakes, every, ruin=0):
+    """Rounds a downsampled path keeps.
+
+    Examples:
+        >>> keep([100, 90, 120, 80, 0, 10, 50], every=3)
+        [0, 2, 3, 4, 6]
+
+    Return:
+        list of int: sorted rounds.
+    """
+    if not stakes:
+        return []
+    last = len(stakes) - 1
+    kept = set(range(0, len(stakes), every))
+    kept.update((last, stakes.index(max(stakes)), stakes.index(min(stakes))))
+    for round, stake in enumerate(stakes):
+        if stake <= ruin:
+            kept.add(round)
+            break
+    return sorted(kept)
+
+
+class TrajectoryWriter:
+    """Streams session stake paths to a file.
+
+    Args:
+        path (str): file to write; replaced if it exists.
+        every (int, default None): keep every ``every``-th round plus the extremes;
+            ``None`` keeps every round.
+        ruin (int, default 0): stake at or below which a session is ruined.
+
+    Attributes:
+        sessions (int): sessions written.
+        size (int): bytes written.
+    """
+
+    def __init__(self, path, every=None, ruin=0):
+        if every is not None and every < 1:
+            raise ValueError('every must be at least 1')
+        self.path = path
+        self.every = every
+        self.ruin = ruin
+        self.handle = open(path, 'wb')
+        self.handle.write(MAGIC)
+        self.offsets = {}
+        self.sessions = 0
+
+    @property
+    def size(self):
+        return self.handle.tell()
+
+    def write(self, session, stakes):
+        """Append the path of ``session``.
+
+        Args:
+            session (int): session index.
+            stakes (list of int): the stake after each round, as returned by
+                :meth:`.Simulator.session`.
+
+        Raises:
+            ValueError: if the session is already stored.
+            TypeError: if a stake is not an integer.
+        """
+        if session in self.offsets:
+            raise ValueError('session %d is already stored' % session)
+        stakes = list(stakes)
+        if self.every is None:
+            kept = stakes
+            rounds = b''
+            roundCode = b'-'
+        else:
+            points = keep(stakes, self.every, self.ruin)
+            kept = [stakes[round] for round in points]
+            code, rounds = _encode(points)
+            roundCode = code.encode()
+        code, data = _encode(kept)
+        self.offsets[session] = self.handle.tell()
+        self.handle.write(BLOCK.pack(session, len(stakes), len(kept), kept[0] if kept else 0,
+                                     code.encode(), roundCode))
+        self.handle.write(data)
+        self.handle.write(rounds)
+        self.sessions += 1
+
+    def play(self, simulator, start=0, stop=None):
+        """Play sessions ``start`` to ``stop`` of ``simulator`` here and store their paths.
+
+        Return:
+            :obj:`.SimulationResult`: statistics of the sessions played.
+        """
+        stop = simulator.samples if stop is None else stop
+        result = sim.SimulationResult()
+        for index in range(start, stop):
+            stakes = simulator.session(index)
+            self.write(index, stakes)
+            result.add((index, len(stakes), max(stakes, default=simulator.initStake),
+                        stakes[-1] if stakes else simulator.initStake))
+        return result
+
+    def close(self):
+        """Write the index and close the file."""
+        if self.handle.closed:
+            return
+        where = self.handle.tell()
+        index = array('q')
+        for session, offset in self.offsets.items():
+            index.extend((session, offset))
+        if sys.byteorder == 'big':
+            index.byteswap()
+        self.handle.write(struct.pack('<q', len(self.offsets)))
+        self.handle.write(index.tobytes())
+        self.handle.write(TRAILER.pack(where, END))
+        self.handle.close()
+        LOGGER.info('stored %d sessions in %d bytes', self.sessions, os.path.getsize(self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryReader:
+    """Random access to the paths stored by a :obj:`TrajectoryWriter`.
+
+    Args:
+        path (str): file to read.
+
+    Raises:
+        ValueError: if the file is not a trajectory store.
+    """
+
+    def __init__(self, path):
+        self.handle = open(path, 'rb')
+        if self.handle.read(len(MAGIC)) != MAGIC:
+            self.handle.close()
+            raise ValueError('%s is not a trajectory store' % path)
+        self.offsets = self._index()
+
+    def _index(self):
+        size = self.handle.seek(0, os.SEEK_END)
+        if size >= len(MAGIC) + TRAILER.size:
+            self.handle.seek(size - TRAILER.size)
+            where, end = TRAILER.unpack(self.handle.read(TRAILER.size))
+            if end == END:
+                self.handle.seek(where)
+                count, = struct.unpack('<q', self.handle.read(8))
+                index = array('q')
+                index.frombytes(self.handle.read(16 * count))
+                if sys.byteorder == 'big':
+                    index.byteswap()
+                return dict(zip(index[0::2], index[1::2]))
+        LOGGER.warning('no index in %s, scanning it', self.handle.name)
+        return self._scan(size)
+
+    def _scan(self, size):
+        """Index of the complete blocks of a file whose writer did not close it."""
+        offsets = {}
+        offset = len(MAGIC)
+        while offset + BLOCK.size <= size:
+            self.handle.seek(offset)
+            session, _, count, _, code, roundCode = BLOCK.unpack(self.handle.read(BLOCK.size))
+            end = offset + BLOCK.size + self._bytes(code, count)
+            if roundCode != b'-':
+                end += self._bytes(roundCode, count)
+            if end > size:
+                break
+            offsets[session] = offset
+            offset = end
+        return offsets
+
+    @staticmethod
+    def _bytes(code, count):
+        return array(code.decode()).itemsize * max(count - 1, 0)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, session):
+        return session in self.offsets
+
+    def sessions(self):
+        """Stored session indices, in the order they were written."""
+        return sorted(self.offsets, key=self.offsets.get)
+
+    def __getitem__(self, session):
+        """:obj:`Trajectory` of ``session``.
+
+        Raises:
+            KeyError: if the session is not stored.
+        """
+        self.handle.seek(self.offsets[session])
+        session, length, count, first, code, roundCode = BLOCK.unpack(
+            self.handle.read(BLOCK.size))
+        stakes = _decode(code, self.handle.read(self._bytes(code, count)), first) \
+            if count else array('q')
+        if roundCode == b'-':
+            rounds = range(length)
+        else:
+            rounds = _decode(roundCode, self.handle.read(self._bytes(roundCode, count)), 0) \
+                if count else array('q')
+        return Trajectory(session, length, rounds, stakes)
+
+    def __iter__(self):
+        for session in self.sessions():
+            yield self[session]
+
+    def close(self):
+        self.handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
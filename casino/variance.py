@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""Variance reduced estimators for roulette :obj:`.Simulator`\\s.
+
+Plain Monte Carlo, as in :meth:`.Simulator.gather`, needs a great many sessions for a
+tight interval on a heavy tailed statistic such as the Martingale's maximum stake. The
+estimators here play the same sessions with a little more structure:
+
+    :func:`antithetic`
+        plays every session twice, the second time with each spin swapped for its
+        antithetic partner: winning and losing bins of the player's bet are paired, so
+        a lucky session is matched with an unlucky one.
+    :func:`controlVariate`
+        subtracts the part of the result explained by luck. The wheel's payouts give
+        the exact expected return of every bet, so the difference between what a
+        session won and what it was expected to win has a known mean of zero.
+    :func:`commonRandomNumbers`
+        compares two simulators on the same spins, so the difference of their results
+        is not drowned by the noise in each.
+    :func:`importanceSampling`
+        estimates the probability of a rare event, such as ruin, by spinning a wheel
+        tilted towards losing and weighting each session by its likelihood ratio.
+
+Each returns an :obj:`Estimate` whose :attr:`~Estimate.gain` is the variance of plain
+Monte Carlo over the same number of sessions divided by the variance of the estimator:
+the factor by which the sample count, and so the compute, is reduced.
+
+Sessions are seeded with :func:`.sessionSeed`, so the simulator needs a seed; one is drawn
+when it has none.
+"""
+
+import bisect
+import contextlib
+import itertools
+import logging
+import math
+import random
+
+from . import simulation as sim
+from .roulette import players as ply
+
+# for tips on logging go to
+# http://docs.python-guide.org/en/latest/writing/logging/
+LOGGER = logging.getLogger(__name__)
+
+STATISTICS = {'duration': 1, 'maximum': 2, 'final': 3}  # position in a session record
+
+
+class Estimate:
+    """A variance reduced estimate.
+
+    Attributes:
+        value (float): the estimate.
+        stderr (float): its standard error.
+        samples (int): sessions played.
+        gain (float): variance of plain Monte Carlo with ``samples`` sessions divided by
+            the variance of this estimate.
+    """
+
+    def __init__(self, value, stderr, samples, gain):
+        self.value = value
+        self.stderr = stderr
+        self.samples = samples
+        self.gain = gain
+
+    @property
+    def effectiveSamples(self):
+        """Sessions plain Monte Carlo would need for the same standard error."""
+        return self.samples * self.gain
+
+    def interval(self, z=1.96):
+        """Normal confidence interval, 95% by default.
+
+        Return:
+            tuple: ``(low, high)``
+        """
+        return self.value - z * self.stderr, self.value + z * self.stderr
+
+    def __repr__(self):
+        return '{class_:s}(value={value!r}, stderr={stderr!r}, samples={samples!r}, ' \
+            'gain={gain!r})'.format(class_=type(self).__name__, **vars(self))
+
+
+class MirrorRandom(random.Random):
+    """:obj:`random.Random` whose choices are mapped through a fixed permutation.
+
+    The draw underneath is the one the plain generator would make from the same seed, so
+    a session replayed with a mirror sees the partner of every spin.
+
+    Args:
+        permutation (list of int): partner of each index of the sequences chosen from.
+    """
+
+    def __init__(self, permutation, seed=None):
+        self.permutation = permutation
+        super(MirrorRandom, self).__init__(seed)
+
+    def choice(self, seq):
+        index = super(MirrorRandom, self).choice(range(len(seq)))
+        if len(seq) == len(self.permutation):
+            index = self.permutation[index]
+        return seq[index]
+
+
+class TiltedRandom(random.Random):
+    """:obj:`random.Random` whose choices follow weights instead of a uniform law.
+
+    The log likelihood ratio of the uniform law to the tilted one is accumulated over
+    the choices since the last :meth:`seed`, so each session can be reweighted.
+
+    Args:
+        weights (list of float): relative weight of each index of the sequences chosen from.
+
+    Attributes:
+        logRatio (float): log likelihood ratio of the choices made since seeding.
+    """
+
+    def __init__(self, weights, seed=None):
+        total = sum(weights)
+        self.cumulative = list(itertools.accumulate(weight / total for weight in weights))
+        self.logRatios = [math.log(total / (len(weights) * weight)) for weight in weights]
+        self.logRatio = 0.0
+        super(TiltedRandom, self).__init__(seed)
+
+    def seed(self, *args, **kwargs):
+        self.logRatio = 0.0
+        super(TiltedRandom, self).seed(*args, **kwargs)
+
+    def choice(self, seq):
+        if len(seq) != len(self.cumulative):
+            return super(TiltedRandom, self).choice(seq)
+        index = min(bisect.bisect(self.cumulative, self.random()), len(seq) - 1)
+        self.logRatio += self.logRatios[index]
+        return seq[index]
+
+
+class LedgerGame(ply.Game):
+    """Roulette :obj:`.Game` which keeps the expected net win of every bet placed.
+
+    The expected return of a bet follows from the :obj:`.Wheel`: the share of bins
+    holding its outcome times the odds plus the stake. ``drift`` is the sum of
+    ``amount * (return - 1)`` over the bets of the session, so a session's net win minus
+    its drift has an expected value of exactly zero.
+
+    Attributes:
+        drift (float): expected net win of the bets since the last :meth:`seed`.
+    """
+
+    def __init__(self, table, wheel):
+        super(LedgerGame, self).__init__(table, wheel)
+        self.returns = expectedReturns(wheel)
+        self.drift = 0.0
+
+    def seed(self, value):
+        self.drift = 0.0
+        super(LedgerGame, self).seed(value)
+
+    def cycle(self, player):
+        if player.playing():
+            player.placeBets()
+            for bet in player.table:
+                self.drift += bet.amount * (self.returns[bet.outcome] - 1)
+            self.resolve(player, self.wheel.next())
+
+
+def expectedReturns(wheel):
+    """Exact expected return per unit bet of every outcome on ``wheel``.
+
+    Return:
+        dict: :obj:`.Outcome` to the expected amount paid back, stake included.
+    """
+    counts = {}
+    for bin in wheel.bins:
+        for outcome in bin:
+            counts[outcome] = counts.get(outcome, 0) + 1
+    return {outcome: count * (outcome.odds + 1) / len(wheel.bins)
+            for outcome, count in counts.items()}
+
+
+def antitheticPairing(wheel, outcome):
+    """Permutation of the bins pairing each bin holding ``outcome`` with one without it.
+
+    Pairs are swapped both ways, so applying the permutation to a uniform bin gives a
+    uniform bin. Bins left over on the larger side are paired among themselves.
+
+    Return:
+        list of int: partner of each bin index.
+    """
+    winners = [index for index, bin in enumerate(wheel.bins) if outcome in bin]
+    losers = [index for index, bin in enumerate(wheel.bins) if outcome not in bin]
+    pairing = list(range(len(wheel.bins)))
+    pairs = list(zip(winners, losers))
+    rest = winners[len(pairs):] + losers[len(pairs):]
+    pairs.extend(zip(rest[0::2], rest[1::2]))
+    for first, second in pairs:
+        pairing[first], pairing[second] = second, first
+    return pairing
+
+
+@contextlib.contextmanager
+def _seeded(simulator):
+    """Seed an unseeded ``simulator`` for one estimate only, as :meth:`.Simulator.run` does."""
+    own = simulator.seed
+    if own is None:
+        simulator.seed = random.getrandbits(31)
+    try:
+        yield simulator
+    finally:
+        simulator.seed = own
+
+
+def _values(records, statistic):
+    position = STATISTICS[statistic]
+    return [record[position] for record in records]
+
+
+def _stats(values):
+    stats = sim.RunningStats()
+    for value in values:
+        stats.add(value)
+    return stats
+
+
+def antithetic(simulator, outcome, statistic='maximum', samples=None):
+    """Mean of ``statistic`` from antithetic pairs of sessions.
+
+    Args:
+        simulator (:obj:`.Simulator`): roulette simulator.
+        outcome (:obj:`.Outcome`): the bet whose winning and losing bins are paired.
+        statistic (str, default 'maximum'): 'duration', 'maximum' or 'final'.
+        samples (int, default ``simulator.samples``): pairs to play.
+
+    Return:
+        :obj:`Estimate`: ``samples`` is twice the number of pairs.
+    """
+    samples = simulator.samples if samples is None else samples
+    wheel = simulator.game.wheel
+    plain = wheel.rng
+    mirror = MirrorRandom(antitheticPairing(wheel, outcome))
+    with _seeded(simulator):
+        try:
+            first = _values(simulator.records(0, samples), statistic)
+            wheel.rng = mirror
+            second = _values(simulator.records(0, samples), statistic)
+        finally:
+            wheel.rng = plain
+    pairs = _stats((a + b) / 2 for a, b in zip(first, second))
+    sessions = _stats(first + second)
+    reduced = pairs.variance / samples
+    return Estimate(pairs.mean, math.sqrt(reduced), 2 * samples,
+                    _gain(sessions.variance / (2 * samples), reduced))
+
+
+def controlVariate(simulator, statistic='maximum', samples=None):
+    """Mean of ``statistic`` corrected by the luck of each session.
+
+    The control is a session's net win minus its expected net win, the
+    :attr:`LedgerGame.drift`, which has a known mean of zero. Its coefficient is fitted
+    by least squares on the same sessions.
+
+    Return:
+        :obj:`Estimate`
+    """
+    samples = simulator.samples if samples is None else samples
+    game = simulator.game
+    ledger = LedgerGame(game.table, game.wheel)
+    values, controls = [], []
+    with _seeded(simulator):
+        simulator.game = ledger
+        try:
+            for index in range(samples):
+                record, = simulator.records(index, index + 1)
+                values.append(record[STATISTICS[statistic]])
+                controls.append(record[3] - simulator.initStake - ledger.drift)
+        finally:
+            simulator.game = game
+    x, y = _stats(controls), _stats(values)
+    covariance = sum((c - x.mean) * (v - y.mean)
+                     for c, v in zip(controls, values)) / max(samples - 1, 1)
+    beta = covariance / x.variance if x.variance else 0.0
+    adjusted = _stats(v - beta * c for v, c in zip(values, controls))
+    reduced = adjusted.variance / samples
+    return Estimate(adjusted.mean, math.sqrt(reduced), samples,
+                    _gain(y.variance / samples, reduced))
+
+
+def commonRandomNumbers(first, second, statistic='maximum', samples=None):
+    """Mean difference of ``statistic`` between two simulators on the same spins.
+
+    Both simulators are given the first one's seed, so session ``i`` of each is played
+    with the same spins.
+
+    Return:
+        :obj:`Estimate`: of ``first`` minus ``second``; ``samples`` counts the sessions
+        of both.
+    """
+    samples = first.samples if samples is None else samples
+    with _seeded(first):
+        seed, second.seed = second.seed, first.seed
+        try:
+            a = _values(first.records(0, samples), statistic)
+            b = _values(second.records(0, samples), statistic)
+        finally:
+            second.seed = seed
+    difference = _stats(x - y for x, y in zip(a, b))
+    reduced = difference.variance / samples
+    return Estimate(difference.mean, math.sqrt(reduced), 2 * samples,
+                    _gain((_stats(a).variance + _stats(b).variance) / samples, reduced))
+
+
+def importanceSampling(simulator, outcome, event, tilt=1.5, samples=None):
+    """Probability of a rare ``event``, with spins tilted against ``outcome``.
+
+    Bins which do not hold ``outcome`` are ``tilt`` times as likely as the others; each
+    session is weighted by the likelihood ratio of the fair wheel to the tilted one.
+
+    Args:
+        simulator (:obj:`.Simulator`): roulette simulator.
+        outcome (:obj:`.Outcome`): the bet the player is making.
+        event (callable): ``event(record)`` is true for the sessions counted, e.g.
+            ``lambda record: record[3] < simulator.initStake / 2``.
+        tilt (float, default 1.5): weight of a losing bin relative to a winning one.
+        samples (int, default ``simulator.samples``): sessions to play.
+
+    Return:
+        :obj:`Estimate`
+    """
+    samples = simulator.samples if samples is None else samples
+    wheel = simulator.game.wheel
+    plain = wheel.rng
+    tilted = TiltedRandom([1.0 if outcome in bin else tilt for bin in wheel.bins])
+    weights = []
+    with _seeded(simulator):
+        wheel.rng = tilted
+        try:
+            for index in range(samples):
+                record, = simulator.records(index, index + 1)
+                weights.append(math.exp(tilted.logRatio) if event(record) else 0.0)
+        finally:
+            wheel.rng = plain
+    stats = _stats(weights)
+    probability = min(max(stats.mean, 0.0), 1.0)
+    reduced = stats.variance / samples
+    return Estimate(stats.mean, math.sqrt(reduced), samples,
+                    _gain(probability * (1 - probability) / samples, reduced))
+
+
+def _gain(plain, reduced):
+    if reduced > 0:
+        return plain / reduced
+    return math.inf if plain > 0 else 1.0